@@ -0,0 +1,147 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+
+Measures the bytes and time saved by compressing representative Graph
+payloads: pages of users and messages received, and bulk create bodies
+sent. For every payload and coding, it prints the size on the wire, the
+time to encode and to decode it incrementally, and the total time of the
+transfer on links of the given bandwidths, compared with no compression.
+For responses, the encoding time is spent by the server, but still delays them.
+
+    python benchmarks/compression_benchmark.py --mbps 10 100 1000
+"""
+from __future__ import print_function, unicode_literals
+import argparse
+import gzip
+import json
+import random
+import string
+import time
+from msgraph.compression import brotli, iter_decompressed
+
+
+def _words(rng, count):
+    return " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+                    for _ in range(count))
+
+
+def users_page(rng, count=999):
+    departments = ["Engineering", "Sales", "Marketing", "Finance", "Legal", "Support"]
+    return {
+        "@odata.context": "https://graph.microsoft.com/v1.0/$metadata#users",
+        "@odata.nextLink": "https://graph.microsoft.com/v1.0/users?$skiptoken=" + "X" * 200,
+        "value": [{
+            "id": "{:08x}-{:04x}-4{:03x}-a{:03x}-{:012x}".format(rng.getrandbits(32), rng.getrandbits(16),
+                                                                 rng.getrandbits(12), rng.getrandbits(12),
+                                                                 rng.getrandbits(48)),
+            "displayName": "User {}".format(i),
+            "givenName": "Given{}".format(i),
+            "surname": "Surname{}".format(i),
+            "mail": "user{}@contoso.onmicrosoft.com".format(i),
+            "userPrincipalName": "user{}@contoso.onmicrosoft.com".format(i),
+            "jobTitle": rng.choice(["Engineer", "Manager", "Director", "Analyst"]),
+            "department": rng.choice(departments),
+            "officeLocation": "Building {}".format(rng.randint(1, 40)),
+            "businessPhones": ["+1 425 555 {:04d}".format(rng.randint(0, 9999))],
+            "mobilePhone": None,
+            "preferredLanguage": "en-US",
+            "accountEnabled": True,
+        } for i in range(count)]
+    }
+
+
+def messages_page(rng, count=50):
+    return {
+        "@odata.context": "https://graph.microsoft.com/v1.0/$metadata#users('me')/messages",
+        "value": [{
+            "id": "AAMk" + "".join(rng.choice(string.ascii_letters) for _ in range(148)),
+            "subject": _words(rng, 6),
+            "bodyPreview": _words(rng, 30),
+            "body": {"contentType": "html",
+                     "content": "<html><body><div><p>{}</p></div></body></html>".format(
+                         "</p><p>".join(_words(rng, 40) for _ in range(8)))},
+            "from": {"emailAddress": {"name": "Sender", "address": "sender@contoso.com"}},
+            "receivedDateTime": "2024-05-{:02d}T10:00:00Z".format(rng.randint(1, 28)),
+            "isRead": rng.random() > 0.5,
+        } for _ in range(count)]
+    }
+
+
+def batch_create(rng, count=20):
+    return {"requests": [{
+        "id": str(i),
+        "method": "POST",
+        "url": "/users",
+        "headers": {"Content-Type": "application/json"},
+        "body": {
+            "accountEnabled": True,
+            "displayName": "New user {}".format(i),
+            "mailNickname": "newuser{}".format(i),
+            "userPrincipalName": "newuser{}@contoso.onmicrosoft.com".format(i),
+            "passwordProfile": {"forceChangePasswordNextSignIn": True,
+                                "password": "".join(rng.choice(string.ascii_letters) for _ in range(16))},
+        },
+    } for i in range(count)]}
+
+
+def codings():
+    yield "gzip-1", lambda data: gzip.compress(data, compresslevel=1), "gzip"
+    yield "gzip-6", lambda data: gzip.compress(data, compresslevel=6), "gzip"
+    if brotli is not None:
+        yield "br-4", lambda data: brotli.compress(data, quality=4), "br"
+
+
+def _timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def _decode(encoded, encoding, chunk_size=64 * 1024):
+    chunks = (encoded[i:i + chunk_size] for i in range(0, len(encoded), chunk_size))
+    return b"".join(iter_decompressed(chunks, encoding))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--mbps", type=float, nargs="+", default=[10, 100, 1000],
+                        help="link bandwidths in Mbit/s (default: 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="best of repeat timings (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [("users page (999)", users_page(rng)),
+                ("messages page (50)", messages_page(rng)),
+                ("$batch create (20)", batch_create(rng))]
+
+    header = "{:<20} {:<8} {:>10} {:>7} {:>9} {:>9}".format("payload", "coding", "bytes", "ratio", "enc ms",
+                                                          "dec ms")
+    header += "".join(" {:>13}".format("saved@{:g}Mb".format(mbps)) for mbps in args.mbps)
+    print(header)
+    print("-" * len(header))
+
+    for name, payload in payloads:
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        print("{:<20} {:<8} {:>10} {:>7} {:>9} {:>9}".format(name, "identity", len(data), "1.00", "-", "-"))
+        for coding, compress, encoding in codings():
+            encoded, encode_time = _timed(lambda: compress(data), args.repeat)
+            decoded, decode_time = _timed(lambda: _decode(encoded, encoding), args.repeat)
+            assert decoded == data
+
+            row = "{:<20} {:<8} {:>10} {:>7.2f} {:>9.2f} {:>9.2f}".format(
+                "", coding, len(encoded), len(data) / float(len(encoded)), encode_time * 1000, decode_time * 1000)
+            for mbps in args.mbps:
+                bytes_per_second = mbps * 1000 * 1000 / 8
+                # Time on the wire saved, less the time spent encoding and decoding
+                saved = (len(data) - len(encoded)) / bytes_per_second - encode_time - decode_time
+                row += " {:>10.1f} ms".format(saved * 1000)
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
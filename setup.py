@@ -67,6 +67,11 @@ def main():
 
         extras_require={
             "samples": ["Pillow"],
+            "async": ["aiohttp>=3.0"],
+            "fast-json": ["orjson"],
+            "otel": ["opentelemetry-api"],
+            "arrow": ["pyarrow>=7.0"],
+            "brotli": ["brotli"],
             "tests": ["Mock"]
         },
 
@@ -3,9 +3,28 @@
 """
 from .model import *
 from .http_provider import HttpProvider
+from .retry import RetryPolicy
+from .rate_limiter import AdaptiveRateLimiter
 from .auth_provider import AuthProvider
+from .token_cache import TokenCache, FileTokenCacheBackend, SqliteTokenCacheBackend
 from .options import QueryOption
 from .options import HeaderOption
+from .query import Query, Field, Filter, ProjectionPolicy
 from .error import GraphError
+from .codec import JsonCodec, StdlibJsonCodec, OrjsonCodec, UjsonCodec
+from .hooks import Hooks, HistogramCollector, OpenTelemetrySpanEmitter
+from .cache import ResponseCache, FileCacheBackend
+from .middleware import (Middleware, Pipeline, AsyncPipeline, PipelineRequest, AuthHandler, HeadersHandler,
+                         ProjectionHandler, CacheHandler, RedirectHandler, RetryHandler, RateLimitHandler,
+                         TelemetryHandler, default_middleware)
+from .compression import CompressionHandler
 from .client import GraphClient
+from .batch import BatchRequest, BatchResponse
+from .fanout import MapResult
+from .type_registry import TypeRegistry, default_registry
+from .page_iterator import GraphPageIterator
+from .delta import DeltaTracker, FileDeltaLinkStore, SqliteDeltaLinkStore, MemoryDeltaLinkStore
+from .upload_session import UploadSession
+from .async_http_provider import AsyncHttpProvider
+from .async_client import AsyncGraphClient
 
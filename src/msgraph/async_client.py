@@ -0,0 +1,274 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+import asyncio
+from .client import GraphClient
+from .middleware import AsyncPipeline, PipelineRequest, async_http_transport
+from .request import GraphRequest, GraphResponse
+from .fanout import map_items_async
+from .ranged_download import verify_hashes
+
+
+class AsyncGraphRequest(GraphRequest):
+    """A :class:`GraphRequest` whose methods are coroutines. It must be
+    sent through a client using an awaitable HTTP provider, such as
+    :class:`AsyncHttpProvider<msgraph.async_http_provider.AsyncHttpProvider>`.
+    """
+
+    async def send(self, content=None, path=None):
+        """Send the request using the client specified at request initialization.
+        :param content:str: Defaults to None, the body of the request that will be sent
+        :param path:str: Defaults to None, the local path of the file which will be sent
+        :return HttpResponse: The response to the request
+
+        The request goes through the send_async coroutines of the
+        middleware of the client.
+        """
+        body = None if path else self._encode_content(content)
+        self._response = await self._client.pipeline.send(PipelineRequest(self, body, path))
+        return self._response
+
+    async def download_item(self, path):
+        """Download a file to a local path
+
+        Args:
+            path (str): The local path to download the file
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`:
+                The response to the request
+        """
+        self.method = "GET"
+        return await self._client.pipeline.send(PipelineRequest(self, download_path=path))
+
+    async def get_value(self):
+        """Gets single just the value from a property. No JSON data is returned.
+        :returns: value
+        """
+        self.method = "GET"
+        return (await self.send()).content
+
+    async def get(self):
+        """Sends GET request and returns data.
+        :returns GraphPage with data returned by request.
+        """
+        self.method = "GET"
+        page = GraphResponse(self._client.codec.loads((await self.send()).raw_content)).get_page()
+        if page.next_page_link:
+            page._next_page_request = self._next_page_request(page.next_page_link)
+        return page
+
+    async def post(self, data_dict):
+        """Sends POST request and gets the page content.
+        :param data_dict: dictionary with request data.
+        :returns GraphPage with data returned by request.
+        """
+        self.method = "POST"
+        return GraphResponse(self._client.codec.loads((await self.send(data_dict)).raw_content)).get_page()
+
+    async def patch(self, data_dict):
+        """Sends PATCH request.
+        :param data_dict: dictionary with request data.
+        """
+        self.method = "PATCH"
+        await self.send(data_dict)
+
+    async def delete(self):
+        """Sends DELETE request."""
+        self.method = "DELETE"
+        await self.send()
+
+
+class AsyncGraphClient(GraphClient):
+    """Asyncio counterpart of :class:`GraphClient<msgraph.client.GraphClient>`.
+    Every method that sends a request is a coroutine. The number of
+    requests in flight is bounded by the HTTP provider, see
+    :class:`AsyncHttpProvider<msgraph.async_http_provider.AsyncHttpProvider>`.
+    Requests go through the :func:`send_async<msgraph.middleware.Middleware.send_async>`
+    coroutines of the middleware, custom handlers must implement it.
+    The :class:`AuthProvider<msgraph.auth_provider.AuthProvider>` needs a
+    sync :class:`HttpProvider<msgraph.http_provider.HttpProvider>` for its
+    token requests, which run on a thread when a token has expired.
+    """
+
+    async def close(self):
+        """Closes the HTTP provider used by the client, releasing
+        any pooled connections it holds, and unregisters the client
+        from the retry policy and auth provider it may share
+        """
+        self._unregister()
+        await self._http_provider.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _create_pipeline(self, handlers):
+        return AsyncPipeline(handlers, async_http_transport)
+
+    def request(self, resource):
+        """Creates API request.
+        :param resource: API resource.
+        :type resource: string.
+        :rtype: AsyncGraphRequest object.
+        """
+        if not resource.startswith(self._base_url):
+            resource = self.base_url + resource
+        return AsyncGraphRequest(resource, self)
+
+    def batch(self, max_retries=3):
+        raise TypeError("JSON batches are not supported by AsyncGraphClient, use GraphClient.batch.")
+
+    def iter_batches(self, *args, **kwargs):
+        raise TypeError("Arrow record batches are not supported by AsyncGraphClient, "
+                        "use iter_all and to_arrow on the pages, or GraphClient.iter_batches.")
+
+    def delta(self, *args, **kwargs):
+        raise TypeError("Delta queries are not supported by AsyncGraphClient, use GraphClient.delta.")
+
+    def upload_large_file(self, *args, **kwargs):
+        raise TypeError("Upload sessions are not supported by AsyncGraphClient, use GraphClient.upload_large_file.")
+
+    async def map(self, func_or_template, items, concurrency=8, ordered=True, select=None, max_pending=None):
+        """Runs a coroutine function, or fetches a resource, for every item
+        with at most concurrency items in flight, ex.
+        async for result in client.map("users/{}/manager", user_ids, concurrency=16).
+        Items are read lazily: at most max_pending tasks exist at a time.
+        An error only fails its own item.
+        :param func_or_template: coroutine function called as func(client, item), or a
+            resource template formatted with each item and fetched with get_object
+        :param items: iterable of items, ex. ids
+        :param concurrency: number of items in flight
+        :param ordered: yield results in the order of the items, else as they complete
+        :param select: attributes returned for templates
+        :param max_pending: number of tasks created ahead, 2 * concurrency if None
+        :type func_or_template: coroutine function or string.
+        :rtype: async generator of MapResult objects.
+        """
+        async for result in map_items_async(self, func_or_template, items, concurrency=concurrency, ordered=ordered,
+                                            select=select, max_pending=max_pending):
+            yield result
+
+    async def get_page(self, api_resource, select=None, filter=None, top=None, order_by=None, count=None,
+                       query=None):
+        """Returns page of objects returned by API request.
+        :param api_resource: API resource.
+        :param select: attributes returned in results
+        :param filter: filter results by condition
+        :param top: page size for results
+        :param order_by: order results by attribute
+        :param count: return count of objects found
+        :param query: Query built with msgraph.query, other options override its options
+        :type api_resource: string.
+        :rtype: GraphPage object.
+        """
+        request = self.request(api_resource)
+        if query is not None:
+            query.apply(request)
+        request.set_query_options(select=select, filter=filter, top=top, order_by=order_by, count=count)
+
+        return await request.get()
+
+    async def iter_all(self, api_resource, select=None, filter=None, top=None, order_by=None,
+                       max_items=None, max_pages=None, next_link=None, query=None):
+        """Iterates over every object of a collection, following
+        @odata.nextLink page by page, ex.
+        async for user in client.iter_all("users", select="id").
+        :param api_resource: API resource.
+        :param select: attributes returned in results
+        :param filter: filter results by condition
+        :param top: page size for results
+        :param order_by: order results by attribute
+        :param max_items: maximum number of objects to return
+        :param max_pages: maximum number of pages to fetch
+        :param next_link: @odata.nextLink to resume from, api_resource and
+            query options are ignored when it is set
+        :param query: Query built with msgraph.query, other options override its options
+        :type api_resource: string.
+        :rtype: async generator of OdataObjectBase objects.
+        """
+        if next_link:
+            request = self.request(next_link)
+        else:
+            request = self.request(api_resource)
+            if query is not None:
+                query.apply(request)
+            request.set_query_options(select=select, filter=filter, top=top, order_by=order_by)
+
+        items = pages = 0
+        while request is not None and (max_pages is None or pages < max_pages):
+            page = await request.get()
+            pages += 1
+            for graph_object in page.objects():
+                if max_items is not None and items >= max_items:
+                    return
+                items += 1
+                yield graph_object
+            request = page.next_page_request
+
+    async def get_object(self, api_resource, select=None):
+        """Returns first object in page returned by API request.
+        :param api_resource: API resource.
+        :type api_resource: string.
+        :param select: Comma separataed list of properties to get.
+        :type select: string.
+        :rtype: OdataObjectBase object.
+        """
+        request = self.request(api_resource)
+        request.set_query_options(select=select)
+
+        page = await request.get()
+        return next(page.objects())
+
+    async def get_value(self, api_resource):
+        """Returns the value of the property requested by parameter.
+        :param api_resource: API resource.
+        :type api_resource: string.
+        :rtype: OdataObjectBase object.
+        """
+        request = self.request("{}/$value".format(api_resource))
+        return await request.get_value()
+
+    async def create_object(self, api_resource, graph_object):
+        """Sends a POST request to the specified resource with the specified body and
+        returns object returned by API request.
+        :param api_resource: API resource.
+        :type api_resource: string.
+        :param graph_object: Request body content.
+        :type graph_object: OdataBaseObject or dictionary.
+        :rtype: OdataObjectBase object"""
+        request = self.request(api_resource)
+        page = await request.post(graph_object)
+
+        return next(page.objects())
+
+    async def download_item(self, api_resource, path, verify=True):
+        """Downloads the content of a drive item to a local path. Parallel
+        Range requests and resuming are only supported by GraphClient.
+        :param api_resource: drive item to download, ex. "me/drive/items/{id}".
+        :type api_resource: string.
+        :param path: local path to save the file.
+        :type path: string.
+        :param verify: check the file against the sha1Hash/quickXorHash of the item.
+        :rtype: HttpResponse object"""
+        hashes = None
+        if verify:
+            item = await self.get_object(api_resource, select="file")
+            hashes = (item.serialized().get("file") or {}).get("hashes")
+
+        request = self.request("{}/content".format(api_resource))
+        response = await request.download_item(path)
+        if hashes and response.status == 200:
+            # Hashing a large file would block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, verify_hashes, path, hashes)
+        return response
+
+    async def update_object(self, api_resource, content):
+        request = self.request(api_resource)
+        await request.patch(content)
+
+    async def delete_object(self, api_resource):
+        request = self.request(api_resource)
+        await request.delete()
@@ -0,0 +1,279 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+
+from __future__ import unicode_literals, with_statement
+import asyncio
+import logging
+import time
+from .http_logging import RequestTiming, describe_body, redact_headers, redact_url
+from .http_provider_base import HttpProviderBase
+from .http_response import HttpResponse
+from .retry import RetryPolicy
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHttpProvider(HttpProviderBase):
+
+    def __init__(self, concurrency=100, limit_per_host=0, keep_alive=True, keepalive_timeout=15,
+                 retry_policy=None, timing_callback=None):
+        """Initialize the asyncio HTTP provider. Requires the optional
+        aiohttp dependency (pip install msgraph[async]). It can not be
+        used by an :class:`AuthProvider<msgraph.auth_provider.AuthProvider>`,
+        whose token requests need a sync :class:`HttpProvider<msgraph.http_provider.HttpProvider>`.
+
+        Args:
+            concurrency (int): Defaults to 100, the maximum number of
+                requests in flight at the same time. Further calls to
+                :func:`send` and :func:`download` wait for a free slot
+            limit_per_host (int): Defaults to 0 (no limit), the maximum
+                number of connections opened to a single host
+            keep_alive (bool): Defaults to True. If False, connections
+                are closed after every request
+            keepalive_timeout (float): Defaults to 15, the number of seconds
+                an idle connection is kept in the pool
+            retry_policy (:class:`RetryPolicy<msgraph.retry.RetryPolicy>`):
+                Defaults to None, the policy used to retry throttled
+                requests. If None, a default :class:`RetryPolicy<msgraph.retry.RetryPolicy>`
+                is used. Pass RetryPolicy(max_attempts=1) to disable retries
+            timing_callback (callable): Defaults to None, called with a
+                :class:`RequestTiming<msgraph.http_logging.RequestTiming>`
+                after every attempt of every request
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncHttpProvider requires the aiohttp package.")
+
+        self._concurrency = concurrency
+        self._limit_per_host = limit_per_host
+        self._keep_alive = keep_alive
+        self._keepalive_timeout = keepalive_timeout
+        self._retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self._timing_callback = timing_callback
+        self._session = None
+        self._semaphore = None
+
+    @property
+    def concurrency(self):
+        """Gets the maximum number of requests in flight
+
+        Returns:
+            int: The concurrency limit
+        """
+        return self._concurrency
+
+    @property
+    def retry_policy(self):
+        """Gets and sets the policy used to retry throttled requests.
+        If None, requests are sent once
+
+        Returns:
+            :class:`RetryPolicy<msgraph.retry.RetryPolicy>`: The retry policy
+        """
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, value):
+        self._retry_policy = value
+
+    @property
+    def timing_callback(self):
+        """Gets the callable receiving the
+        :class:`RequestTiming<msgraph.http_logging.RequestTiming>` of
+        every attempt of every request
+
+        Returns:
+            callable: The timing callback, or None
+        """
+        return self._timing_callback
+
+    def _get_session(self):
+        # Created lazily so that the session and semaphore are bound
+        # to the loop that is actually running the requests
+        if self._session is None or self._session.closed:
+            if self._keep_alive:
+                connector = aiohttp.TCPConnector(limit=self._concurrency,
+                                                 limit_per_host=self._limit_per_host,
+                                                 keepalive_timeout=self._keepalive_timeout)
+            else:
+                connector = aiohttp.TCPConnector(limit=self._concurrency,
+                                                 limit_per_host=self._limit_per_host,
+                                                 force_close=True)
+            trace_configs = [self._create_trace_config()] if self._timing_callback is not None else None
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._session
+
+    @staticmethod
+    def _create_trace_config():
+        """Creates the aiohttp tracing hooks recording the phases of a
+        request in the dict passed as its trace_request_ctx"""
+        def mark(name):
+            async def on_event(session, context, params):
+                if context.trace_request_ctx is not None:
+                    context.trace_request_ctx[name] = time.perf_counter()
+            return on_event
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(mark("dns_start"))
+        trace_config.on_dns_resolvehost_end.append(mark("dns_end"))
+        trace_config.on_connection_create_start.append(mark("connect_start"))
+        trace_config.on_connection_create_end.append(mark("connect_end"))
+        trace_config.on_request_end.append(mark("headers"))
+        return trace_config
+
+    async def close(self):
+        """Closes the underlying aiohttp session and all of its
+        pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def send(self, method, headers, url, data=None, content=None, path=None):
+        """Send the built request using all the specified
+        parameters. Redirects are returned rather than followed, see
+        :class:`RedirectHandler<msgraph.middleware.RedirectHandler>`.
+
+        Args:
+            method (str): The HTTP method to use (ex. GET)
+            headers (dict of (str, str)): A dictionary of name-value
+                pairs for headers in the request
+            url (str): The URL for the request to be sent to
+            data (str): Defaults to None, data to include in the body
+                of the request which is not in JSON format
+            content (dict): Defaults to None, a dictionary to include
+                in JSON format in the body of the request
+            path (str): Defaults to None, the path to the local file
+                to send in the body of the request
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`:
+                The response to the request
+        """
+        session = self._get_session()
+
+        async def send_once(trace):
+            async with self._semaphore:
+                if path:
+                    with open(path, mode='rb') as f:
+                        async with session.request(method, url, headers=headers, data=f, allow_redirects=False,
+                                                   trace_request_ctx=trace) as response:
+                            return response, await response.read()
+                async with session.request(method, url, headers=headers, data=data, json=content,
+                                           allow_redirects=False, trace_request_ctx=trace) as response:
+                    return response, await response.read()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s headers=%s body=%s", method, redact_url(url), redact_headers(headers),
+                         describe_body(data, content, path))
+
+        response, body = await self._send_with_retry(method, url, headers, send_once)
+        return HttpResponse(response.status, response.headers, body)
+
+    async def _send_with_retry(self, method, url, headers, send_once):
+        """Awaits send_once until it returns a response that is not
+        retryable, or the retry policy gives up. The semaphore slot is
+        released while waiting between attempts
+
+        Args:
+            method (str): The HTTP method of the request
+            url (str): The URL of the request
+            headers (dict of (str, str)): The headers of the request
+            send_once (coroutine function): Sends the request once, with
+                the dict recording its timing as trace_request_ctx, and
+                returns a tuple of the :class:`aiohttp.ClientResponse` and
+                its body
+
+        Returns:
+            tuple: The last value returned by send_once
+        """
+        policy = self._retry_policy
+        if policy is None:
+            return await self._send_attempt(method, url, send_once, 1)
+
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            status = response_headers = None
+            try:
+                result = await self._send_attempt(method, url, send_once, attempt)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not policy.is_retryable(method, None):
+                    raise
+                delay = policy.get_delay(attempt)
+                if not policy.should_retry(attempt, time.monotonic() - start, delay):
+                    raise
+            else:
+                status, response_headers = result[0].status, result[0].headers
+                if not policy.is_retryable(method, status):
+                    return result
+                delay = policy.get_delay(attempt, response_headers)
+                if not policy.should_retry(attempt, time.monotonic() - start, delay):
+                    return result
+
+            logger.info("Retrying %s %s in %.2f s after %s (attempt %d)", method, redact_url(url), delay,
+                        status or "a connection error", attempt)
+            policy.notify(method, url, headers, status, response_headers, delay)
+            policy.record(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send_attempt(self, method, url, send_once, attempt):
+        """Awaits send_once, logging and timing the attempt when that
+        is enabled"""
+        if self._timing_callback is None and not logger.isEnabledFor(logging.DEBUG):
+            return await send_once(None)
+
+        trace = {}
+        began = time.perf_counter()
+        result = None
+        try:
+            result = await send_once(trace)
+            return result
+        finally:
+            total = time.perf_counter() - began
+            status = None if result is None else result[0].status
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s -> %s in %.1f ms (attempt %d)", method, redact_url(url), status,
+                             total * 1000, attempt)
+            if self._timing_callback is not None:
+                def phase(start, end):
+                    return trace[end] - trace[start] if start in trace and end in trace else None
+                trace["began"] = began
+                self._timing_callback(RequestTiming(method, redact_url(url), status, attempt, total,
+                                                    ttfb=phase("began", "headers"),
+                                                    dns=phase("dns_start", "dns_end"),
+                                                    connect=phase("connect_start", "connect_end")))
+
+    async def download(self, headers, url, path):
+        """Downloads a file to the stated path
+
+        Args:
+            headers (dict of (str, str)): A dictionary of name-value
+                pairs to be used as headers in the request
+            url (str): The URL from which to download the file
+            path (str): The local path to save the downloaded file
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`:
+                The response to the request
+        """
+        session = self._get_session()
+
+        async def download_once(trace):
+            async with self._semaphore:
+                async with session.get(url, headers=headers, trace_request_ctx=trace) as response:
+                    if response.status == 200:
+                        with open(path, 'wb') as f:
+                            async for chunk in response.content.iter_chunked(64 * 1024):
+                                f.write(chunk)
+                        return response, None
+                    return response, await response.text()
+
+        response, text = await self._send_with_retry("GET", url, headers, download_once)
+        return HttpResponse(response.status, response.headers, text)
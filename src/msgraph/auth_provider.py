@@ -1,11 +1,19 @@
 """
 Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
 """
+import asyncio
 import json
+import logging
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
 from .auth_provider_base import AuthProviderBase
 from .options import *
 from .session import Session
 
+logger = logging.getLogger(__name__)
+
 
 class AuthProvider(AuthProviderBase):
 
@@ -13,13 +21,16 @@ class AuthProvider(AuthProviderBase):
     MSA_AUTH_TOKEN_URL = "https://login.microsoft.com/common/oauth2/v2.0/token"
 
     def __init__(self, http_provider, client_id=None, scopes=None, access_token=None,
-                 session_type=None, auth_server_url=None, auth_token_url=None):
+                 session_type=None, auth_server_url=None, auth_token_url=None, hooks=None,
+                 refresh_ahead=300, tenant=None, token_cache=None):
         """Initialize the authentication provider for authenticating
         requests sent to MS Graph
 
         Args:
             http_provider (:class:`HttpProviderBase<msgraph.http_provider_base>`):
-                The HTTP provider to use for all auth requests
+                The HTTP provider to use for all auth requests. It must be
+                sync, even for an :class:`AsyncGraphClient<msgraph.async_client.AsyncGraphClient>`:
+                expired tokens of async clients are renewed on a thread
             client_id (str): Defaults to None, the client id for your
                 application
             scopes (list of str): Defaults to None, the scopes
@@ -36,7 +47,28 @@ class AuthProvider(AuthProviderBase):
                 None, defaults to OAuth for Microsoft Account.
             auth_token_url (str): URL where OAuth token can be redeemed. If None,
                 defaults to OAuth for Microsoft Account.
+            hooks (:class:`Hooks<msgraph.hooks.Hooks>`): Defaults to None, the
+                hooks notified of token requests. A :class:`GraphClient<msgraph.client.GraphClient>`
+                created with this provider sets its own hooks if None, until
+                it is closed
+            refresh_ahead (float): Defaults to 300, the number of seconds
+                before the access token expires at which a background
+                thread refreshes it, so that requests do not wait for the
+                token endpoint. None disables the background refresh
+            tenant (str): Defaults to None, the tenant tokens are requested
+                from. If None, it is read from the path of auth_token_url
+            token_cache (:class:`TokenCache<msgraph.token_cache.TokenCache>`):
+                Defaults to None, the cache of app-only sessions, which can
+                be shared by the providers of many tenants. When set,
+                :func:`authenticate_daemon` reuses a cached token and an
+                expired app-only token is acquired again automatically
+
+        Raises:
+            TypeError: If the HTTP provider is async
         """
+        if asyncio.iscoroutinefunction(getattr(http_provider, "send", None)):
+            raise TypeError("AuthProvider needs a sync HTTP provider such as HttpProvider, "
+                            "token requests can not be awaited.")
         self._http_provider = http_provider
         self._client_id = client_id
         self._scopes = scopes
@@ -44,6 +76,16 @@ class AuthProvider(AuthProviderBase):
         self._session = None
         self._auth_server_url = self.MSA_AUTH_SERVER_URL if auth_server_url is None else auth_server_url
         self._auth_token_url = self.MSA_AUTH_TOKEN_URL if auth_token_url is None else auth_token_url
+        self._async_refresh_lock = None
+        self._hooks = hooks
+        self._refresh_ahead = refresh_ahead
+        self._refresh_lock = threading.RLock()
+        self._refresh_timer = None
+        self._tenant = tenant
+        self._token_cache = token_cache
+        self._daemon = False
+        self._daemon_resource = None
+        self._token_cache_key = None
 
     @property
     def client_id(self):
@@ -86,6 +128,48 @@ class AuthProvider(AuthProviderBase):
             return self._session.access_token
         return None
 
+    @property
+    def hooks(self):
+        """Gets and sets the hooks notified of token requests
+
+        Returns:
+            :class:`Hooks<msgraph.hooks.Hooks>`: The hooks, or None
+        """
+        return self._hooks
+
+    @hooks.setter
+    def hooks(self, value):
+        self._hooks = value
+
+    @property
+    def tenant(self):
+        """Gets and sets the tenant tokens are requested from
+
+        Returns:
+            str: The tenant, by default the first segment of the path of
+                auth_token_url (ex. "common")
+        """
+        if self._tenant is not None:
+            return self._tenant
+        return urlparse(self._auth_token_url).path.strip("/").split("/")[0]
+
+    @tenant.setter
+    def tenant(self, value):
+        self._tenant = value
+
+    @property
+    def token_cache(self):
+        """Gets and sets the cache of app-only sessions
+
+        Returns:
+            :class:`TokenCache<msgraph.token_cache.TokenCache>`: The cache, or None
+        """
+        return self._token_cache
+
+    @token_cache.setter
+    def token_cache(self, value):
+        self._token_cache = value
+
     @property
     def auth_server_url(self):
         """Gets and sets the authorization server url for the
@@ -137,12 +221,35 @@ class AuthProvider(AuthProviderBase):
         return "{}?{}".format(self._auth_server_url, urlencode(params))
 
     def authenticate_daemon(self, client_secret, resource=None):
-        """Gets the access token and creates a session.
+        """Gets the access token and creates a session. With a token
+        cache, a cached session of the same tenant, client id and
+        scopes is used instead of requesting a token.
 
         Args:
             client_secret (str): The client secret of your app.
             resource (str): Defaults to None,The resource you want to access
         """
+        self._daemon = True
+        self._daemon_resource = resource
+        if self._token_cache is not None:
+            scopes = list(self.scopes or ()) + ([resource] if resource is not None else [])
+            self._token_cache_key = self._token_cache.key_for(self.tenant, self.client_id, scopes)
+            session = self._token_cache.get(self._token_cache_key)
+            if session is not None:
+                self._session = session
+                self._schedule_refresh()
+                return
+
+        self._request_daemon_token(client_secret, resource)
+
+    def _request_daemon_token(self, client_secret, resource):
+        """Requests an app-only token with the client credentials grant,
+        and creates a session from it
+
+        Args:
+            client_secret (str): The client secret of your app.
+            resource (str): The resource you want to access, or None
+        """
         params = {
             "client_id": self.client_id,
             "client_secret": client_secret,
@@ -154,10 +261,7 @@ class AuthProvider(AuthProviderBase):
         auth_url = self._auth_token_url
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        response = self._http_provider.send(method="POST",
-                                            headers=headers,
-                                            url=auth_url,
-                                            data=params)
+        response = self._send_token_request(auth_url, headers, params)
         rcont = json.loads(response.content)
         self._session = self._session_type(token_type=rcont["token_type"],
                                            expires_in=rcont["expires_in"],
@@ -168,6 +272,9 @@ class AuthProvider(AuthProviderBase):
                                            redirect_uri='',
                                            refresh_token=rcont["refresh_token"] if "refresh_token" in rcont else None,
                                            client_secret=client_secret)
+        if self._token_cache is not None:
+            self._token_cache.put(self._token_cache_key, self._session)
+        self._schedule_refresh()
 
     def authenticate_user(self, code, redirect_uri, client_secret, resource=None):
         """Takes in a code, gets the access token and creates a session.
@@ -194,10 +301,7 @@ class AuthProvider(AuthProviderBase):
 
         auth_url = self._auth_token_url
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        response = self._http_provider.send(method="POST",
-                                            headers=headers,
-                                            url=auth_url,
-                                            data=params)
+        response = self._send_token_request(auth_url, headers, params)
 
         rcont = json.loads(response.content)
         self._session = self._session_type(rcont["token_type"],
@@ -209,6 +313,10 @@ class AuthProvider(AuthProviderBase):
                                            redirect_uri,
                                            rcont["refresh_token"] if "refresh_token" in rcont else None,
                                            client_secret)
+        self._daemon = False
+        self._daemon_resource = None
+        self._token_cache_key = None
+        self._schedule_refresh()
 
     def authenticate_request(self, request):
         """Append the required authentication headers
@@ -225,15 +333,55 @@ class AuthProvider(AuthProviderBase):
             raise RuntimeError("""Session must be authenticated
                 before applying authentication to a request.""")
 
-        if self._session.is_expired() and 'wl.offline_access' in self.scopes:
-            self.refresh_token()
+        if self._session.is_expired():
+            if self._daemon and self._session.refresh_token is None:
+                self._renew_daemon_session()
+            elif self._session.refresh_token is not None:
+                self._refresh_expired_token()
+
+        request.append_option(
+            HeaderOption("Authorization",
+                          "bearer {}".format(self._session.access_token)))
+
+    async def authenticate_request_async(self, request):
+        """Awaitable version of :func:`authenticate_request`. When the
+        token has expired, only one coroutine refreshes it while the
+        others wait for that refresh and then reuse the new token.
+        Threads refreshing at the same time are serialized the same way.
+
+        Args:
+            request (:class:`RequestBase<msgraph.request_base.RequestBase>`):
+                The request to authenticate
+        """
+        if self._session is None:
+            raise RuntimeError("""Session must be authenticated
+                before applying authentication to a request.""")
+
+        if self._session.is_expired():
+            if self._daemon and self._session.refresh_token is None:
+                renew = self._renew_daemon_session
+            elif self._session.refresh_token is not None:
+                renew = self._refresh_expired_token
+            else:
+                renew = None
+
+            if renew is not None:
+                if self._async_refresh_lock is None:
+                    self._async_refresh_lock = asyncio.Lock()
+
+                async with self._async_refresh_lock:
+                    # Another coroutine may have refreshed while we waited
+                    if self._session.is_expired():
+                        loop = asyncio.get_running_loop()
+                        await loop.run_in_executor(None, renew)
 
         request.append_option(
             HeaderOption("Authorization",
                           "bearer {}".format(self._session.access_token)))
 
     def refresh_token(self):
-        """Refresh the token currently used by the session"""
+        """Refresh the token currently used by the session. Only one
+        refresh is sent at a time, concurrent callers wait for it."""
         if self._session is None:
             raise RuntimeError("""Session must be authenticated
                 before refreshing token.""")
@@ -241,27 +389,103 @@ class AuthProvider(AuthProviderBase):
         if self._session.refresh_token is None:
             raise RuntimeError("""Refresh token not present.""")
 
-        params = {
-            "refresh_token": self._session.refresh_token,
-            "client_id": self._session.client_id,
-            "redirect_uri": self._session.redirect_uri,
-            "grant_type": "refresh_token"
-        }
-
-        if self._session.client_secret is not None:
-            params["client_secret"] = self._session.client_secret
+        with self._refresh_lock:
+            params = {
+                "refresh_token": self._session.refresh_token,
+                "client_id": self._session.client_id,
+                "redirect_uri": self._session.redirect_uri,
+                "grant_type": "refresh_token"
+            }
 
+            if self._session.client_secret is not None:
+                params["client_secret"] = self._session.client_secret
 
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            response = self._http_provider.send(method="POST",
-                                                headers=headers,
-                                                url=self._session.auth_server_url,
-                                                data=params)
+            response = self._send_token_request(self._session.auth_server_url, headers, params)
             rcont = json.loads(response.content)
             self._session.refresh_session(rcont["expires_in"],
                                           rcont["scope"],
                                           rcont["access_token"],
                                           rcont["refresh_token"])
+            if self._token_cache_key is not None:
+                self._token_cache.put(self._token_cache_key, self._session)
+            self._schedule_refresh()
+
+    def close(self):
+        """Stops the background refresh of the access token"""
+        with self._refresh_lock:
+            self._cancel_refresh()
+
+    def _refresh_expired_token(self):
+        """Refreshes the access token unless another thread refreshed it
+        while this one waited for the lock"""
+        with self._refresh_lock:
+            if self._session.is_expired():
+                self.refresh_token()
+
+    def _renew_daemon_session(self, ahead=False):
+        """Acquires an app-only token again, from the token cache if
+        another provider sharing it already did
+
+        Args:
+            ahead (bool): Defaults to False. If True, the token is renewed
+                even though it has not expired yet
+        """
+        with self._refresh_lock:
+            session = self._session
+            if not ahead and not session.is_expired():
+                return
+            if self._token_cache is not None:
+                cached = self._token_cache.get(self._token_cache_key)
+                if cached is not None and cached is not session and (
+                        not ahead or (_expires_at(cached) or 0) > (_expires_at(session) or 0)):
+                    self._session = cached
+                    self._schedule_refresh()
+                    return
+            self._request_daemon_token(session.client_secret, self._daemon_resource)
+
+    def _schedule_refresh(self):
+        """Starts a timer refreshing the access token refresh_ahead
+        seconds before it expires. App-only sessions, which have no
+        refresh token, are renewed with their client secret"""
+        with self._refresh_lock:
+            self._cancel_refresh()
+            session = self._session
+            expires_at = _expires_at(session)
+            renewable = getattr(session, "refresh_token", None) is not None or (
+                self._daemon and getattr(session, "client_secret", None) is not None)
+            if self._refresh_ahead is None or expires_at is None or not renewable:
+                return
+
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                return
+            # Short-lived tokens are refreshed half way through their lifetime
+            delay = max(remaining - self._refresh_ahead, remaining / 2)
+            timer = threading.Timer(delay, self._refresh_in_background)
+            timer.daemon = True
+            self._refresh_timer = timer
+            timer.start()
+
+    def _cancel_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _refresh_in_background(self):
+        with self._refresh_lock:
+            # The timer was replaced by a refresh done while it waited
+            if self._refresh_timer is not threading.current_thread():
+                return
+            self._refresh_timer = None
+            try:
+                if self._session.refresh_token is None:
+                    self._renew_daemon_session(ahead=True)
+                else:
+                    self.refresh_token()
+            except Exception:
+                logger.warning("Background refresh of the access token failed, it will be refreshed "
+                               "by the next request after it expires", exc_info=True)
 
     def redeem_refresh_token(self, resource):
         """Redeem a refresh token against a new resource. Used
@@ -288,15 +512,40 @@ class AuthProvider(AuthProviderBase):
         }
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        response = self._http_provider.send(method="POST",
-                                            headers=headers,
-                                            url=self.auth_token_url,
-                                            data=params)
-        rcont = json.loads(response.content)
-        self._session.refresh_session(rcont["expires_in"],
-                                      "",
-                                      rcont["access_token"],
-                                      rcont["refresh_token"])
+        with self._refresh_lock:
+            response = self._send_token_request(self.auth_token_url, headers, params)
+            rcont = json.loads(response.content)
+            self._session.refresh_session(rcont["expires_in"],
+                                          "",
+                                          rcont["access_token"],
+                                          rcont["refresh_token"])
+            self._schedule_refresh()
+
+    def _send_token_request(self, url, headers, params):
+        """Sends a request to the token endpoint, notifying the hooks
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`:
+                The response to the request
+        """
+        # Correlates the request with the logs of the token endpoint
+        headers = dict(headers)
+        headers["client-request-id"] = str(uuid.uuid4())
+        hooks = self._hooks
+        event = hooks.request_started("POST", url, headers, source="auth") if hooks else None
+        try:
+            response = self._http_provider.send(method="POST",
+                                                headers=headers,
+                                                url=url,
+                                                data=params)
+        except Exception as e:
+            if event is not None:
+                hooks.request_failed(event, e)
+            raise
+
+        if event is not None:
+            hooks.request_finished(event, response)
+        return response
 
     def save_session(self, **save_session_kwargs):
         """Save the current session. Must have already
@@ -319,3 +568,11 @@ class AuthProvider(AuthProviderBase):
                 be passed to load_session.
         """
         self._session = self._session_type.load_session(**load_session_kwargs)
+        self._schedule_refresh()
+
+
+def _expires_at(session):
+    """The expiration time of a session, None when a custom session type
+    does not expose a numeric one"""
+    expires_at = getattr(session, "expires_at", None)
+    return expires_at if isinstance(expires_at, (int, float)) else None
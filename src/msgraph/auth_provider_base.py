@@ -121,6 +121,17 @@ class AuthProviderBase(object):
         """
         pass
 
+    async def authenticate_request_async(self, request):
+        """Awaitable version of :func:`authenticate_request`, used
+        by :class:`AsyncGraphClient<msgraph.async_client.AsyncGraphClient>`.
+        The default implementation calls :func:`authenticate_request`.
+
+        Args:
+            request (:class:`RequestBase<microsoft.request_base.RequestBase>`):
+                The request to authenticate
+        """
+        self.authenticate_request(request)
+
     @abc.abstractmethod
     def refresh_token(self):
         """Refresh the token currently used by the session"""
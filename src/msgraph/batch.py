@@ -0,0 +1,299 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+import time
+from .codec import StdlibJsonCodec
+from .error import GraphError, ErrorCode
+from .http_response import HttpResponse
+from .request import GraphResponse
+from .retry import retry_after
+
+
+class BatchRequest(object):
+
+    #: Maximum number of sub-requests Graph accepts in a single $batch call
+    MAX_BATCH_SIZE = 20
+
+    def __init__(self, client, max_retries=3, default_retry_after=1):
+        """Initialize a JSON batch. Requests added to the batch are
+        sent in as few POST /$batch calls as possible, at most
+        :attr:`MAX_BATCH_SIZE` at a time.
+
+        Args:
+            client (:class:`GraphClient<msgraph.client.GraphClient>`):
+                The client used to send the batch
+            max_retries (int): Defaults to 3, the number of times
+                sub-requests throttled with a 429 status are sent again
+            default_retry_after (float): Defaults to 1, the number of
+                seconds to wait before retrying throttled sub-requests
+                when Graph does not send a Retry-After header
+        """
+        self._client = client
+        self._max_retries = max_retries
+        self._default_retry_after = default_retry_after
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, request, method=None, content=None, depends_on=None, request_id=None):
+        """Adds a request to the batch
+
+        Args:
+            request (:class:`GraphRequest<msgraph.request.GraphRequest>`):
+                The request to add. Its URL must start with the client base URL
+            method (str): Defaults to the method of the request, or GET
+                if it has none
+            content (:class:`OdataObjectBase` or dict): Defaults to None,
+                the body of the request
+            depends_on (list of str): Defaults to None, ids of requests
+                in this batch that must complete before this one
+            request_id (str): Defaults to None, the id of the request in
+                the batch. If None, the next free number is used
+
+        Returns:
+            str: The id of the request in the batch
+        """
+        if request_id is None:
+            request_id = str(len(self._items) + 1)
+            while request_id in self._items:
+                request_id = str(int(request_id) + 1)
+        elif request_id in self._items:
+            raise ValueError("Duplicate batch request id: {}".format(request_id))
+
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self._items:
+                raise ValueError("Batch request {} depends on unknown request {}".format(request_id, dependency))
+
+        self._items[request_id] = {
+            "request": request,
+            "method": method or request.method or "GET",
+            "content": request._serialize_content(content),
+            "depends_on": depends_on
+        }
+        return request_id
+
+    def send(self):
+        """Sends all requests in the batch, splitting them in
+        chunks of at most :attr:`MAX_BATCH_SIZE` requests. Requests that
+        depend on each other are always sent in the same chunk.
+
+        Returns:
+            :class:`BatchResponse`: The responses to every request in the batch
+        """
+        results = {}
+        for chunk in self._chunks():
+            pending = chunk
+            attempt = 0
+            while pending:
+                throttled, retry_after = self._send_chunk(pending, results)
+                if not throttled or attempt >= self._max_retries:
+                    break
+                attempt += 1
+                time.sleep(retry_after)
+                pending = throttled
+
+        return BatchResponse(self._items.keys(), results, self._client.codec)
+
+    def _chunks(self):
+        """Groups the batch items in chunks of at most MAX_BATCH_SIZE ids,
+        keeping every dependency chain inside a single chunk"""
+        parent = {request_id: request_id for request_id in self._items}
+
+        def find(request_id):
+            while parent[request_id] != request_id:
+                parent[request_id] = parent[parent[request_id]]
+                request_id = parent[request_id]
+            return request_id
+
+        for request_id, item in self._items.items():
+            for dependency in item["depends_on"]:
+                parent[find(request_id)] = find(dependency)
+
+        groups = OrderedDict()
+        for request_id in self._items:
+            groups.setdefault(find(request_id), []).append(request_id)
+
+        chunks = []
+        for group in groups.values():
+            if len(group) > self.MAX_BATCH_SIZE:
+                raise ValueError("A dependency chain of {} requests does not fit in a single batch of {}"
+                                 .format(len(group), self.MAX_BATCH_SIZE))
+            for chunk in chunks:
+                if len(chunk) + len(group) <= self.MAX_BATCH_SIZE:
+                    chunk.extend(group)
+                    break
+            else:
+                chunks.append(list(group))
+
+        order = {request_id: index for index, request_id in enumerate(self._items)}
+        for chunk in chunks:
+            chunk.sort(key=order.get)
+        return chunks
+
+    def _relative_url(self, request):
+        url = request.request_url
+        base_url = self._client.base_url
+        if url.startswith(base_url):
+            url = url[len(base_url):]
+        return url if url.startswith("/") else "/" + url
+
+    def _envelope(self, request_ids):
+        """Builds the JSON body of a $batch request for the specified ids"""
+        id_set = set(request_ids)
+        requests = []
+        for request_id in request_ids:
+            item = self._items[request_id]
+            headers = {key: value for key, value in item["request"]._headers.items()
+                       if key.lower() != "authorization"}
+
+            sub_request = {
+                "id": request_id,
+                "method": item["method"],
+                "url": self._relative_url(item["request"])
+            }
+            if item["content"] is not None:
+                sub_request["body"] = item["content"]
+                headers.setdefault("Content-Type", "application/json")
+            if headers:
+                sub_request["headers"] = headers
+
+            depends_on = [dependency for dependency in item["depends_on"] if dependency in id_set]
+            if depends_on:
+                sub_request["dependsOn"] = depends_on
+
+            requests.append(sub_request)
+        return {"requests": requests}
+
+    def _send_chunk(self, request_ids, results):
+        """Sends a single $batch request and stores the result of
+        every sub-request in results
+
+        Returns:
+            tuple of (list of str, float): The ids to send again because
+                they were throttled, and the number of seconds to wait first
+        """
+        batch_request = self._client.request("$batch")
+        batch_request.method = "POST"
+        response = batch_request.send(self._envelope(request_ids))
+
+        throttled = []
+        wait = 0
+        statuses = {}
+        for sub_response in self._client.codec.loads(response.raw_content).get("responses", []):
+            request_id = sub_response["id"]
+            status = int(sub_response["status"])
+            headers = sub_response.get("headers", {})
+            statuses[request_id] = status
+
+            if status == 429:
+                throttled.append(request_id)
+                delay = retry_after(headers)
+                delay = self._default_retry_after if delay is None else delay
+                wait = max(wait, delay)
+
+            body = sub_response.get("body")
+            if body is not None and not isinstance(body, str):
+                body = self._client.codec.dumps(body)
+
+            try:
+                results[request_id] = HttpResponse(status, headers, body)
+            except GraphError as e:
+                results[request_id] = e
+            except ValueError:
+                # An error body which is not JSON (ex. a plain text 502)
+                # only fails its own request
+                message = body.decode("utf-8", "replace") if isinstance(body, bytes) else str(body)
+                results[request_id] = GraphError({"code": ErrorCode.Malformed, "message": message}, status, headers)
+
+        # Requests that failed only because a throttled dependency
+        # did not run (424 Failed Dependency) are retried with it
+        retry_ids = set(throttled)
+        added = True
+        while added:
+            added = False
+            for request_id in request_ids:
+                if (request_id not in retry_ids and statuses.get(request_id) == 424 and
+                        retry_ids.intersection(self._items[request_id]["depends_on"])):
+                    retry_ids.add(request_id)
+                    added = True
+
+        for request_id in request_ids:
+            if isinstance(results.get(request_id), HttpResponse):
+                self._items[request_id]["request"]._response = results[request_id]
+
+        return [request_id for request_id in request_ids if request_id in retry_ids], wait
+
+
+class BatchResponse(object):
+
+    def __init__(self, request_ids, results, codec=None):
+        """Initialize the responses of a :class:`BatchRequest`
+
+        Args:
+            request_ids (list of str): The ids of the requests in the batch
+            results (dict of (str, :class:`HttpResponse` or :class:`GraphError`)):
+                The response, or the error raised, for each request id
+            codec (:class:`JsonCodec<msgraph.codec.JsonCodec>`): Defaults to
+                None, the codec decoding the responses. If None, the standard
+                library json module is used
+        """
+        self._request_ids = list(request_ids)
+        self._results = results
+        self._codec = StdlibJsonCodec() if codec is None else codec
+
+    def __len__(self):
+        return len(self._request_ids)
+
+    def __iter__(self):
+        return iter(self._request_ids)
+
+    def __getitem__(self, request_id):
+        """Gets the response of a request in the batch
+
+        Args:
+            request_id (str): The id of the request in the batch
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`:
+                The response to the request
+
+        Raises:
+            :class:`GraphError<msgraph.error.GraphError>`: If Graph returned
+                an error for this request
+        """
+        result = self._results.get(request_id)
+        if result is None:
+            raise KeyError("No response received for batch request {}".format(request_id))
+        if isinstance(result, GraphError):
+            raise result
+        return result
+
+    def error(self, request_id):
+        """Gets the error returned for a request in the batch
+
+        Args:
+            request_id (str): The id of the request in the batch
+
+        Returns:
+            :class:`GraphError<msgraph.error.GraphError>`: The error,
+                or None if the request succeeded
+        """
+        result = self._results.get(request_id)
+        return result if isinstance(result, GraphError) else None
+
+    def get_page(self, request_id):
+        """Gets the response of a request in the batch as a page of objects
+
+        Args:
+            request_id (str): The id of the request in the batch
+
+        Returns:
+            :class:`GraphPage<msgraph.request.GraphPage>`: The page of objects
+        """
+        content = self[request_id].raw_content
+        return GraphResponse(self._codec.loads(content) if content else None).get_page()
+
@@ -0,0 +1,333 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlparse
+from .file_utils import atomic_write
+from .http_response import HttpResponse
+from .session import token_claims
+
+#: Methods after which the cached responses of the resource are dropped
+INVALIDATING_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+
+#: Response headers kept with a cached body
+_STORED_HEADERS = ("content-type", "etag", "request-id", "client-request-id")
+
+
+class CacheEntry(object):
+
+    def __init__(self, url, status, headers, body, expires_at):
+        """Initialize a cached response
+
+        Args:
+            url (str): The request URL the response was returned for
+            status (int): The status of the response
+            headers (dict of (str, str)): The headers of the response
+            body (bytes): The body of the response
+            expires_at (float): The time (time.time()) after which the
+                response has to be revalidated
+        """
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def etag(self):
+        """Gets the ETag of the response
+
+        Returns:
+            str: The ETag, or None
+        """
+        return self.headers.get("etag")
+
+    @property
+    def fresh(self):
+        """Gets whether the response can be used without revalidation
+
+        Returns:
+            bool: True until the entry expires
+        """
+        return time.time() < self.expires_at
+
+    @property
+    def size(self):
+        return len(self.body)
+
+    def to_response(self):
+        """Creates a response from the entry
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The response
+        """
+        return HttpResponse(self.status, dict(self.headers), self.body)
+
+
+class ResponseCache(object):
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=60, backend=None):
+        """Initialize an opt-in cache of GET responses, keyed by the
+        request URL (with its query string) and the principal of the
+        access token, so that users never share cached data.
+
+        Responses younger than ttl are returned without a request.
+        Older responses with an ETag are revalidated with If-None-Match,
+        and a 304 Not Modified is served from the cache. Writes (POST,
+        PUT, PATCH, DELETE) drop the cached responses of their resource.
+
+        Args:
+            max_entries (int): Defaults to 1024, the number of responses
+                kept in memory
+            max_bytes (int): Defaults to 64 MiB, the total size of the
+                bodies kept in memory. The least recently used responses
+                are evicted first
+            ttl (float): Defaults to 60, the number of seconds a response
+                is used without revalidation. Use 0 to revalidate every time
+            backend (:class:`FileCacheBackend`): Defaults to None, a second
+                level cache, such as the disk, used on memory misses
+        """
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._backend = backend
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+
+    @property
+    def stats(self):
+        """Gets the counters of the cache
+
+        Returns:
+            dict: The number of hits (fresh responses and 304 Not
+                Modified), misses and revalidations sent
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "revalidations": self._revalidations,
+                    "entries": len(self._entries), "bytes": self._size}
+
+    def key_for(self, url, headers):
+        """Gets the cache key of a request
+
+        Args:
+            url (str): The final request URL
+            headers (dict of (str, str)): The headers of the request
+
+        Returns:
+            tuple of (str, str): The principal and the URL
+        """
+        return principal_for(headers), url
+
+    def get(self, key):
+        """Gets a cached response
+
+        Args:
+            key (tuple): The key returned by :func:`key_for`
+
+        Returns:
+            :class:`CacheEntry`: The entry, which may need revalidation,
+                or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self._backend is not None:
+            entry = self._backend.get(key)
+            if entry is not None:
+                self._store(key, entry, persist=False)
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            elif entry.fresh:
+                self._hits += 1
+            elif entry.etag:
+                self._revalidations += 1
+            else:
+                self._misses += 1
+        return entry
+
+    def update(self, key, method, url, response, entry=None):
+        """Updates the cache with the response to a request
+
+        Args:
+            key (tuple): The key returned by :func:`key_for` for cacheable
+                GET requests, else None
+            method (str): The HTTP method of the request
+            url (str): The request URL
+            response (:class:`HttpResponse<msgraph.http_response.HttpResponse>`):
+                The response
+            entry (:class:`CacheEntry`): Defaults to None, the entry
+                returned by :func:`get` and revalidated by the request
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The
+                response to return, the cached one for a 304 Not Modified
+        """
+        if key is None:
+            if method in INVALIDATING_METHODS and 200 <= response.status < 300:
+                self.invalidate(url)
+            return response
+
+        if response.status == 304:
+            if entry is not None:
+                with self._lock:
+                    self._hits += 1
+                entry.expires_at = time.time() + self._ttl
+                self._store(key, entry)
+                return entry.to_response()
+            return response
+
+        if response.status == 200 and self._cacheable(response.headers):
+            headers = {name: value for name, value in _lower_items(response.headers) if name in _STORED_HEADERS}
+            if self._ttl > 0 or "etag" in headers:
+                body = response.raw_content or b""
+                if not isinstance(body, bytes):
+                    body = body.encode("utf-8")
+                self._store(key, CacheEntry(url, response.status, headers, body, time.time() + self._ttl))
+        return response
+
+    @staticmethod
+    def _cacheable(headers):
+        cache_control = dict(_lower_items(headers)).get("cache-control", "")
+        return "no-store" not in cache_control.lower()
+
+    def _store(self, key, entry, persist=True):
+        if entry.size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while len(self._entries) > self._max_entries or self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+        if persist and self._backend is not None:
+            self._backend.put(key, entry)
+
+    def invalidate(self, url):
+        """Drops the cached responses of a resource, for every principal
+        and every query string
+
+        Args:
+            url (str): The URL of the resource
+        """
+        path = _resource_path(url)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if _resource_path(entry.url) == path]:
+                self._size -= self._entries.pop(key).size
+        if self._backend is not None:
+            self._backend.invalidate(path)
+
+    def clear(self):
+        """Drops every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self._backend is not None:
+            self._backend.clear()
+
+
+class FileCacheBackend(object):
+
+    def __init__(self, directory):
+        """Initialize an on-disk cache backend, shared between processes.
+        Each response is a file holding a JSON header line followed by
+        the raw body, grouped in a directory per resource so that a
+        write drops all of its responses at once.
+
+        Args:
+            directory (str): The directory of the cache, created if needed
+        """
+        self._directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _resource_directory(self, path):
+        return os.path.join(self._directory, _digest(path))
+
+    def _path(self, key):
+        return os.path.join(self._resource_directory(_resource_path(key[1])), _digest(json.dumps(key)))
+
+    def get(self, key):
+        """Reads a cached response
+
+        Returns:
+            :class:`CacheEntry`: The entry, or None
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                header = json.loads(f.readline().decode("utf-8"))
+                body = f.read()
+        except (IOError, OSError, ValueError):
+            return None
+        return CacheEntry(header["url"], header["status"], header["headers"], body, header["expires_at"])
+
+    def put(self, key, entry):
+        """Writes a cached response"""
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        header = json.dumps({"url": entry.url, "status": entry.status, "headers": entry.headers,
+                             "expires_at": entry.expires_at})
+        atomic_write(path, header.encode("utf-8") + b"\n" + entry.body)
+
+    def invalidate(self, path):
+        """Deletes the cached responses of a resource
+
+        Args:
+            path (str): The path of the resource URL
+        """
+        shutil.rmtree(self._resource_directory(path), ignore_errors=True)
+
+    def clear(self):
+        """Deletes every cached response"""
+        for name in os.listdir(self._directory):
+            shutil.rmtree(os.path.join(self._directory, name), ignore_errors=True)
+
+
+def principal_for(headers):
+    """Identifies the principal a request is sent for, from its access
+    token: the tenant and object ids of a JWT, else a digest of the token
+
+    Args:
+        headers (dict of (str, str)): The headers of the request
+
+    Returns:
+        str: The principal, or an empty string for anonymous requests
+    """
+    authorization = dict(_lower_items(headers)).get("authorization")
+    if not authorization:
+        return ""
+    token = authorization.split(" ", 1)[-1]
+    claims = token_claims(token)
+    if claims.get("oid"):
+        return "{}/{}".format(claims.get("tid", ""), claims["oid"])
+    return _digest(token)
+
+
+def _resource_path(url):
+    return urlparse(url).path.rstrip("/").lower()
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _lower_items(headers):
+    return ((name.lower(), value) for name, value in (headers or {}).items())
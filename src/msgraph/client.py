@@ -3,11 +3,20 @@
 # 
 #  This file was generated and any changes will be overwritten.
 """
+from .codec import default_codec
+from .hooks import Hooks
 from .request import GraphRequest
+from .batch import BatchRequest
+from .page_iterator import GraphPageIterator
+from .delta import DeltaTracker, MemoryDeltaLinkStore
+from .fanout import map_items
+from .middleware import Pipeline, default_middleware, http_transport
+from .upload_session import UploadSession
 
 
 class GraphClient(object):
-    def __init__(self, base_url, auth_provider, http_provider):
+    def __init__(self, base_url, auth_provider, http_provider, rate_limiter=None, codec=None, hooks=None,
+                 cache=None, projection_policy=None, middleware=None, compression_threshold=None):
         """Initialize the :class:`GraphClient` to be
             used for all Graph API interactions
 
@@ -19,10 +28,50 @@ class GraphClient(object):
             http_provider(:class:`HttpProviderBase<msgraph.http_provider_base.HttpProviderBase>`):
                 The HTTP provider used by the client to send all 
                 requests to Graph
+            rate_limiter(:class:`AdaptiveRateLimiter<msgraph.rate_limiter.AdaptiveRateLimiter>`):
+                Defaults to None, the limiter pacing requests sent by the
+                client. It can be shared by several clients
+            codec(:class:`JsonCodec<msgraph.codec.JsonCodec>`):
+                Defaults to None, the codec encoding request bodies and
+                decoding responses. If None, orjson is used when it is
+                installed, else ujson, else the standard library
+            hooks(:class:`Hooks<msgraph.hooks.Hooks>`):
+                Defaults to None, the hooks notified of every request. If
+                None, the client has its own. The auth provider and the
+                retry policy of the HTTP provider report to them as well
+            cache(:class:`ResponseCache<msgraph.cache.ResponseCache>`):
+                Defaults to None, the cache of GET responses. Responses are
+                not cached if None
+            projection_policy(:class:`ProjectionPolicy<msgraph.query.ProjectionPolicy>`):
+                Defaults to None, the policy applied to GET requests sent
+                without $select
+            middleware(list of :class:`Middleware<msgraph.middleware.Middleware>`):
+                Defaults to None, the handlers every request is sent through,
+                in order. If None, :func:`default_middleware<msgraph.middleware.default_middleware>`.
+                The handlers of an AsyncGraphClient must implement send_async
+            compression_threshold(int): Defaults to None, the size in bytes
+                from which request bodies are sent gzipped. Bodies are not
+                compressed if None, check that the API accepts them first
         """
         self._base_url = base_url
+        self._codec = default_codec() if codec is None else codec
         self._auth_provider = auth_provider
         self._http_provider = http_provider
+        self._rate_limiter = None
+        self._retry_policy = getattr(http_provider, "retry_policy", None)
+        self.rate_limiter = rate_limiter
+        self._hooks = Hooks() if hooks is None else hooks
+        self._cache = cache
+        self._projection_policy = projection_policy
+        self._compression_threshold = compression_threshold
+        self._pipeline = None
+        self.middleware = default_middleware() if middleware is None else middleware
+
+        if self._retry_policy is not None:
+            self._retry_policy.add_listener(self._hooks.on_retry)
+        self._owns_auth_hooks = getattr(auth_provider, "hooks", False) is None
+        if self._owns_auth_hooks:
+            auth_provider.hooks = self._hooks
 
     @property
     def auth_provider(self):
@@ -52,6 +101,123 @@ class GraphClient(object):
     def http_provider(self, value):
         self._http_provider = value
 
+    @property
+    def rate_limiter(self):
+        """Gets and sets the limiter pacing requests sent by the client.
+        When the HTTP provider has a retry policy, the limiter also
+        observes the throttled attempts that the provider retries,
+        until the client is closed
+
+        Returns:
+            :class:`AdaptiveRateLimiter<msgraph.rate_limiter.AdaptiveRateLimiter>`:
+                The rate limiter, or None
+        """
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, value):
+        if self._retry_policy is not None:
+            if self._rate_limiter is not None:
+                self._retry_policy.remove_listener(self._rate_limiter.on_retry)
+            if value is not None:
+                self._retry_policy.add_listener(value.on_retry)
+        self._rate_limiter = value
+
+    @property
+    def hooks(self):
+        """Gets the hooks notified before every request is sent, after
+        its response is received, when it is retried and when it fails.
+        Register listeners with :func:`Hooks.add_listener<msgraph.hooks.Hooks.add_listener>`,
+        such as a :class:`HistogramCollector<msgraph.hooks.HistogramCollector>`
+
+        Returns:
+            :class:`Hooks<msgraph.hooks.Hooks>`: The hooks
+        """
+        return self._hooks
+
+    @property
+    def cache(self):
+        """Gets and sets the cache of GET responses, revalidated with
+        their ETag and invalidated by writes to the same resource
+
+        Returns:
+            :class:`ResponseCache<msgraph.cache.ResponseCache>`: The cache, or None
+        """
+        return self._cache
+
+    @cache.setter
+    def cache(self, value):
+        self._cache = value
+
+    @property
+    def projection_policy(self):
+        """Gets and sets the policy injecting a default $select in, or
+        warning about, GET requests sent without $select
+
+        Returns:
+            :class:`ProjectionPolicy<msgraph.query.ProjectionPolicy>`: The policy, or None
+        """
+        return self._projection_policy
+
+    @projection_policy.setter
+    def projection_policy(self, value):
+        self._projection_policy = value
+
+    @property
+    def compression_threshold(self):
+        """Gets and sets the size in bytes from which request bodies
+        are sent with Content-Encoding: gzip
+
+        Returns:
+            int: The threshold, or None if bodies are not compressed
+        """
+        return self._compression_threshold
+
+    @compression_threshold.setter
+    def compression_threshold(self, value):
+        self._compression_threshold = value
+
+    @property
+    def middleware(self):
+        """Gets and sets the handlers every request is sent through, the
+        first one receiving the request first. Add a handler by setting a
+        new list (ex. client.middleware = [MyHandler()] + client.middleware)
+
+        Returns:
+            list of :class:`Middleware<msgraph.middleware.Middleware>`: The handlers
+        """
+        return list(self._pipeline.handlers)
+
+    @middleware.setter
+    def middleware(self, value):
+        self._pipeline = self._create_pipeline(value)
+
+    def _create_pipeline(self, handlers):
+        return Pipeline(handlers, http_transport)
+
+    @property
+    def pipeline(self):
+        """Gets the pipeline sending the requests of the client
+
+        Returns:
+            :class:`Pipeline<msgraph.middleware.Pipeline>`: The pipeline
+        """
+        return self._pipeline
+
+    @property
+    def codec(self):
+        """Gets and sets the codec encoding request bodies and
+        decoding responses
+
+        Returns:
+            :class:`JsonCodec<msgraph.codec.JsonCodec>`: The JSON codec
+        """
+        return self._codec
+
+    @codec.setter
+    def codec(self, value):
+        self._codec = value
+
     @property
     def base_url(self):
         """Gets and sets the base URL used by the client to make requests
@@ -65,6 +231,32 @@ class GraphClient(object):
     def base_url(self, value):
         self._base_url = value
 
+    def close(self):
+        """Closes the HTTP provider used by the client, releasing
+        any pooled connections it holds, and unregisters the client
+        from the retry policy and auth provider it may share
+        """
+        self._unregister()
+        self._http_provider.close()
+
+    def _unregister(self):
+        """Removes the listeners of the client from the retry policy and
+        auth provider it may share with other clients"""
+        if self._retry_policy is not None:
+            self._retry_policy.remove_listener(self._hooks.on_retry)
+            if self._rate_limiter is not None:
+                self._retry_policy.remove_listener(self._rate_limiter.on_retry)
+            self._retry_policy = None
+        if self._owns_auth_hooks and self._auth_provider.hooks is self._hooks:
+            self._auth_provider.hooks = None
+        self._owns_auth_hooks = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def request(self, resource):
         """Creates API request.
         :param resource: API resource.
@@ -75,7 +267,16 @@ class GraphClient(object):
             resource = self.base_url + resource
         return GraphRequest(resource, self)
 
-    def get_page(self, api_resource, select=None, filter=None, top=None, order_by=None, count=None):
+    def batch(self, max_retries=3):
+        """Creates a JSON batch to send many requests in few round trips.
+        :param max_retries: number of times throttled sub-requests are sent again.
+        :type max_retries: int.
+        :rtype: BatchRequest object.
+        """
+        return BatchRequest(self, max_retries=max_retries)
+
+    def get_page(self, api_resource, select=None, filter=None, top=None, order_by=None, count=None, stream=False,
+                 query=None):
         """Returns page of objects returned by API request.
         :param api_resource: API resource.
         :param select: attributes returned in results
@@ -83,13 +284,105 @@ class GraphClient(object):
         :param top: page size for results
         :param order_by: order results by attribute
         :param count: return count of objects found
+        :param stream: yield objects while the response is read, for large pages
+        :param query: Query built with msgraph.query, other options override its options
         :type api_resource: string.
-        :rtype: GraphPage object.
+        :rtype: GraphPage object, or StreamingGraphPage object if stream is set.
         """
         request = self.request(api_resource)
+        if query is not None:
+            query.apply(request)
         request.set_query_options(select=select, filter=filter, top=top, order_by=order_by, count=count)
 
-        return request.get()
+        return request.get(stream=stream)
+
+    def iter_all(self, api_resource, select=None, filter=None, top=None, order_by=None,
+                 max_items=None, max_pages=None, next_link=None, prefetch=True, query=None):
+        """Returns an iterator over every object of a collection, following
+        @odata.nextLink page by page.
+        :param api_resource: API resource.
+        :param select: attributes returned in results
+        :param filter: filter results by condition
+        :param top: page size for results
+        :param order_by: order results by attribute
+        :param max_items: maximum number of objects to return
+        :param max_pages: maximum number of pages to fetch
+        :param next_link: link saved from GraphPageIterator.next_link to resume from,
+            api_resource and query options are ignored when it is set
+        :param prefetch: fetch the next page in the background
+        :param query: Query built with msgraph.query, other options override its options
+        :type api_resource: string.
+        :rtype: GraphPageIterator object.
+        """
+        if next_link:
+            request = self.request(next_link)
+        else:
+            request = self.request(api_resource)
+            if query is not None:
+                query.apply(request)
+            request.set_query_options(select=select, filter=filter, top=top, order_by=order_by)
+
+        return GraphPageIterator(request, max_items=max_items, max_pages=max_pages, prefetch=prefetch)
+
+    def iter_batches(self, api_resource, select=None, filter=None, top=None, order_by=None, schema=None,
+                     max_pages=None, prefetch=True):
+        """Returns a generator of an Arrow record batch per page of a
+        collection, following @odata.nextLink. Batches are built from the
+        decoded JSON without creating model objects. Requires pyarrow.
+        :param api_resource: API resource.
+        :param select: attributes returned in results, and columns of the batches
+        :param filter: filter results by condition
+        :param top: page size for results
+        :param order_by: order results by attribute
+        :param schema: pyarrow.Schema of the batches, inferred if None
+        :param max_pages: maximum number of pages to fetch
+        :param prefetch: fetch the next page in the background
+        :type api_resource: string.
+        :rtype: generator of pyarrow.RecordBatch.
+        """
+        iterator = self.iter_all(api_resource, select=select, filter=filter, top=top, order_by=order_by,
+                                 max_pages=max_pages, prefetch=prefetch)
+        return iterator.iter_batches(schema=schema)
+
+    def map(self, func_or_template, items, concurrency=8, ordered=True, batch=False, select=None, max_pending=None):
+        """Runs a function, or fetches a resource, for every item on a thread
+        pool, ex. client.map("users/{}/manager", user_ids, concurrency=16).
+        Items are read lazily: at most max_pending are queued or in flight.
+        An error only fails its own item.
+        :param func_or_template: function called as func(client, item), or a resource
+            template formatted with each item and fetched. The value of a template is
+            the first object of the response, or None if it is empty
+        :param items: iterable of items, ex. ids
+        :param concurrency: number of worker threads
+        :param ordered: yield results in the order of the items, else as they complete
+        :param batch: send templates in $batch requests of 20 items, each
+            worker sending one $batch at a time. Batched items go through the
+            projection policy, but not the response cache or the middleware
+        :param select: attributes returned for templates
+        :param max_pending: number of items (or $batch requests) queued or in flight,
+            2 * concurrency if None
+        :type func_or_template: callable or string.
+        :rtype: generator of MapResult objects.
+        """
+        return map_items(self, func_or_template, items, concurrency=concurrency, ordered=ordered, batch=batch,
+                         select=select, max_pending=max_pending)
+
+    def delta(self, api_resource, store=None, key=None, select=None, filter=None, top=None, prefetch=True):
+        """Returns a tracker of the changes made to a collection, through its
+        delta function. Iterate over tracker.changes() to sync.
+        :param api_resource: delta function of the collection, ex. "users/delta".
+        :param store: DeltaLinkStore keeping the deltaLink between syncs, in memory if None.
+        :param key: name of the deltaLink in the store.
+        :param select: attributes tracked
+        :param filter: filter results by condition
+        :param top: page size for results
+        :param prefetch: fetch the next page in the background
+        :type api_resource: string.
+        :rtype: DeltaTracker object.
+        """
+        store = MemoryDeltaLinkStore() if store is None else store
+        return DeltaTracker(self, api_resource, store, key=key, select=select, filter=filter, top=top,
+                            prefetch=prefetch)
 
     def get_object(self, api_resource, select=None):
         """Returns first object in page returned by API request.
@@ -127,6 +420,44 @@ class GraphClient(object):
 
         return next(page.objects())
 
+    def upload_large_file(self, api_resource, path, chunk_size=10 * UploadSession.CHUNK_MULTIPLE,
+                          progress_callback=None, conflict_behavior=None, state_path=None, max_workers=1):
+        """Uploads a file of any size through a resumable upload session and
+        returns the uploaded drive item. An interrupted upload resumes
+        where it stopped when called again with the same arguments.
+        :param api_resource: drive item to upload to, ex. "me/drive/root:/folder/file.txt:".
+        :type api_resource: string.
+        :param path: local path of the file to upload.
+        :type path: string.
+        :param chunk_size: size of every chunk, a multiple of 320 KiB.
+        :param progress_callback: called with bytes uploaded and file size after every chunk.
+        :param conflict_behavior: "rename", "replace" or "fail".
+        :param state_path: file in which the upload session is saved for resuming.
+        :param max_workers: number of chunks uploaded at the same time.
+        :rtype: OdataObjectBase object"""
+        session = UploadSession(self, api_resource, path, chunk_size=chunk_size,
+                                progress_callback=progress_callback, conflict_behavior=conflict_behavior,
+                                state_path=state_path, max_workers=max_workers)
+        return session.upload()
+
+    def download_item(self, api_resource, path, max_workers=4, verify=True, **ranged_options):
+        """Downloads the content of a drive item with parallel Range requests,
+        resuming a previous partial download of the same item.
+        :param api_resource: drive item to download, ex. "me/drive/items/{id}".
+        :type api_resource: string.
+        :param path: local path to save the file.
+        :type path: string.
+        :param max_workers: number of ranges downloaded at the same time.
+        :param verify: check the file against the sha1Hash/quickXorHash of the item.
+        :rtype: HttpResponse object"""
+        hashes = None
+        if verify:
+            item = self.get_object(api_resource, select="file")
+            hashes = (item.serialized().get("file") or {}).get("hashes")
+
+        request = self.request("{}/content".format(api_resource))
+        return request.download_item(path, max_workers=max_workers, hashes=hashes, **ranged_options)
+
     def update_object(self, api_resource, content):
         request = self.request(api_resource)
         request.patch(content)
@@ -0,0 +1,104 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import abc
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec(object):
+    """Encodes request bodies to and decodes response bodies from
+    JSON. Bodies are bytes on both sides, so responses are never
+    decoded to str before being parsed."""
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def dumps(self, obj):
+        """Encodes an object to JSON
+
+        Args:
+            obj (dict): The object to encode
+
+        Returns:
+            bytes: The UTF-8 encoded JSON
+        """
+        pass
+
+    @abc.abstractmethod
+    def loads(self, data):
+        """Decodes JSON
+
+        Args:
+            data (bytes or str): The JSON to decode
+
+        Returns:
+            The decoded object
+        """
+        pass
+
+
+class StdlibJsonCodec(JsonCodec):
+    """Codec using the json module of the standard library"""
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec using orjson (pip install msgraph[fast-json])"""
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson (pip install orjson).")
+        self._fallback = StdlibJsonCodec()
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects integers over 64 bits and non-str keys
+            return self._fallback.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """Codec using ujson"""
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("UjsonCodec requires ujson (pip install ujson).")
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+def default_codec():
+    """Gets the fastest codec available: orjson, then ujson, then the
+    standard library
+
+    Returns:
+        :class:`JsonCodec`: The codec
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return StdlibJsonCodec()
@@ -0,0 +1,112 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from urllib.parse import urlparse, parse_qsl
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def select_columns(url):
+    """Gets the columns requested by the $select option of a URL
+
+    Args:
+        url (str): The request URL
+
+    Returns:
+        list of str: The selected properties, or None without $select
+    """
+    for key, value in parse_qsl(urlparse(url).query):
+        if key == "$select":
+            return _split(value)
+    return None
+
+
+def infer_columns(rows, select=None):
+    """Gets the columns of a set of objects: the selected properties
+    when $select was used, else every property in the order they first
+    appear, without the @odata annotations
+
+    Args:
+        rows (list of dict): The decoded JSON objects
+        select (str or list of str): Defaults to None, the $select option
+
+    Returns:
+        list of str: The columns
+    """
+    if select:
+        return _split(select) if isinstance(select, str) else list(select)
+
+    columns = {}
+    for row in rows:
+        for key in row:
+            if key not in columns and not key.startswith("@odata."):
+                columns[key] = None
+    return list(columns)
+
+
+def to_columns(rows, columns):
+    """Transposes decoded JSON objects into columns. Missing properties
+    are None, nested objects and lists are kept as is
+
+    Args:
+        rows (list of dict): The decoded JSON objects
+        columns (list of str): The columns
+
+    Returns:
+        dict of (str, list): The values of each column, in row order
+    """
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+
+def to_arrow_table(rows, select=None, schema=None):
+    """Builds an Arrow table from decoded JSON objects
+
+    Args:
+        rows (list of dict): The decoded JSON objects
+        select (str or list of str): Defaults to None, the columns. If
+            None, they are inferred from the rows
+        schema (pyarrow.Schema): Defaults to None, the schema of the table,
+            which also sets its columns. If None, types are inferred
+
+    Returns:
+        pyarrow.Table: The table
+    """
+    _require_pyarrow()
+    columns = schema.names if schema is not None else infer_columns(rows, select)
+    return pyarrow.Table.from_pydict(to_columns(rows, columns), schema=schema)
+
+
+def iter_record_batches(pages, select=None, schema=None):
+    """Generator of an Arrow record batch per page. The columns are those
+    of the schema, else of select, else those inferred from the first
+    page. Types are inferred page by page unless a schema is set, so pass
+    one to get batches that can always be concatenated
+
+    Args:
+        pages (iterable of :class:`GraphPage<msgraph.request.GraphPage>`):
+            The pages
+        select (str or list of str): Defaults to None, the columns
+        schema (pyarrow.Schema): Defaults to None, the schema of the batches
+
+    Yields:
+        pyarrow.RecordBatch: The objects of a page
+    """
+    _require_pyarrow()
+    columns = schema.names if schema is not None else None
+    for page in pages:
+        if columns is None:
+            columns = infer_columns(page.data, select)
+        yield pyarrow.RecordBatch.from_pydict(to_columns(page.data, columns), schema=schema)
+
+
+def _split(select):
+    return [column.strip() for column in select.split(",") if column.strip()]
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("Arrow export requires pyarrow (pip install pyarrow).")
@@ -0,0 +1,150 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import gzip
+import zlib
+from .middleware import Middleware
+from .http_response import HttpResponse, StreamingHttpResponse
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+#: The content codings accepted in responses, br only when it can be decoded
+ACCEPT_ENCODING = "gzip, br" if brotli is not None else "gzip"
+
+
+def compress_request(headers, body, min_size=None, level=6):
+    """Prepares the headers and body of a request for compression. The
+    Accept-Encoding header is added to headers, unless it is set
+
+    Args:
+        headers (dict of (str, str)): The headers of the request
+        body (bytes): The body of the request, or None
+        min_size (int): Defaults to None, the size from which the body
+            is gzipped. If None, it is sent as is
+        level (int): Defaults to 6, the gzip compression level
+
+    Returns:
+        tuple of (dict, bytes): The headers and body to send. A gzipped
+            body is sent with a copy of the headers, with Content-Encoding
+    """
+    names = [name.lower() for name in headers]
+    if "accept-encoding" not in names:
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if min_size is None or not body or len(body) < min_size or "content-encoding" in names:
+        return headers, body
+
+    headers = dict(headers)
+    headers["Content-Encoding"] = "gzip"
+    return headers, gzip.compress(body, compresslevel=level)
+
+
+def iter_decompressed(chunks, encoding):
+    """Decompresses a body as its chunks arrive
+
+    Args:
+        chunks (iterable of bytes): The encoded body
+        encoding (str): The Content-Encoding of the body, gzip or br
+
+    Yields:
+        bytes: The decoded body
+    """
+    decompressor = _decompressor(encoding)
+    if decompressor is None:
+        raise ValueError("Unsupported content encoding: {}".format(encoding))
+    decompress = getattr(decompressor, "decompress", None) or decompressor.process
+    for chunk in chunks:
+        data = decompress(chunk)
+        if data:
+            yield data
+    flush = getattr(decompressor, "flush", None)
+    if flush is not None:
+        data = flush()
+        if data:
+            yield data
+
+
+def decompress_response(response):
+    """Decodes a response whose body still has a content coding, keeping
+    streamed responses streamed
+
+    Args:
+        response (:class:`HttpResponse<msgraph.http_response.HttpResponse>`):
+            The response
+
+    Returns:
+        :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The
+            decoded response, or response if it has no supported coding
+    """
+    headers = response.headers or {}
+    encoding = None
+    for name, value in headers.items():
+        if name.lower() == "content-encoding":
+            encoding = value.strip().lower()
+    if not encoding or _decompressor(encoding) is None:
+        return response
+
+    headers = {name: value for name, value in headers.items()
+               if name.lower() not in ("content-encoding", "content-length")}
+    if isinstance(response, StreamingHttpResponse) and response._raw_content is None:
+        return StreamingHttpResponse(response.status, headers, iter_decompressed(response.iter_content(), encoding),
+                                     response.close)
+    content = response.raw_content
+    if not isinstance(content, bytes):
+        return response
+    return HttpResponse(response.status, headers, b"".join(iter_decompressed([content], encoding)))
+
+
+def _decompressor(encoding):
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.Decompressor()
+    return None
+
+
+class CompressionHandler(Middleware):
+
+    def __init__(self, level=6, decode_responses=False):
+        """Initialize a handler sending Accept-Encoding: gzip, br, and
+        gzipping request bodies from the
+        :attr:`compression_threshold<msgraph.client.GraphClient.compression_threshold>`
+        of the client
+
+        Args:
+            level (int): Defaults to 6, the gzip compression level
+            decode_responses (bool): Defaults to False. If True, responses
+                are decoded by the handler, incrementally when streamed.
+                Only needed with HTTP providers returning encoded bodies:
+                :class:`HttpProvider<msgraph.http_provider.HttpProvider>`
+                and :class:`AsyncHttpProvider<msgraph.async_http_provider.AsyncHttpProvider>`
+                decode them as they are read
+        """
+        self.level = level
+        self.decode_responses = decode_responses
+
+    def send(self, request, next):
+        if request.download_path is not None:
+            return next(request)
+        response = next(self._compress(request))
+        return decompress_response(response) if self.decode_responses else response
+
+    async def send_async(self, request, next):
+        if request.download_path is not None:
+            return await next(request)
+        response = await next(self._compress(request))
+        return decompress_response(response) if self.decode_responses else response
+
+    def _compress(self, request):
+        headers, body = compress_request(request.headers, request.body, request.client.compression_threshold,
+                                         self.level)
+        if body is not request.body:
+            # Content-Encoding only applies to this body
+            return request.copy(body=body, headers=headers)
+        return request
@@ -0,0 +1,214 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import abc
+from .error import GraphError
+from .key_value_store import JsonFileStore, SqliteStore
+from .page_iterator import GraphPageIterator
+
+
+class DeltaTracker(object):
+
+    def __init__(self, client, api_resource, store, key=None, select=None, filter=None, top=None, prefetch=True):
+        """Initialize an incremental sync of a collection through its
+        delta function (ex. "users/delta", "me/drive/root/delta").
+
+        The first sync returns every object. It walks every nextLink page
+        and saves the final @odata.deltaLink in the store. Later syncs
+        resume from that link and return only the objects created, changed
+        or removed since then.
+
+        Args:
+            client (:class:`GraphClient<msgraph.client.GraphClient>`):
+                The client used to send the requests
+            api_resource (str): The delta function of the collection
+            store (:class:`DeltaLinkStore`): The store keeping the deltaLink
+                between syncs
+            key (str): Defaults to None, the name of the deltaLink in the
+                store. If None, the api_resource and query options are used
+            select (str): Default None, comma-separated list of properties
+                to track
+            filter (str): Default None, an odata compliant filter, for the
+                delta functions that support one
+            top (int): Default None, the page size
+            prefetch (bool): Defaults to True, fetch the next page in the
+                background while the current page is being consumed
+        """
+        self._client = client
+        self._api_resource = api_resource
+        self._store = store
+        self._select = select
+        self._filter = filter
+        self._top = top
+        self._prefetch = prefetch
+        if key is None:
+            key = api_resource
+            if select:
+                key += "?$select=" + select
+            if filter:
+                key += ("&" if select else "?") + "$filter=" + filter
+        self._key = key
+        self._resynced = False
+
+    @property
+    def key(self):
+        """Gets the name of the deltaLink in the store
+
+        Returns:
+            str: The key
+        """
+        return self._key
+
+    @property
+    def delta_link(self):
+        """Gets the deltaLink the next sync starts from
+
+        Returns:
+            str: The deltaLink, or None before the first complete sync
+        """
+        return self._store.load(self._key)
+
+    @property
+    def resynced(self):
+        """Gets whether the last sync had to start over because Graph
+        expired the saved deltaLink (410 Gone). Every object is returned
+        again by such a sync, and local state should be reconciled with it
+
+        Returns:
+            bool: True if the last sync was a full resync
+        """
+        return self._resynced
+
+    def changes(self):
+        """Generator over the objects changed since the last sync, or
+        over every object for the first sync. Removed objects are
+        returned as tombstones with an "@removed" property, see
+        :func:`removed_reason`.
+
+        The deltaLink is only saved once the last page has been
+        consumed, so an interrupted sync restarts from the previous one.
+
+        Yields:
+            :class:`OdataObjectBase`: The changed objects
+        """
+        self._resynced = False
+        link = self._store.load(self._key)
+        try:
+            for graph_object in self._walk(link):
+                yield graph_object
+        except GraphError as e:
+            if e.status_code != 410 or link is None:
+                raise
+            # The deltaLink expired, Graph requires a full sync
+            self._store.delete(self._key)
+            self._resynced = True
+            for graph_object in self._walk(None):
+                yield graph_object
+
+    def reset(self):
+        """Forgets the saved deltaLink, so that the next sync returns
+        every object"""
+        self._store.delete(self._key)
+
+    def _walk(self, link):
+        if link:
+            request = self._client.request(link)
+        else:
+            request = self._client.request(self._api_resource)
+            request.set_query_options(select=self._select, filter=self._filter, top=self._top)
+
+        delta_link = None
+        for page in GraphPageIterator(request, prefetch=self._prefetch).pages():
+            for graph_object in page.objects():
+                yield graph_object
+            delta_link = page.delta_link or delta_link
+
+        if delta_link:
+            self._store.save(self._key, delta_link)
+
+
+def removed_reason(graph_object):
+    """Gets why a delta query returned an object as removed
+
+    Args:
+        graph_object (:class:`OdataObjectBase`): An object returned by
+            :func:`DeltaTracker.changes`
+
+    Returns:
+        str: The reason, such as "changed" (removed from the scope of the
+            query) or "deleted", or None if the object was not removed
+    """
+    removed = graph_object.serialized().get("@removed")
+    if removed is None:
+        return None
+    return removed.get("reason", "deleted") if isinstance(removed, dict) else "deleted"
+
+
+class DeltaLinkStore(object):
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def load(self, key):
+        """Loads a deltaLink
+
+        Args:
+            key (str): The name of the deltaLink
+
+        Returns:
+            str: The deltaLink, or None if none was saved
+        """
+        pass
+
+    @abc.abstractmethod
+    def save(self, key, delta_link):
+        """Saves a deltaLink
+
+        Args:
+            key (str): The name of the deltaLink
+            delta_link (str): The deltaLink
+        """
+        pass
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Deletes a deltaLink
+
+        Args:
+            key (str): The name of the deltaLink
+        """
+        pass
+
+
+class MemoryDeltaLinkStore(DeltaLinkStore):
+    """Keeps deltaLinks for the life of the process"""
+
+    def __init__(self):
+        self._links = {}
+
+    def load(self, key):
+        return self._links.get(key)
+
+    def save(self, key, delta_link):
+        self._links[key] = delta_link
+
+    def delete(self, key):
+        self._links.pop(key, None)
+
+
+class FileDeltaLinkStore(JsonFileStore, DeltaLinkStore):
+    """Keeps deltaLinks in a JSON file, which can be shared by processes.
+    See :class:`JsonFileStore<msgraph.key_value_store.JsonFileStore>`"""
+
+
+class SqliteDeltaLinkStore(SqliteStore, DeltaLinkStore):
+
+    def __init__(self, path, table="delta_links"):
+        """Initialize a store keeping deltaLinks in a SQLite database,
+        which can be shared by processes
+
+        Args:
+            path (str): The path of the database
+            table (str): Defaults to "delta_links", the name of the table
+        """
+        super(SqliteDeltaLinkStore, self).__init__(path, table, "delta_link")
@@ -7,19 +7,22 @@ from __future__ import unicode_literals
 
 class GraphError(Exception):
 
-    def __init__(self, prop_dict, status_code):
+    def __init__(self, prop_dict, status_code, headers=None):
         """Initialize a GraphError given the JSON
         error response dictionary, and the HTTP status code
 
         Args:
             prop_dict (dict): A dictionary containing the response from Graph
             status_code (int): The HTTP status code (ex. 200, 201, etc.)
+            headers (dict of (str, str)): Defaults to None, the headers
+                of the response
         """
         error_code = prop_dict["code"] if "code" in prop_dict else ErrorCode.Malformed
         message = prop_dict["message"] if "message" in prop_dict else "The received response was malformed."
 
         super().__init__(str(error_code) + " - " + message)
         self._status_code = status_code
+        self._headers = headers if headers is not None else {}
         self._error_code = error_code
         self._message = message
 
@@ -28,6 +31,11 @@ class GraphError(Exception):
         """The HTTP status code."""
         return self._status_code
 
+    @property
+    def headers(self):
+        """The headers of the response, such as Retry-After."""
+        return self._headers
+
     @property
     def code(self):
         """The Graph error code sent back in the response. Possible codes can be found in the :class:`ErrorCode` enum.
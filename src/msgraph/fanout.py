@@ -0,0 +1,228 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+import asyncio
+from .batch import BatchRequest
+
+
+class MapResult(object):
+    __slots__ = ("index", "item", "value", "error")
+
+    def __init__(self, index, item, value=None, error=None):
+        """Initialize the result of :func:`GraphClient.map<msgraph.client.GraphClient.map>`
+        for an item
+
+        Args:
+            index (int): The position of the item in the input
+            item: The item
+            value: The value returned for the item
+            error (Exception): The error raised for the item, or None
+        """
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        """Gets whether the item succeeded
+
+        Returns:
+            bool: True if no error was raised
+        """
+        return self.error is None
+
+    def get(self):
+        """Gets the value of the item
+
+        Returns:
+            The value
+
+        Raises:
+            Exception: The error raised for the item
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        return "MapResult(index={!r}, item={!r}, value={!r}, error={!r})".format(self.index, self.item, self.value,
+                                                                               self.error)
+
+
+def map_items(client, func_or_template, items, concurrency=8, ordered=True, batch=False, select=None,
+              max_pending=None):
+    """Generator running a function, or fetching a resource, for every
+    item on a thread pool. See :func:`GraphClient.map<msgraph.client.GraphClient.map>`
+
+    Yields:
+        :class:`MapResult`: The result of each item
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    units = enumerate(items)
+    if batch:
+        if not isinstance(func_or_template, str):
+            raise ValueError("Only resource templates can be sent in $batch requests")
+        units = _chunks(units, BatchRequest.MAX_BATCH_SIZE)
+
+        def work(chunk):
+            return _fetch_batch(client, func_or_template, select, chunk)
+    else:
+        func = _resolve(func_or_template, select)
+
+        def work(unit):
+            index, item = unit
+            try:
+                return [MapResult(index, item, func(client, item))]
+            except Exception as e:
+                return [MapResult(index, item, error=e)]
+
+    max_pending = concurrency * 2 if max_pending is None else max(max_pending, concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque() if ordered else set()
+    try:
+        # Items are only read as work completes, so that at most
+        # max_pending units are queued or running at any time
+        for unit in islice(units, max_pending):
+            _add(pending, executor.submit(work, unit))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for unit in islice(units, len(done)):
+                _add(pending, executor.submit(work, unit))
+
+            for future in done:
+                for result in future.result():
+                    yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def map_items_async(client, func_or_template, items, concurrency=8, ordered=True, select=None,
+                          max_pending=None):
+    """Asynchronous generator running a coroutine function, or fetching a
+    resource, for every item with at most concurrency items in flight.
+    See :func:`AsyncGraphClient.map<msgraph.async_client.AsyncGraphClient.map>`
+
+    Yields:
+        :class:`MapResult`: The result of each item
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    func = _resolve_async(func_or_template, select)
+    units = enumerate(items)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def work(index, item):
+        async with semaphore:
+            try:
+                return MapResult(index, item, await func(client, item))
+            except Exception as e:
+                return MapResult(index, item, error=e)
+
+    max_pending = concurrency * 2 if max_pending is None else max(max_pending, concurrency)
+    pending = deque() if ordered else set()
+    try:
+        for index, item in islice(units, max_pending):
+            _add(pending, asyncio.ensure_future(work(index, item)))
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+                await done[0]
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for index, item in islice(units, len(done)):
+                _add(pending, asyncio.ensure_future(work(index, item)))
+
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _add(pending, future):
+    if isinstance(pending, deque):
+        pending.append(future)
+    else:
+        pending.add(future)
+
+
+def _chunks(units, size):
+    while True:
+        chunk = list(islice(units, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _resolve(func_or_template, select):
+    if not isinstance(func_or_template, str):
+        return func_or_template
+
+    def fetch(client, item):
+        request = client.request(func_or_template.format(item))
+        request.set_query_options(select=select)
+        return _first(request.get())
+    return fetch
+
+
+def _resolve_async(func_or_template, select):
+    if not isinstance(func_or_template, str):
+        return func_or_template
+
+    async def fetch(client, item):
+        request = client.request(func_or_template.format(item))
+        request.set_query_options(select=select)
+        return _first(await request.get())
+    return fetch
+
+
+def _first(page):
+    """The value of a fetched item: the first object of its page, or None
+    if the response is empty, in every mode"""
+    return page[0] if len(page) else None
+
+
+def _fetch_batch(client, template, select, chunk):
+    """Fetches the resources of up to MAX_BATCH_SIZE items in a single
+    $batch request. The projection policy of the client applies to every
+    item, but the response cache does not: the $batch is a POST"""
+    batch = BatchRequest(client)
+    request_ids = []
+    for index, item in chunk:
+        request = client.request(template.format(item))
+        request.method = "GET"
+        request.set_query_options(select=select)
+        if client.projection_policy is not None:
+            client.projection_policy.apply(request)
+        request_ids.append(batch.add(request))
+
+    try:
+        response = batch.send()
+    except Exception as e:
+        return [MapResult(index, item, error=e) for index, item in chunk]
+
+    results = []
+    for (index, item), request_id in zip(chunk, request_ids):
+        try:
+            page = response.get_page(request_id)
+            results.append(MapResult(index, item, _first(page)))
+        except Exception as e:
+            results.append(MapResult(index, item, error=e))
+    return results
@@ -0,0 +1,73 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from contextlib import contextmanager
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def atomic_write(path, data):
+    """Writes a file so that readers only ever see either its old or
+    its new content, even if the process crashes mid-write. The data
+    is written to a temporary file in the same directory, flushed to
+    disk and renamed over the target.
+
+    Args:
+        path (str): The path of the file to write
+        data (bytes or str): The new content of the file
+    """
+    if not isinstance(data, bytes):
+        data = data.encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """Holds an exclusive lock shared with other processes for the
+    duration of a with block. The lock is taken on a "<path>.lock" file
+    next to the file, so that it is not lost when the file is replaced
+    by :func:`atomic_write`. Locks are advisory: only the processes
+    using this function are excluded.
+
+    Args:
+        path (str): The path of the file to lock
+    """
+    with open(path + ".lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
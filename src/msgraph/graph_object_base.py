@@ -4,6 +4,73 @@ Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the M
 
 
 class GraphObjectBase(object):
+    # Models hold their raw dict, and the model objects decoded from it.
+    # Generated models declare __slots__ too, so that instances carry no
+    # per-instance __dict__
+    __slots__ = ("_prop_dict", "_decoded")
+
+    def __init__(self, prop_dict=None):
+        self._prop_dict = {} if prop_dict is None else prop_dict
+        self._decoded = None
+
+    def _get_decoded(self, name, raw, decode):
+        """Gets the object decoded from the raw value of a property. The
+        raw dict is left as is: it is often shared with the page it was
+        read from, which must stay plain JSON
+
+        Args:
+            name (str): The name of the property
+            raw: The raw value of the property
+            decode (callable): Decodes the raw value
+
+        Returns:
+            The decoded object, the same until the property is set again
+        """
+        # Generated models set _prop_dict without calling __init__
+        decoded = getattr(self, "_decoded", None)
+        if decoded is None:
+            decoded = self._decoded = {}
+        cached = decoded.get(name)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        value = decode(raw)
+        decoded[name] = (raw, value)
+        return value
+
+    def _get_model(self, name, model_class):
+        """Gets a property holding a model object. The raw dict is only
+        decoded on first access, and later accesses return the same object
+
+        Args:
+            name (str): The name of the property
+            model_class (class): The model class of the property
+
+        Returns:
+            :class:`GraphObjectBase`: The model object, or None if the
+                property is not set
+        """
+        value = self._prop_dict.get(name)
+        if value is None or isinstance(value, GraphObjectBase):
+            return value
+        return self._get_decoded(name, value, model_class)
+
+    def _get_model_list(self, name, model_class):
+        """Gets a property holding a list of model objects, decoded on
+        first access like :func:`_get_model`
+
+        Args:
+            name (str): The name of the property
+            model_class (class): The model class of the items
+
+        Returns:
+            list of :class:`GraphObjectBase`: The model objects, or None
+                if the property is not set
+        """
+        values = self._prop_dict.get(name)
+        if values is None:
+            return None
+        return self._get_decoded(name, values, lambda values: [
+            value if isinstance(value, GraphObjectBase) else model_class(value) for value in values])
 
     def to_dict(self):
         """Returns the serialized form of the :class:`GraphObjectBase`
@@ -0,0 +1,454 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import bisect
+import logging
+import threading
+import time
+from .error import GraphError
+from .http_logging import redact_url
+from .http_response import StreamingHttpResponse, header_value
+from .rate_limiter import resource_family
+from .retry import retry_after
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+BEFORE_SEND = "before_send"
+AFTER_RECEIVE = "after_receive"
+RETRY = "retry"
+ERROR = "error"
+
+
+class RequestEvent(object):
+    """An event of the life of a request, passed to the listeners of
+    :class:`Hooks`
+
+    Attributes:
+        event (str): One of BEFORE_SEND, AFTER_RECEIVE, RETRY or ERROR
+        method (str): The HTTP method of the request
+        url (str): The URL of the request, with credentials redacted
+        client_request_id (str): The client-request-id sent with the request
+        request_id (str): The request-id returned by Graph, or None
+        status (int): The status of the response, or None
+        latency (float): The seconds since the request was sent, or None
+            before the response is received
+        bytes_out (int): The size of the request body, or None
+        bytes_in (int): The size of the response body, or None if it
+            is streamed
+        retry_after (float): The seconds the server asked to wait before
+            retrying, or None
+        delay (float): For RETRY events, the seconds waited before the next attempt
+        error (Exception): For ERROR events, the error raised
+        source (str): "graph" for Graph requests, "auth" for token requests
+    """
+
+    def __init__(self, event, method, url, client_request_id=None, request_id=None, status=None, latency=None,
+                 bytes_out=None, bytes_in=None, retry_after=None, delay=None, error=None, source="graph"):
+        self.event = event
+        self.method = method
+        self.url = url
+        self.client_request_id = client_request_id
+        self.request_id = request_id
+        self.status = status
+        self.latency = latency
+        self.bytes_out = bytes_out
+        self.bytes_in = bytes_in
+        self.retry_after = retry_after
+        self.delay = delay
+        self.error = error
+        self.source = source
+        self._started = time.perf_counter()
+        # The BEFORE_SEND event of the request this event belongs to
+        self._origin = self
+
+    @property
+    def throttled(self):
+        """Gets whether the server throttled the request
+
+        Returns:
+            bool: True for 429 responses and responses with a Retry-After
+        """
+        return self.status == 429 or self.retry_after is not None
+
+    def _derive(self, event, **values):
+        derived = RequestEvent(event, self.method, self.url, self.client_request_id, bytes_out=self.bytes_out,
+                               source=self.source)
+        derived._started = self._started
+        derived._origin = self._origin
+        for key, value in values.items():
+            setattr(derived, key, value)
+        return derived
+
+    def __repr__(self):
+        return "RequestEvent({!r}, {!r}, {!r}, status={!r}, latency={!r})".format(
+            self.event, self.method, self.url, self.status, self.latency)
+
+
+class Hooks(object):
+
+    def __init__(self):
+        """Initialize the hooks of a client. Listeners are callables
+        receiving a :class:`RequestEvent` before every request is sent,
+        after its response is received, when it is retried and when it
+        fails. When no listener is registered, requests skip the hooks
+        entirely."""
+        self._listeners = []
+        # client-request-ids of the requests sent through these hooks, so
+        # that retries of other clients sharing the HTTP provider are ignored
+        self._in_flight = set()
+
+    def __bool__(self):
+        return bool(self._listeners)
+
+    __nonzero__ = __bool__
+
+    @property
+    def listeners(self):
+        """Gets the registered listeners
+
+        Returns:
+            list of callable: The listeners
+        """
+        return list(self._listeners)
+
+    def add_listener(self, listener):
+        """Registers a listener
+
+        Args:
+            listener (callable): Called with every :class:`RequestEvent`
+        """
+        self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener):
+        """Unregisters a listener
+
+        Args:
+            listener (callable): A listener passed to :func:`add_listener`
+        """
+        self._listeners = [registered for registered in self._listeners if registered != listener]
+
+    def fire(self, event):
+        """Passes an event to every listener. A failing listener is
+        logged and does not fail the request
+
+        Args:
+            event (:class:`RequestEvent`): The event
+        """
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Hook listener %r failed on %s", listener, event.event)
+
+    def request_started(self, method, url, headers, bytes_out=None, source="graph"):
+        """Fires the BEFORE_SEND event of a request
+
+        Returns:
+            :class:`RequestEvent`: The event, to pass to
+                :func:`request_finished` or :func:`request_failed`
+        """
+        event = RequestEvent(BEFORE_SEND, method, redact_url(url), header_value(headers, "client-request-id"),
+                             bytes_out=bytes_out, source=source)
+        if event.client_request_id is not None:
+            self._in_flight.add(event.client_request_id)
+        self.fire(event)
+        return event
+
+    def request_finished(self, started, response, bytes_in=None):
+        """Fires the AFTER_RECEIVE event of a request
+
+        Args:
+            started (:class:`RequestEvent`): The event returned by :func:`request_started`
+            response (:class:`HttpResponse<msgraph.http_response.HttpResponse>`): The response
+            bytes_in (int): Defaults to None, the size of the response
+                body when it is not in response.raw_content
+        """
+        self._in_flight.discard(started.client_request_id)
+        headers = response.headers or {}
+        if bytes_in is None and not isinstance(response, StreamingHttpResponse) and response.raw_content:
+            bytes_in = len(response.raw_content)
+        self.fire(started._derive(AFTER_RECEIVE,
+                                  request_id=header_value(headers, "request-id"),
+                                  status=response.status,
+                                  latency=time.perf_counter() - started._started,
+                                  bytes_in=bytes_in,
+                                  retry_after=retry_after(headers)))
+
+    def request_failed(self, started, error):
+        """Fires the ERROR event of a request
+
+        Args:
+            started (:class:`RequestEvent`): The event returned by :func:`request_started`
+            error (Exception): The error raised while sending the request
+        """
+        self._in_flight.discard(started.client_request_id)
+        status = headers = None
+        if isinstance(error, GraphError):
+            status, headers = error.status_code, error.headers or {}
+        self.fire(started._derive(ERROR,
+                                  request_id=header_value(headers, "request-id"),
+                                  status=status,
+                                  latency=time.perf_counter() - started._started,
+                                  retry_after=retry_after(headers) if headers else None,
+                                  error=error))
+
+    def on_retry(self, method, url, request_headers, status, response_headers, delay):
+        """Listener of :class:`RetryPolicy<msgraph.retry.RetryPolicy>`
+        firing the RETRY event of a request sent through these hooks"""
+        if not self._listeners:
+            return
+        client_request_id = header_value(request_headers, "client-request-id")
+        if client_request_id not in self._in_flight:
+            return
+        self.fire(RequestEvent(RETRY, method, redact_url(url), client_request_id,
+                               request_id=header_value(response_headers, "request-id"),
+                               status=status,
+                               retry_after=retry_after(response_headers) if response_headers else None,
+                               delay=delay))
+
+
+class Histogram(object):
+
+    #: Default bucket upper bounds, in seconds
+    DEFAULT_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        """Initialize a histogram with fixed buckets, so that observing
+        a value takes constant memory
+
+        Args:
+            bounds (tuple of float): The sorted upper bounds of the
+                buckets. Larger values go to an overflow bucket
+        """
+        self._bounds = tuple(bounds)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+    def observe(self, value):
+        """Adds a value to the histogram
+
+        Args:
+            value (float): The value
+        """
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._min = value if self._min is None else min(self._min, value)
+        self._max = value if self._max is None else max(self._max, value)
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def buckets(self):
+        """Gets the number of values in each bucket
+
+        Returns:
+            list of (float, int): The upper bound of every bucket, the
+                last being infinity, and its count
+        """
+        return list(zip(self._bounds + (float("inf"),), self._counts))
+
+    def percentile(self, q):
+        """Estimates a percentile as the upper bound of the bucket it
+        falls in, capped by the largest value observed
+
+        Args:
+            q (float): The percentile, between 0 and 100
+
+        Returns:
+            float: The estimate, or None if the histogram is empty
+        """
+        if not self._count:
+            return None
+        rank = q / 100.0 * self._count
+        seen = 0
+        for bound, count in self.buckets:
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self._max)
+        return self._max
+
+    def to_dict(self):
+        """Returns the summary of the histogram as a dict
+
+        Returns:
+            dict: count, sum, min, max, p50, p90 and p99
+        """
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "min": self._min,
+            "max": self._max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99)
+        }
+
+
+class HistogramCollector(object):
+
+    def __init__(self, label=None, bounds=Histogram.DEFAULT_BOUNDS):
+        """Initialize an in-memory metrics collector, to register with
+        :func:`Hooks.add_listener`. It keeps a latency histogram and
+        counters of requests, errors, retries, throttled responses and
+        bytes for every label.
+
+        Args:
+            label (callable): Defaults to None, maps a :class:`RequestEvent`
+                to the label its metrics are grouped under. If None, events
+                are grouped by source, method and resource family
+                (ex. ("graph", "GET", "users"))
+            bounds (tuple of float): The latency histogram buckets, in seconds
+        """
+        self._label = self._default_label if label is None else label
+        self._bounds = bounds
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_label(event):
+        return event.source, event.method, resource_family(event.url)
+
+    def __call__(self, event):
+        if event.event == BEFORE_SEND:
+            return
+
+        label = self._label(event)
+        with self._lock:
+            metrics = self._metrics.get(label)
+            if metrics is None:
+                metrics = self._metrics[label] = {
+                    "latency": Histogram(self._bounds),
+                    "requests": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "throttled": 0,
+                    "bytes_out": 0,
+                    "bytes_in": 0
+                }
+
+            if event.event == RETRY:
+                metrics["retries"] += 1
+            else:
+                metrics["requests"] += 1
+                metrics["latency"].observe(event.latency)
+                metrics["bytes_out"] += event.bytes_out or 0
+                metrics["bytes_in"] += event.bytes_in or 0
+                if event.event == ERROR:
+                    metrics["errors"] += 1
+            if event.throttled:
+                metrics["throttled"] += 1
+
+    def histogram(self, label):
+        """Gets the latency histogram of a label
+
+        Returns:
+            :class:`Histogram`: The histogram, or None if no request had the label
+        """
+        with self._lock:
+            metrics = self._metrics.get(label)
+            return None if metrics is None else metrics["latency"]
+
+    def snapshot(self):
+        """Returns the metrics collected so far
+
+        Returns:
+            dict: The metrics of every label, with the latency histogram
+                summarized by :func:`Histogram.to_dict`
+        """
+        with self._lock:
+            return {label: dict(metrics, latency=metrics["latency"].to_dict())
+                    for label, metrics in self._metrics.items()}
+
+    def reset(self):
+        """Forgets the metrics collected so far"""
+        with self._lock:
+            self._metrics = {}
+
+
+class OpenTelemetrySpanEmitter(object):
+
+    def __init__(self, tracer=None):
+        """Initialize a listener, to register with :func:`Hooks.add_listener`,
+        that records every request as an OpenTelemetry client span with
+        the HTTP semantic convention attributes. Retries are recorded as
+        span events.
+
+        Args:
+            tracer: Defaults to None, the OpenTelemetry tracer creating the
+                spans. If None, the tracer of the global tracer provider is
+                used, which requires the opentelemetry-api package
+        """
+        if tracer is None:
+            if otel_trace is None:
+                raise ImportError("OpenTelemetrySpanEmitter requires the opentelemetry-api package.")
+            tracer = otel_trace.get_tracer("msgraph")
+        self._tracer = tracer
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event.event == BEFORE_SEND:
+            kwargs = {"kind": otel_trace.SpanKind.CLIENT} if otel_trace is not None else {}
+            span = self._tracer.start_span("{} {}".format(event.method, resource_family(event.url)), **kwargs)
+            span.set_attribute("http.request.method", event.method)
+            span.set_attribute("url.full", event.url)
+            span.set_attribute("msgraph.source", event.source)
+            if event.client_request_id:
+                span.set_attribute("msgraph.client_request_id", event.client_request_id)
+            if event.bytes_out is not None:
+                span.set_attribute("http.request.body.size", event.bytes_out)
+            with self._lock:
+                self._spans[event._origin] = span
+            return
+
+        if event.event == RETRY:
+            span = self._find_span(event.client_request_id)
+            if span is not None:
+                attributes = {"delay": event.delay}
+                if event.status is not None:
+                    attributes["http.response.status_code"] = event.status
+                span.add_event("retry", attributes)
+            return
+
+        with self._lock:
+            span = self._spans.pop(event._origin, None)
+        if span is None:
+            return
+        if event.status is not None:
+            span.set_attribute("http.response.status_code", event.status)
+        if event.request_id:
+            span.set_attribute("msgraph.request_id", event.request_id)
+        if event.bytes_in is not None:
+            span.set_attribute("http.response.body.size", event.bytes_in)
+        if event.throttled:
+            span.set_attribute("msgraph.throttled", True)
+        if event.event == ERROR:
+            span.record_exception(event.error)
+            if otel_trace is not None:
+                span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(event.error)))
+        span.end()
+
+    def _find_span(self, client_request_id):
+        if not client_request_id:
+            return None
+        with self._lock:
+            for started, span in self._spans.items():
+                if started.client_request_id == client_request_id:
+                    return span
+        return None
@@ -0,0 +1,109 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+REDACTED = "<redacted>"
+
+#: Headers whose values are never logged
+SENSITIVE_HEADERS = frozenset(["authorization", "proxy-authorization", "cookie", "set-cookie"])
+
+#: Query parameters whose values are never logged, such as the
+#: credentials of pre-authenticated download and upload URLs
+SENSITIVE_QUERY_PARAMETERS = frozenset(["tempauth", "access_token", "client_secret", "code", "sig", "token"])
+
+
+def redact_headers(headers):
+    """Copies headers, replacing credentials with a placeholder
+
+    Args:
+        headers (dict of (str, str)): The headers of a request or response
+
+    Returns:
+        dict of (str, str): The headers safe to log
+    """
+    if not headers:
+        return {}
+    return {key: REDACTED if key.lower() in SENSITIVE_HEADERS else value
+            for key, value in headers.items()}
+
+
+def redact_url(url):
+    """Replaces the credentials in the query string of a URL with a
+    placeholder
+
+    Args:
+        url (str): The URL of a request
+
+    Returns:
+        str: The URL safe to log
+    """
+    url_parts = urlparse(url)
+    if not url_parts.query:
+        return url
+    query = [(key, REDACTED if key.lower() in SENSITIVE_QUERY_PARAMETERS else value)
+             for key, value in parse_qsl(url_parts.query, keep_blank_values=True)]
+    return urlunparse(url_parts._replace(query=urlencode(query, safe="<>")))
+
+
+def describe_body(data=None, content=None, path=None):
+    """Describes the body of a request without its content, which may
+    hold secrets
+
+    Returns:
+        str: The kind and size of the body
+    """
+    if path:
+        return "file {}".format(path)
+    body = data if data is not None else content
+    if body is None:
+        return "none"
+    if isinstance(body, dict):
+        return "form ({} fields)".format(len(body))
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return "{} bytes".format(len(body))
+    return type(body).__name__
+
+
+class RequestTiming(object):
+    """Timing of a single attempt of a request, in seconds. Phases the
+    transport does not expose are None: the requests based
+    :class:`HttpProvider<msgraph.http_provider.HttpProvider>` only
+    measures the time to first byte and the total, the aiohttp based
+    :class:`AsyncHttpProvider<msgraph.async_http_provider.AsyncHttpProvider>`
+    also measures DNS resolution and connection setup (connect, which
+    includes the TLS handshake). Phases are None as well when a pooled
+    connection was reused.
+
+    Attributes:
+        method (str): The HTTP method of the request
+        url (str): The URL of the request, with credentials redacted
+        status (int): The status of the response, or None if the
+            connection failed
+        attempt (int): The attempt number, starting at 1
+        dns (float): The time spent resolving the host name
+        connect (float): The time spent opening the connection
+        tls (float): The time spent in the TLS handshake
+        ttfb (float): The time until the response headers were received
+        total (float): The time until the response was received in full
+            (until its headers for streamed responses)
+    """
+
+    def __init__(self, method, url, status, attempt, total, ttfb=None, dns=None, connect=None, tls=None):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.attempt = attempt
+        self.dns = dns
+        self.connect = connect
+        self.tls = tls
+        self.ttfb = ttfb
+        self.total = total
+
+    def __repr__(self):
+        return ("RequestTiming(method={!r}, url={!r}, status={!r}, attempt={!r}, dns={!r}, connect={!r}, "
+                "tls={!r}, ttfb={!r}, total={!r})").format(self.method, self.url, self.status, self.attempt,
+                                                           self.dns, self.connect, self.tls, self.ttfb, self.total)
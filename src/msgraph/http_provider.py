@@ -3,16 +3,153 @@ Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the M
 """
 
 from __future__ import unicode_literals, with_statement
+import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from .http_logging import RequestTiming, describe_body, redact_headers, redact_url
 from .http_provider_base import HttpProviderBase
-from .http_response import HttpResponse
+from .http_response import HttpResponse, StreamingHttpResponse
+from .ranged_download import RangedDownloader
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
 
 
 class HttpProvider(HttpProviderBase):
 
-    def send(self, method, headers, url, data=None, content=None, path=None):
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=True, idle_timeout=None, retry_policy=None, timing_callback=None, timeout=(10, 60)):
+        """Initialize the HTTP provider. The provider owns a single
+        :class:`requests.Session` whose connection pool is reused by
+        every request, so connections (and their TLS state) survive
+        between calls.
+
+        Args:
+            pool_connections (int): Defaults to 10, the number of
+                per-host connection pools to cache
+            pool_maxsize (int): Defaults to 10, the maximum number of
+                connections kept open to a single host
+            pool_block (bool): Defaults to False. If True, a request
+                waits for a free connection when the host pool is
+                exhausted instead of opening an extra one
+            keep_alive (bool): Defaults to True. If False, every
+                request is sent with "Connection: close"
+            idle_timeout (float): Defaults to None, the number of seconds
+                the pool may stay unused before its connections are
+                discarded. None keeps connections until :func:`close`
+            retry_policy (:class:`RetryPolicy<msgraph.retry.RetryPolicy>`):
+                Defaults to None, the policy used to retry throttled
+                requests. If None, a default :class:`RetryPolicy<msgraph.retry.RetryPolicy>`
+                is used. Pass RetryPolicy(max_attempts=1) to disable retries
+            timing_callback (callable): Defaults to None, called with a
+                :class:`RequestTiming<msgraph.http_logging.RequestTiming>`
+                after every attempt of every request
+            timeout (float or tuple of (float, float)): Defaults to
+                (10, 60), the connect and read timeouts in seconds of
+                every request, so that a stalled connection fails (and is
+                retried) instead of hanging. None waits forever
+        """
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._idle_timeout = idle_timeout
+        self._retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self._timing_callback = timing_callback
+        self._timeout = timeout
+        self._session = None
+        self._last_used = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Gets the pooled session used to send requests, creating
+        it on first use and recycling it after it has been idle for
+        longer than idle_timeout
+
+        Returns:
+            :class:`requests.Session`: The pooled session
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (self._session is not None and self._idle_timeout is not None and
+                    now - self._last_used > self._idle_timeout):
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._create_session()
+            self._last_used = now
+            return self._session
+
+    @property
+    def retry_policy(self):
+        """Gets and sets the policy used to retry throttled requests
+
+        Returns:
+            :class:`RetryPolicy<msgraph.retry.RetryPolicy>`: The retry
+                policy, or None if requests are not retried
+        """
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, value):
+        self._retry_policy = value
+
+    @property
+    def timeout(self):
+        """Gets and sets the connect and read timeouts of every request
+
+        Returns:
+            float or tuple of (float, float): The timeouts in seconds,
+                or None if requests wait forever
+        """
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self._timeout = value
+
+    @property
+    def timing_callback(self):
+        """Gets and sets the callable receiving the
+        :class:`RequestTiming<msgraph.http_logging.RequestTiming>` of
+        every attempt of every request
+
+        Returns:
+            callable: The timing callback, or None
+        """
+        return self._timing_callback
+
+    @timing_callback.setter
+    def timing_callback(self, value):
+        self._timing_callback = value
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self._pool_connections,
+                              pool_maxsize=self._pool_maxsize,
+                              pool_block=self._pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self._keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Closes all pooled connections. The provider can still be
+        used afterwards, a new pool is created on the next request."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def send(self, method, headers, url, data=None, content=None, path=None, stream=False):
         """Send the built request using all the specified
-        parameters.
+        parameters. Redirects are returned rather than followed, see
+        :class:`RedirectHandler<msgraph.middleware.RedirectHandler>`.
 
         Args:
             method (str): The HTTP method to use (ex. GET)
@@ -25,41 +162,119 @@ class HttpProvider(HttpProviderBase):
                 in JSON format in the body of the request
             path (str): Defaults to None, the path to the local file
                 to send in the body of the request
+            stream (bool): Defaults to False. If True, a successful
+                response is returned before its body is read, as a
+                :class:`StreamingHttpResponse<msgraph.http_response.StreamingHttpResponse>`
+                which must be closed
 
         Returns:
             :class:`HttpResponse<microsoft.http_response.HttpResponse>`:
                 The response to the request
         """
-        session = requests.Session()
+        def send_once():
+            if hasattr(data, "seek"):
+                # Rewind file-like bodies consumed by a previous attempt
+                data.seek(0)
+            if path:
+                with open(path, mode='rb') as f:
+                    return self.session.request(method,
+                                                url,
+                                                headers=headers,
+                                                data=f,
+                                                stream=stream,
+                                                allow_redirects=False,
+                                                timeout=self._timeout)
+
+            return self.session.request(method,
+                                        url,
+                                        headers=headers,
+                                        data=data,
+                                        json=content,
+                                        stream=stream,
+                                        allow_redirects=False,
+                                        timeout=self._timeout)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s headers=%s body=%s", method, redact_url(url), redact_headers(headers),
+                         describe_body(data, content, path))
+
+        response = self._send_with_retry(method, url, headers, send_once)
+
+        if stream and 200 <= response.status_code < 300:
+            return StreamingHttpResponse(response.status_code, response.headers,
+                                         response.iter_content(chunk_size=64 * 1024), response.close)
 
-        if path:
-            with open(path, mode='rb') as f:
-                request = requests.Request(method,
-                                           url,
-                                           headers=headers,
-                                           data=f)
-                prepped = request.prepare()
-                response = session.send(prepped)
-        else:
-
-            request = requests.Request(method,
-                                       url,
-                                       headers=headers,
-                                       data=data,
-                                       json=content)
-            prepped = request.prepare()
-
-            print("HTTP PROVIDER: " + method + " " + url)
-            print("HTTP PROVIDER headers: " + str(headers))
-            print("HTTP PROVIDER data: " + str(data))
-            print("HTTP PROVIDER content: " + str(content))
-
-            response = session.send(prepped)
-
-        custom_response = HttpResponse(response.status_code, response.headers, response.text)
+        custom_response = HttpResponse(response.status_code, response.headers, response.content)
         return custom_response
 
-    def download(self, headers, url, path):
+    def _send_with_retry(self, method, url, headers, send_once):
+        """Calls send_once until it returns a response that is not
+        retryable, or the retry policy gives up
+
+        Args:
+            method (str): The HTTP method of the request
+            url (str): The URL of the request
+            headers (dict of (str, str)): The headers of the request
+            send_once (callable): Sends the request once and returns
+                the :class:`requests.Response`
+
+        Returns:
+            :class:`requests.Response`: The last response received
+        """
+        policy = self._retry_policy
+        if policy is None:
+            return self._send_attempt(method, url, send_once, 1)
+
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            status = response_headers = None
+            try:
+                response = self._send_attempt(method, url, send_once, attempt)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not policy.is_retryable(method, None):
+                    raise
+                delay = policy.get_delay(attempt)
+                if not policy.should_retry(attempt, time.monotonic() - start, delay):
+                    raise
+            else:
+                status, response_headers = response.status_code, response.headers
+                if not policy.is_retryable(method, status):
+                    return response
+                delay = policy.get_delay(attempt, response_headers)
+                if not policy.should_retry(attempt, time.monotonic() - start, delay):
+                    return response
+                response.close()
+
+            logger.info("Retrying %s %s in %.2f s after %s (attempt %d)", method, redact_url(url), delay,
+                        status or "a connection error", attempt)
+            policy.notify(method, url, headers, status, response_headers, delay)
+            policy.sleep(delay)
+            attempt += 1
+
+    def _send_attempt(self, method, url, send_once, attempt):
+        """Calls send_once, logging and timing the attempt when that
+        is enabled"""
+        if self._timing_callback is None and not logger.isEnabledFor(logging.DEBUG):
+            return send_once()
+
+        began = time.perf_counter()
+        response = None
+        try:
+            response = send_once()
+            return response
+        finally:
+            total = time.perf_counter() - began
+            status = None if response is None else response.status_code
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s -> %s in %.1f ms (attempt %d)", method, redact_url(url), status,
+                             total * 1000, attempt)
+            if self._timing_callback is not None:
+                # requests measures the time until the headers are parsed
+                ttfb = None if response is None else response.elapsed.total_seconds()
+                self._timing_callback(RequestTiming(method, redact_url(url), status, attempt, total, ttfb=ttfb))
+
+    def download(self, headers, url, path, max_workers=None, hashes=None, **ranged_options):
         """Downloads a file to the stated path
 
         Args:
@@ -67,24 +282,38 @@ class HttpProvider(HttpProviderBase):
                 pairs to be used as headers in the request
             url (str): The URL from which to download the file
             path (str): The local path to save the downloaded file
+            max_workers (int): Defaults to None. If set, the file is
+                downloaded with that many parallel Range requests and an
+                interrupted download resumes where it stopped, see
+                :class:`RangedDownloader<msgraph.ranged_download.RangedDownloader>`
+            hashes (dict of (str, str)): Defaults to None, the file.hashes
+                of the drive item, checked once the download completes
+            ranged_options: Further arguments of
+                :class:`RangedDownloader<msgraph.ranged_download.RangedDownloader>`
 
         Returns:
             :class:`HttpResponse<microsoft.http_response.HttpResponse>`:
                 The response to the request
         """
-        response = requests.get(
+        if max_workers or hashes or ranged_options:
+            downloader = RangedDownloader(self, headers, url, path, max_workers=max_workers or 1,
+                                          hashes=hashes, **ranged_options)
+            status, response_headers, text = downloader.download()
+            return HttpResponse(status, response_headers, text)
+
+        response = self._send_with_retry("GET", url, headers, lambda: self.session.get(
             url,
             stream=True,
-            headers=headers)
+            headers=headers,
+            timeout=self._timeout))
 
-        if response.status_code == 200:
-            with open(path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
+        with response:
+            if response.status_code == 200:
+                with open(path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
                         f.write(chunk)
-                        f.flush()
-            custom_response = HttpResponse(response.status_code, response.headers, None)
-        else:
-            custom_response = HttpResponse(response.status_code, response.headers, response.text)
+                custom_response = HttpResponse(response.status_code, response.headers, None)
+            else:
+                custom_response = HttpResponse(response.status_code, response.headers, response.content)
 
         return custom_response
@@ -47,3 +47,9 @@ class HttpProviderBase(object):
                 The response to the request
         """
         pass
+
+    def close(self):
+        """Releases any resources, such as pooled connections,
+        held by the provider. The default implementation does nothing.
+        """
+        pass
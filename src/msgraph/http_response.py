@@ -7,6 +7,28 @@ import json
 from .error import GraphError
 
 
+def header_value(headers, name):
+    """Gets a header, whatever the case of its name
+
+    Args:
+        headers (dict of (str, str)): The headers, or None
+        name (str): The name of the header
+
+    Returns:
+        str: The value of the header, or None
+    """
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        # Plain dicts are case sensitive
+        name = name.lower()
+        for key, header_value in headers.items():
+            if key.lower() == name:
+                return header_value
+    return value
+
+
 class HttpResponse(object):
 
     def __init__(self, status, headers, content):
@@ -17,19 +39,26 @@ class HttpResponse(object):
             status (int): HTTP status (ex. 200, 201, etc.)
             headers (dict of (str, str)): The headers in the
                 response
-            content (str): The body of the response
+            content (bytes or str): The body of the response
         """
         self._status = status
         self._headers = headers
-        self._content = content
+        if isinstance(content, bytes):
+            self._raw_content = content
+            self._content = None
+        else:
+            self._raw_content = None
+            self._content = content
 
-        if self.content and (self.status < 200 or self.status >= 300):
-            message = json.loads(self.content)
+        # Redirects are followed by the RedirectHandler, their body is
+        # not an error
+        if self.raw_content and (self.status < 200 or self.status >= 400):
+            message = json.loads(self.raw_content)
             if "error" in message:
                 if type(message["error"]) == dict:
-                    raise GraphError(message["error"], self.status)
+                    raise GraphError(message["error"], self.status, self.headers)
                 else:
-                    raise GraphError({"message": str(message["error"])}, self.status)
+                    raise GraphError({"message": str(message["error"])}, self.status, self.headers)
 
     def __str__(self):
         properties = {
@@ -68,4 +97,84 @@ class HttpResponse(object):
         Returns:
             str: The body of the response
         """
+        if self._content is None and self._raw_content is not None:
+            self._content = self._raw_content.decode("utf-8")
         return self._content
+
+    @property
+    def raw_content(self):
+        """The content of the response, before it is decoded to
+        str. JSON codecs parse it directly
+
+        Returns:
+            bytes or str: The body of the response
+        """
+        return self._content if self._raw_content is None else self._raw_content
+
+
+class StreamingHttpResponse(HttpResponse):
+
+    def __init__(self, status, headers, chunks, close=None):
+        """Initialize a response whose body has not been read yet.
+        Only successful responses are streamed, errors are read whole
+        into an :class:`HttpResponse` so that they raise a GraphError.
+
+        Args:
+            status (int): HTTP status (ex. 200, 201, etc.)
+            headers (dict of (str, str)): The headers in the
+                response
+            chunks (iterable of bytes): The body of the response, read
+                as it is iterated
+            close (callable): Defaults to None, releases the connection
+                of the response
+        """
+        # The base class reads the body to detect errors, which would
+        # consume the stream
+        self._status = status
+        self._headers = headers
+        self._content = None
+        self._raw_content = None
+        self._chunks = chunks
+        self._close = close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def content(self):
+        """Reads the rest of the body of the response
+
+        Returns:
+            str: The body of the response
+        """
+        self.raw_content
+        return super(StreamingHttpResponse, self).content
+
+    @property
+    def raw_content(self):
+        """Reads the rest of the body of the response
+
+        Returns:
+            bytes: The body of the response
+        """
+        if self._raw_content is None:
+            self._raw_content = b"".join(self.iter_content())
+            self.close()
+        return self._raw_content
+
+    def iter_content(self):
+        """Gets the body of the response as it arrives
+
+        Returns:
+            iterable of bytes: The chunks of the body
+        """
+        return self._chunks
+
+    def close(self):
+        """Releases the connection of the response"""
+        if self._close is not None:
+            self._close()
+            self._close = None
@@ -0,0 +1,164 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import codecs
+import json
+
+
+class JsonCollectionStream(object):
+
+    #: Consumed text is dropped from the buffer once it grows past this size
+    _COMPACT_SIZE = 64 * 1024
+
+    def __init__(self, chunks, encoding="utf-8"):
+        """Initialize an incremental parser of a collection response.
+        The elements of the "value" array are decoded and yielded one at
+        a time as the response arrives, so the whole body is never held
+        in memory. The other top-level properties (@odata.context,
+        @odata.nextLink...) are collected in :attr:`properties`.
+
+        Args:
+            chunks (iterable of bytes): The body of the response, such as
+                requests.Response.iter_content()
+            encoding (str): Defaults to "utf-8", the encoding of the body
+        """
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+        self._properties = {}
+        self._items = self._parse()
+
+    def __iter__(self):
+        """The stream can only be iterated once, a second iteration
+        resumes where the first one stopped"""
+        return self._items
+
+    @property
+    def properties(self):
+        """Gets the top-level properties parsed so far. Properties
+        sent after the "value" array are only known once every element
+        has been read
+
+        Returns:
+            dict: The properties of the response other than "value"
+        """
+        return self._properties
+
+    def read_to_end(self):
+        """Parses and discards the rest of the response, so that
+        properties sent after the "value" array are known"""
+        for _ in self._items:
+            pass
+
+    def _read(self):
+        """Appends the next chunk of the response to the buffer
+
+        Returns:
+            bool: False once the response is exhausted
+        """
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            self._eof = True
+            return False
+        self._buffer += self._text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    def _compact(self):
+        if self._position > self._COMPACT_SIZE and self._position * 2 > len(self._buffer):
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+
+    def _peek(self):
+        """Skips whitespace and returns the next character without
+        consuming it, or None at the end of the response"""
+        while True:
+            buffer = self._buffer
+            position = self._position
+            while position < len(buffer) and buffer[position] in " \t\n\r":
+                position += 1
+            self._position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self._read():
+                return None
+
+    def _expect(self, character):
+        if self._peek() != character:
+            raise ValueError("Expected '{}' at offset {} of the JSON response".format(character, self._position))
+        self._position += 1
+
+    def _decode_value(self):
+        """Decodes the JSON value starting at the current position,
+        reading more of the response until it is complete"""
+        if self._peek() is None:
+            raise ValueError("Unexpected end of the JSON response")
+        while True:
+            available = len(self._buffer) - self._position
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+            except ValueError:
+                if self._eof:
+                    raise
+                # Wait for the buffer to double before parsing again, so a
+                # value larger than a chunk is not parsed once per chunk
+                while len(self._buffer) - self._position < 2 * available and self._read():
+                    pass
+                continue
+
+            if end == len(self._buffer) and not self._eof:
+                # A number ending the buffer may continue in the next chunk
+                self._read()
+                continue
+
+            self._position = end
+            return value
+
+    def _parse(self):
+        if self._peek() is None:
+            # Empty body
+            return
+        self._expect("{")
+
+        has_value = False
+        while True:
+            character = self._peek()
+            if character == "}":
+                self._position += 1
+                break
+            if character == ",":
+                self._position += 1
+                continue
+            if character is None:
+                raise ValueError("Unexpected end of the JSON response")
+
+            key = self._decode_value()
+            self._expect(":")
+            if key == "value" and self._peek() == "[":
+                has_value = True
+                self._position += 1
+                while True:
+                    character = self._peek()
+                    if character == "]":
+                        self._position += 1
+                        break
+                    if character == ",":
+                        self._position += 1
+                        continue
+                    if character is None:
+                        raise ValueError("Unexpected end of the JSON response")
+                    yield self._decode_value()
+                    self._compact()
+            else:
+                self._properties[key] = self._decode_value()
+
+        if not has_value:
+            # A single item rather than a collection, as in GraphResponse
+            yield dict(self._properties)
@@ -0,0 +1,100 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from contextlib import closing
+import json
+import os
+import sqlite3
+import threading
+from .file_utils import atomic_write, file_lock
+
+
+class JsonFileStore(object):
+
+    def __init__(self, path):
+        """Initialize a store keeping values by key in a JSON file. Every
+        change is a read-modify-write under a lock shared with the other
+        processes using the file, which is then replaced atomically, so
+        that processes sharing it never lose each other's entries
+
+        Args:
+            path (str): The path of the file
+        """
+        self._path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        if not os.path.exists(self._path):
+            return {}
+        with open(self._path, "r") as f:
+            return json.load(f)
+
+    def _write(self, entries):
+        atomic_write(self._path, json.dumps(entries, separators=(",", ":"), sort_keys=True))
+
+    def load(self, key):
+        # Readers need no lock, the file is only ever replaced whole
+        return self._read().get(key)
+
+    def save(self, key, value):
+        with self._lock, file_lock(self._path):
+            entries = self._read()
+            entries[key] = value
+            self._write(entries)
+
+    def delete(self, key):
+        with self._lock, file_lock(self._path):
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def clear(self):
+        with self._lock, file_lock(self._path):
+            self._write({})
+
+
+class SqliteStore(object):
+
+    def __init__(self, path, table, column):
+        """Initialize a store keeping values by key in a SQLite table,
+        which can be shared by processes
+
+        Args:
+            path (str): The path of the database
+            table (str): The name of the table
+            column (str): The name of the column holding the values
+        """
+        self._path = path
+        self._table = table
+        self._column = column
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS {} (key TEXT PRIMARY KEY, {} TEXT NOT NULL)"
+                               .format(self._table, self._column))
+
+    def _encode(self, value):
+        """Converts a value to the text stored in the table"""
+        return value
+
+    def _decode(self, text):
+        """Converts the text stored in the table to a value"""
+        return text
+
+    def load(self, key):
+        with closing(sqlite3.connect(self._path)) as connection:
+            row = connection.execute("SELECT {} FROM {} WHERE key = ?".format(self._column, self._table),
+                                     (key,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def save(self, key, value):
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO {} (key, {}) VALUES (?, ?)".format(self._table, self._column),
+                               (key, self._encode(value)))
+
+    def delete(self, key):
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.execute("DELETE FROM {} WHERE key = ?".format(self._table), (key,))
+
+    def clear(self):
+        with closing(sqlite3.connect(self._path)) as connection, connection:
+            connection.execute("DELETE FROM {}".format(self._table))
@@ -0,0 +1,558 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from urllib.parse import urljoin, urlparse
+import asyncio
+import os
+import time
+from .error import GraphError
+from .http_response import header_value
+
+
+class PipelineRequest(object):
+    """A request going through the handlers of a :class:`Pipeline`.
+    Handlers may change its method, headers, URL and body, and keep
+    per-request state in context"""
+    __slots__ = ("request", "client", "method", "headers", "body", "path", "stream", "download_path",
+                 "download_options", "context", "_url")
+
+    def __init__(self, request, body=None, path=None, stream=False, download_path=None, download_options=None):
+        """Initialize the pipeline request of a request
+
+        Args:
+            request (:class:`RequestBase<msgraph.request_base.RequestBase>`):
+                The request being sent
+            body (bytes): Defaults to None, the encoded body
+            path (str): Defaults to None, the local path of the file to send
+            stream (bool): Defaults to False, whether to return a successful
+                response before its body is read
+            download_path (str): Defaults to None, the local path to which
+                the body of the response is downloaded
+            download_options (dict): Defaults to None, further arguments of
+                the download of the HTTP provider, such as max_workers
+        """
+        self.request = request
+        self.client = request._client
+        self.method = request.method
+        # Shared with the request, so that options appended to it by
+        # handlers (ex. the Authorization header) are sent
+        self.headers = request._headers
+        self.body = body
+        self.path = path
+        self.stream = stream
+        self.download_path = download_path
+        self.download_options = download_options or {}
+        self.context = {}
+        self._url = None
+
+    @property
+    def url(self):
+        """Gets and sets the URL to send the request to. It is the URL
+        of the request, with its query options, until it is set
+
+        Returns:
+            str: The URL
+        """
+        if self._url is not None:
+            return self._url
+        return self.request._request_url if self.path else self.request.request_url
+
+    @url.setter
+    def url(self, value):
+        self._url = value
+
+    def copy(self, url=None, method=None, body=None, headers=None):
+        """Creates a request to send instead of this one, ex. after a
+        redirect. Arguments left to None are copied
+
+        Returns:
+            :class:`PipelineRequest`: The new request
+        """
+        copy = PipelineRequest.__new__(PipelineRequest)
+        copy.request = self.request
+        copy.client = self.client
+        copy.method = self.method if method is None else method
+        copy.headers = dict(self.headers) if headers is None else headers
+        copy.body = self.body if body is None else body
+        copy.path = self.path
+        copy.stream = self.stream
+        copy.download_path = self.download_path
+        copy.download_options = self.download_options
+        copy.context = self.context
+        copy._url = self.url if url is None else url
+        return copy
+
+
+class Middleware(object):
+    """Base class of the handlers of a :class:`Pipeline`. A handler may
+    change the request, return a response without calling next (ex. from
+    a cache), or handle the response or error returned by next"""
+
+    def send(self, request, next):
+        """Sends a request through the rest of the pipeline
+
+        Args:
+            request (:class:`PipelineRequest`): The request
+            next (callable): Sends the request through the following
+                handlers and the HTTP provider, returns the response
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The response
+        """
+        return next(request)
+
+    async def send_async(self, request, next):
+        """Sends a request through the rest of the pipeline of an
+        :class:`AsyncGraphClient<msgraph.async_client.AsyncGraphClient>`.
+        Handlers which override :func:`send` must also override this
+        coroutine to be used by async clients
+
+        Args:
+            request (:class:`PipelineRequest`): The request
+            next (coroutine function): Sends the request through the
+                following handlers and the HTTP provider, returns the response
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The response
+        """
+        return await next(request)
+
+
+class Pipeline(object):
+
+    def __init__(self, handlers, transport):
+        """Initialize an ordered chain of handlers. The chain is linked
+        once, so sending a request only costs a call per handler
+
+        Args:
+            handlers (list of :class:`Middleware`): The handlers, the first
+                one receives the request first and the response last
+            transport (callable): Sends a :class:`PipelineRequest` after
+                the last handler, see :func:`http_transport`
+        """
+        self._handlers = tuple(handlers)
+        chain = transport
+        for handler in reversed(self._handlers):
+            chain = self._link(handler, chain)
+        self._chain = chain
+
+    @staticmethod
+    def _link(handler, next):
+        send = handler.send
+        return lambda request: send(request, next)
+
+    @property
+    def handlers(self):
+        """Gets the handlers of the pipeline
+
+        Returns:
+            tuple of :class:`Middleware`: The handlers, in order
+        """
+        return self._handlers
+
+    def send(self, request):
+        """Sends a request through the handlers
+
+        Args:
+            request (:class:`PipelineRequest`): The request
+
+        Returns:
+            :class:`HttpResponse<msgraph.http_response.HttpResponse>`: The response
+        """
+        return self._chain(request)
+
+
+class AsyncPipeline(Pipeline):
+
+    def __init__(self, handlers, transport):
+        """Initialize the chain of handlers of an
+        :class:`AsyncGraphClient<msgraph.async_client.AsyncGraphClient>`,
+        linked through their :func:`send_async<Middleware.send_async>`
+        coroutines. :func:`send` returns a coroutine
+
+        Args:
+            handlers (list of :class:`Middleware`): The handlers, the first
+                one receives the request first and the response last
+            transport (coroutine function): Sends a :class:`PipelineRequest`
+                after the last handler, see :func:`async_http_transport`
+
+        Raises:
+            TypeError: If a handler overrides send but not send_async
+        """
+        handlers = tuple(handlers)
+        for handler in handlers:
+            handler_type = type(handler)
+            if handler_type.send is not Middleware.send and handler_type.send_async is Middleware.send_async:
+                raise TypeError("{} only implements send, async clients need send_async."
+                                .format(handler_type.__name__))
+        super(AsyncPipeline, self).__init__(handlers, transport)
+
+    @staticmethod
+    def _link(handler, next):
+        send = handler.send_async
+        return lambda request: send(request, next)
+
+
+def http_transport(request):
+    """Sends a request with the HTTP provider of its client"""
+    provider = request.client.http_provider
+    if request.download_path is not None:
+        return provider.download(request.headers, request.url, request.download_path, **request.download_options)
+    if request.path:
+        return provider.send(request.method, request.headers, request.url, path=request.path)
+    if request.stream:
+        return provider.send(request.method, request.headers, request.url, data=request.body, stream=True)
+    return provider.send(request.method, request.headers, request.url, data=request.body)
+
+
+async def async_http_transport(request):
+    """Sends a request with the awaitable HTTP provider of its client"""
+    provider = request.client.http_provider
+    if request.download_path is not None:
+        return await provider.download(request.headers, request.url, request.download_path,
+                                       **request.download_options)
+    if request.path:
+        return await provider.send(request.method, request.headers, request.url, path=request.path)
+    return await provider.send(request.method, request.headers, request.url, data=request.body)
+
+
+def default_middleware():
+    """Creates the handlers of a :class:`GraphClient<msgraph.client.GraphClient>`
+
+    Returns:
+        list of :class:`Middleware`: Authentication, default headers,
+            projection policy, response cache, redirects, compression,
+            rate limiting and hooks, in this order
+    """
+    from .compression import CompressionHandler
+    return [AuthHandler(), HeadersHandler(), ProjectionHandler(), CacheHandler(), RedirectHandler(),
+            CompressionHandler(), RateLimitHandler(), TelemetryHandler()]
+
+
+class AuthHandler(Middleware):
+    """Authenticates the request with the auth provider of the client"""
+
+    def send(self, request, next):
+        request.client.auth_provider.authenticate_request(request.request)
+        return next(request)
+
+    async def send_async(self, request, next):
+        await request.client.auth_provider.authenticate_request_async(request.request)
+        return await next(request)
+
+
+class HeadersHandler(Middleware):
+    """Adds Content-Type, X-RequestStats and a new client-request-id"""
+
+    def send(self, request, next):
+        self._append_headers(request)
+        return next(request)
+
+    async def send_async(self, request, next):
+        self._append_headers(request)
+        return await next(request)
+
+    @staticmethod
+    def _append_headers(request):
+        if request.download_path is not None:
+            request.request._append_download_headers()
+        else:
+            request.request._append_send_headers()
+
+
+class ProjectionHandler(Middleware):
+    """Applies the projection policy of the client to the request"""
+
+    def send(self, request, next):
+        self._apply(request)
+        return next(request)
+
+    async def send_async(self, request, next):
+        self._apply(request)
+        return await next(request)
+
+    @staticmethod
+    def _apply(request):
+        policy = request.client.projection_policy
+        if policy is not None and not request.path and request.download_path is None:
+            policy.apply(request.request)
+
+
+class CacheHandler(Middleware):
+    """Serves GET requests from the response cache of the client, and
+    revalidates stale responses with their ETag"""
+
+    def send(self, request, next):
+        cache = request.client.cache
+        if cache is None:
+            return next(request)
+
+        url = request.url
+        key, cached = self._lookup(cache, request)
+        if cached is not None and cached.fresh:
+            return cached.to_response()
+        try:
+            response = next(request)
+        finally:
+            # The validator only applies to this request
+            request.headers.pop("If-None-Match", None)
+        return cache.update(key, request.method, url, response, cached)
+
+    async def send_async(self, request, next):
+        cache = request.client.cache
+        if cache is None:
+            return await next(request)
+
+        url = request.url
+        key, cached = self._lookup(cache, request)
+        if cached is not None and cached.fresh:
+            return cached.to_response()
+        try:
+            response = await next(request)
+        finally:
+            request.headers.pop("If-None-Match", None)
+        return cache.update(key, request.method, url, response, cached)
+
+    @staticmethod
+    def _lookup(cache, request):
+        """Gets the cache key and entry of a cacheable request, and adds
+        the ETag of a stale entry as a validator
+
+        Returns:
+            tuple: The key and the entry, or None for either
+        """
+        if request.method != "GET" or request.path or request.stream or request.download_path is not None:
+            return None, None
+        key = cache.key_for(request.url, request.headers)
+        cached = cache.get(key)
+        if cached is not None and not cached.fresh and cached.etag:
+            request.headers["If-None-Match"] = cached.etag
+        return key, cached
+
+
+class RedirectHandler(Middleware):
+
+    #: Statuses of the responses redirecting to their Location header
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+    def __init__(self, max_redirects=5):
+        """Initialize a handler following redirects. The send of the HTTP
+        providers does not follow them, so that without this handler 3xx
+        responses are returned as is. The Authorization header is not sent
+        to other hosts, and 303 See Other is followed with a GET.
+        Downloads are redirected by the HTTP provider
+
+        Args:
+            max_redirects (int): Defaults to 5, the number of redirects
+                followed for a request
+        """
+        self.max_redirects = max_redirects
+
+    def send(self, request, next):
+        response = next(request)
+        for _ in range(self.max_redirects):
+            redirect = self._redirect(request, response)
+            if redirect is None:
+                break
+            _close(response)
+            request = redirect
+            response = next(request)
+        return response
+
+    async def send_async(self, request, next):
+        response = await next(request)
+        for _ in range(self.max_redirects):
+            redirect = self._redirect(request, response)
+            if redirect is None:
+                break
+            _close(response)
+            request = redirect
+            response = await next(request)
+        return response
+
+    def _redirect(self, request, response):
+        """Creates the request following a redirect response
+
+        Returns:
+            :class:`PipelineRequest`: The request, or None if the
+                response is not a redirect
+        """
+        location = header_value(response.headers, "Location") if response.status in self.REDIRECT_STATUSES else None
+        if not location:
+            return None
+
+        url = urljoin(request.url, location)
+        headers = dict(request.headers)
+        if urlparse(url).netloc != urlparse(request.url).netloc:
+            for name in [name for name in headers if name.lower() == "authorization"]:
+                del headers[name]
+        if response.status == 303 and request.method != "HEAD":
+            request = request.copy(url=url, method="GET", headers=headers)
+            request.body = None
+            return request
+        return request.copy(url=url, headers=headers)
+
+
+class RetryHandler(Middleware):
+
+    def __init__(self, policy):
+        """Initialize a handler sending throttled requests again. The
+        :class:`HttpProvider<msgraph.http_provider.HttpProvider>` already
+        retries with its own policy: use this handler with providers that
+        do not, placed before the :class:`RateLimitHandler` so that every
+        attempt is paced
+
+        Args:
+            policy (:class:`RetryPolicy<msgraph.retry.RetryPolicy>`): The policy
+        """
+        self.policy = policy
+
+    def send(self, request, next):
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                response, error = next(request), None
+            except GraphError as e:
+                response, error = None, e
+            delay = self._delay(request, attempt, start, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            _close(response)
+            self.policy.sleep(delay)
+            attempt += 1
+
+    async def send_async(self, request, next):
+        start = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                response, error = await next(request), None
+            except GraphError as e:
+                response, error = None, e
+            delay = self._delay(request, attempt, start, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            _close(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _delay(self, request, attempt, start, response, error):
+        """Gets the delay before an attempt is retried, and notifies the
+        listeners of the policy of the retry
+
+        Returns:
+            float: The number of seconds to wait, or None if the attempt
+                is not retried
+        """
+        policy = self.policy
+        if error is not None:
+            status, headers = error.status_code, error.headers
+        else:
+            status, headers = response.status, response.headers
+        if not policy.is_retryable(request.method, status):
+            return None
+        delay = policy.get_delay(attempt, headers)
+        if not policy.should_retry(attempt, time.monotonic() - start, delay):
+            return None
+        policy.notify(request.method, request.url, request.headers, status, headers, delay)
+        return delay
+
+
+class RateLimitHandler(Middleware):
+    """Paces the request with the rate limiter of the client, and reports
+    its status to it"""
+
+    def send(self, request, next):
+        limiter = request.client.rate_limiter
+        if limiter is None:
+            return next(request)
+
+        key = limiter.key_for(request.url, request.headers)
+        limiter.acquire(key)
+        try:
+            response = next(request)
+        except GraphError as e:
+            limiter.record(key, e.status_code, e.headers)
+            raise
+        limiter.record(key, response.status, response.headers)
+        return response
+
+    async def send_async(self, request, next):
+        limiter = request.client.rate_limiter
+        if limiter is None:
+            return await next(request)
+
+        key = limiter.key_for(request.url, request.headers)
+        wait = limiter.reserve(key)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            response = await next(request)
+        except GraphError as e:
+            limiter.record(key, e.status_code, e.headers)
+            raise
+        limiter.record(key, response.status, response.headers)
+        return response
+
+
+class TelemetryHandler(Middleware):
+    """Notifies the hooks of the client. Streamed responses are reported
+    when their headers are received, without reading their body"""
+
+    def send(self, request, next):
+        hooks = request.client.hooks
+        if not hooks:
+            return next(request)
+
+        event = self._start(hooks, request)
+        try:
+            response = next(request)
+        except Exception as e:
+            hooks.request_failed(event, e)
+            raise
+        self._finish(hooks, event, request, response)
+        return response
+
+    async def send_async(self, request, next):
+        hooks = request.client.hooks
+        if not hooks:
+            return await next(request)
+
+        event = self._start(hooks, request)
+        try:
+            response = await next(request)
+        except Exception as e:
+            hooks.request_failed(event, e)
+            raise
+        self._finish(hooks, event, request, response)
+        return response
+
+    @staticmethod
+    def _start(hooks, request):
+        body = request.body
+        bytes_out = os.path.getsize(request.path) if request.path else len(body) if body else None
+        return hooks.request_started(request.method, request.url, request.headers, bytes_out)
+
+    @staticmethod
+    def _finish(hooks, event, request, response):
+        path = request.download_path
+        if path is not None:
+            # The body of a download is in the file, not the response
+            bytes_in = os.path.getsize(path) if response.status == 200 and os.path.exists(path) else None
+            hooks.request_finished(event, response, bytes_in)
+        else:
+            hooks.request_finished(event, response)
+
+
+def _close(response):
+    close = getattr(response, "close", None)
+    if close is not None:
+        close()
@@ -0,0 +1,128 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from concurrent.futures import ThreadPoolExecutor
+from .columnar import iter_record_batches, select_columns
+
+
+class GraphPageIterator(object):
+
+    def __init__(self, request, max_items=None, max_pages=None, prefetch=True):
+        """Initialize an iterator over every object of a collection,
+        following @odata.nextLink from page to page. Only the page being
+        consumed, and the next one when prefetching, are held in memory.
+
+        Args:
+            request (:class:`GraphRequest<msgraph.request.GraphRequest>`):
+                The request for the first page
+            max_items (int): Defaults to None, the maximum number of
+                objects to yield. None yields every object
+            max_pages (int): Defaults to None, the maximum number of
+                pages to fetch. None follows every nextLink
+            prefetch (bool): Defaults to True. If True, the next page is
+                fetched in a background thread while the current page
+                is being consumed
+        """
+        self._request = request
+        self._max_items = max_items
+        self._max_pages = max_pages
+        self._prefetch = prefetch
+        self._next_link = request.request_url
+        self._items_yielded = 0
+        self._pages_fetched = 0
+
+    def __iter__(self):
+        for page in self.pages():
+            for graph_object in page.objects():
+                if self._max_items is not None and self._items_yielded >= self._max_items:
+                    return
+                self._items_yielded += 1
+                yield graph_object
+
+    @property
+    def next_link(self):
+        """Gets the link from which iteration can be resumed with
+        :func:`GraphClient.iter_all<msgraph.client.GraphClient.iter_all>`.
+        While a page is being consumed this is the link of that page,
+        so resuming may repeat objects but never skips any. None once
+        the collection has been consumed completely.
+
+        Returns:
+            str: The link to resume from
+        """
+        return self._next_link
+
+    @property
+    def items_yielded(self):
+        """Gets the number of objects yielded so far
+
+        Returns:
+            int: The number of objects
+        """
+        return self._items_yielded
+
+    @property
+    def pages_fetched(self):
+        """Gets the number of pages fetched so far
+
+        Returns:
+            int: The number of pages
+        """
+        return self._pages_fetched
+
+    def pages(self):
+        """Generator over the pages of the collection
+
+        Yields:
+            :class:`GraphPage<msgraph.request.GraphPage>`: The next page
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if self._prefetch else None
+        try:
+            request = self._request
+            pending = None
+            while request is not None and not self._limit_reached():
+                page = pending.result() if pending is not None else request.get()
+                pending = None
+                self._pages_fetched += 1
+
+                request = page.next_page_request
+                if request is not None and executor is not None and self._needs_page_after(page):
+                    pending = executor.submit(request.get)
+
+                yield page
+
+                self._next_link = page.next_page_link
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def iter_batches(self, select=None, schema=None):
+        """Generator of an Arrow record batch per page, built from the
+        decoded JSON without creating model objects. max_items is not
+        applied, max_pages is. Requires pyarrow
+
+        Args:
+            select (str or list of str): Defaults to None, the columns. If
+                None, the $select of the request, else the properties of
+                the objects of the first page
+            schema (pyarrow.Schema): Defaults to None, the schema of the
+                batches. Set it to get batches that can always be
+                concatenated, types are inferred page by page otherwise
+
+        Yields:
+            pyarrow.RecordBatch: The objects of the next page
+        """
+        select = select or select_columns(self._request.request_url)
+        return iter_record_batches(self.pages(), select, schema)
+
+    def _limit_reached(self):
+        if self._max_pages is not None and self._pages_fetched >= self._max_pages:
+            return True
+        return self._max_items is not None and self._items_yielded >= self._max_items
+
+    def _needs_page_after(self, page):
+        """Whether the page following the specified one will be consumed"""
+        if self._max_pages is not None and self._pages_fetched >= self._max_pages:
+            return False
+        return self._max_items is None or self._items_yielded + len(page) < self._max_items
@@ -0,0 +1,454 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from datetime import date, datetime, timezone
+from urllib.parse import urlparse
+import logging
+import re
+import threading
+from .options import HeaderOption, QueryOption
+from .url_builder import compile_url
+
+logger = logging.getLogger(__name__)
+
+
+def literal(value):
+    """Formats a value as an OData literal
+
+    Args:
+        value: A str, bool, int, float, datetime, date or None
+
+    Returns:
+        str: The literal (ex. 'O''Neil', true, 2024-01-01T00:00:00Z)
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat() + "Z"
+    if isinstance(value, date):
+        return value.isoformat()
+    return "'{}'".format(str(value).replace("'", "''"))
+
+
+class Filter(object):
+
+    def __init__(self, expression, advanced=False):
+        """Initialize a $filter expression. Combine filters with & (and),
+        | (or) and ~ (not)
+
+        Args:
+            expression (str): The expression
+            advanced (bool): Defaults to False, whether the expression is
+                an advanced query of directory objects (ne, not, endswith),
+                which requires the ConsistencyLevel: eventual header
+        """
+        self.expression = expression
+        self.advanced = advanced
+
+    def __and__(self, other):
+        other = _as_filter(other)
+        return Filter("({}) and ({})".format(self, other), self.advanced or other.advanced)
+
+    def __rand__(self, other):
+        return _as_filter(other) & self
+
+    def __or__(self, other):
+        other = _as_filter(other)
+        return Filter("({}) or ({})".format(self, other), self.advanced or other.advanced)
+
+    def __ror__(self, other):
+        return _as_filter(other) | self
+
+    def __invert__(self):
+        return Filter("not ({})".format(self), True)
+
+    def __str__(self):
+        return self.expression
+
+    def __repr__(self):
+        return "Filter({!r})".format(self.expression)
+
+
+def _as_filter(condition):
+    return condition if isinstance(condition, Filter) else Filter(str(condition))
+
+
+class Field(object):
+    __hash__ = None
+
+    def __init__(self, name):
+        """Initialize a property used in $filter, $select and $orderby
+        (ex. Field("displayName") == "Ada")
+
+        Args:
+            name (str): The name of the property, with / for nested
+                properties (ex. "createdBy/user/id")
+        """
+        self.name = name
+
+    def _compare(self, operator, value, advanced=False):
+        return Filter("{} {} {}".format(self.name, operator, literal(value)), advanced)
+
+    def __eq__(self, value):
+        return self._compare("eq", value)
+
+    def __ne__(self, value):
+        return self._compare("ne", value, advanced=True)
+
+    def __gt__(self, value):
+        return self._compare("gt", value)
+
+    def __ge__(self, value):
+        return self._compare("ge", value)
+
+    def __lt__(self, value):
+        return self._compare("lt", value)
+
+    def __le__(self, value):
+        return self._compare("le", value)
+
+    def startswith(self, value):
+        return Filter("startswith({}, {})".format(self.name, literal(value)))
+
+    def endswith(self, value):
+        return Filter("endswith({}, {})".format(self.name, literal(value)), True)
+
+    def contains(self, value):
+        return Filter("contains({}, {})".format(self.name, literal(value)))
+
+    def in_(self, values):
+        return Filter("{} in ({})".format(self.name, ", ".join(literal(value) for value in values)))
+
+    def any(self, condition=None, variable="x"):
+        """Lambda filter on a collection property (ex.
+        Field("assignedLicenses").any(lambda x: x.field("skuId") == sku))
+
+        Args:
+            condition (callable): Defaults to None, a function receiving the
+                range variable and returning a :class:`Filter`. If None,
+                the collection must not be empty
+            variable (str): Defaults to "x", the name of the range variable
+        """
+        if condition is None:
+            return Filter("{}/any()".format(self.name))
+        inner = condition(_RangeVariable(variable))
+        return Filter("{}/any({}: {})".format(self.name, variable, inner), inner.advanced)
+
+    def __str__(self):
+        return self.name
+
+
+class _RangeVariable(Field):
+    """The range variable of a lambda filter, compared directly for
+    collections of primitive values"""
+
+    def field(self, name):
+        return Field("{}/{}".format(self.name, name))
+
+
+class Query(object):
+
+    def __init__(self):
+        """Initialize a builder of OData query options, applied to a
+        request with :func:`apply` or passed to
+        :func:`GraphClient.get_page<msgraph.client.GraphClient.get_page>`::
+
+            Query().select("id", "displayName").filter(Field("accountEnabled") == True).top(50)
+
+        Queries that need the ConsistencyLevel: eventual header, such as
+        $search, $count and advanced filters, send it automatically.
+        """
+        self._select = []
+        self._expand = []
+        self._filters = []
+        self._search = None
+        self._order_by = []
+        self._top = None
+        self._skip = None
+        self._skiptoken = None
+        self._count = False
+        self._consistency_level = None
+
+    def select(self, *fields):
+        """Adds properties to $select
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._select.extend(str(field) for field in fields)
+        return self
+
+    def expand(self, relationship, query=None):
+        """Adds a relationship to $expand, with the nested options of a
+        query (ex. expand("manager", Query().select("id")))
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._expand.append((str(relationship), query))
+        return self
+
+    def filter(self, condition):
+        """Adds a condition to $filter, and-ed with the previous ones
+
+        Args:
+            condition (:class:`Filter` or str): The condition
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._filters.append(_as_filter(condition))
+        return self
+
+    def search(self, text, field=None):
+        """Sets $search
+
+        Args:
+            text (str): The text to search for
+            field (str): Defaults to None, the property to search in, for
+                directory objects (ex. "displayName")
+
+        Returns:
+            :class:`Query`: The query
+        """
+        text = text.replace('"', '\\"')
+        self._search = '"{}:{}"'.format(field, text) if field else '"{}"'.format(text)
+        return self
+
+    def order_by(self, field, descending=False):
+        """Adds a property to $orderby
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._order_by.append("{} desc".format(field) if descending else str(field))
+        return self
+
+    def top(self, count):
+        """Sets $top, the page size
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._top = count
+        return self
+
+    def skip(self, count):
+        """Sets $skip
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._skip = count
+        return self
+
+    def skiptoken(self, token):
+        """Sets $skiptoken, read from an @odata.nextLink
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._skiptoken = token
+        return self
+
+    def count(self, count=True):
+        """Requests @odata.count
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._count = count
+        return self
+
+    def consistency_level(self, value="eventual"):
+        """Sets the ConsistencyLevel header explicitly
+
+        Returns:
+            :class:`Query`: The query
+        """
+        self._consistency_level = value
+        return self
+
+    @property
+    def needs_eventual_consistency(self):
+        """Gets whether the query is an advanced query of directory
+        objects, which Graph only serves with ConsistencyLevel: eventual
+
+        Returns:
+            bool: True for $search, $count and advanced filters
+        """
+        return bool(self._search or self._count or any(condition.advanced for condition in self._filters))
+
+    def query_options(self):
+        """Gets the query options of the query
+
+        Returns:
+            dict of (str, str): The options, by name
+        """
+        options = {}
+        if self._select:
+            options["$select"] = ",".join(self._select)
+        if self._expand:
+            options["$expand"] = ",".join(_expand_item(relationship, query) for relationship, query in self._expand)
+        if self._filters:
+            options["$filter"] = str(self._filters[0]) if len(self._filters) == 1 else \
+                " and ".join("({})".format(condition) for condition in self._filters)
+        if self._search:
+            options["$search"] = self._search
+        if self._order_by:
+            options["$orderby"] = ",".join(self._order_by)
+        if self._top is not None:
+            options["$top"] = str(self._top)
+        if self._skip is not None:
+            options["$skip"] = str(self._skip)
+        if self._skiptoken is not None:
+            options["$skiptoken"] = self._skiptoken
+        if self._count:
+            options["$count"] = "true"
+        return options
+
+    def options(self):
+        """Gets the options to append to a request
+
+        Returns:
+            list of :class:`Option<msgraph.options.Option>`: The query
+                options and the ConsistencyLevel header
+        """
+        options = [QueryOption(key, value) for key, value in self.query_options().items()]
+        consistency_level = self._consistency_level
+        if consistency_level is None and self.needs_eventual_consistency:
+            consistency_level = "eventual"
+        if consistency_level is not None:
+            options.append(HeaderOption("ConsistencyLevel", consistency_level))
+        return options
+
+    def apply(self, request):
+        """Appends the options of the query to a request
+
+        Args:
+            request (:class:`RequestBase<msgraph.request_base.RequestBase>`):
+                The request
+
+        Returns:
+            :class:`RequestBase<msgraph.request_base.RequestBase>`: The request
+        """
+        for option in self.options():
+            request.append_option(option)
+        return request
+
+
+def _expand_item(relationship, query):
+    if query is None:
+        return relationship
+    nested = ";".join("{}={}".format(key, value) for key, value in query.query_options().items())
+    return "{}({})".format(relationship, nested) if nested else relationship
+
+
+class ProjectionPolicy(object):
+
+    #: Policy modes
+    INJECT = "inject"
+    WARN = "warn"
+
+    def __init__(self, defaults=None, mode=INJECT):
+        """Initialize a client-level policy for GET requests sent without
+        $select, which return every property of the objects. Set it on
+        :attr:`GraphClient.projection_policy<msgraph.client.GraphClient.projection_policy>`.
+
+        The resource type of a request is the last segment of its path
+        that is not a key (ex. "users" for users and users/{id},
+        "messages" for me/mailFolders/inbox/messages).
+
+        Args:
+            defaults (dict of (str, list of str)): Defaults to None, the
+                properties to select by resource type
+                (ex. {"users": ["id", "displayName", "mail"]})
+            mode (str): Defaults to INJECT, which adds the default $select
+                of the resource type to the request. WARN only logs a
+                warning, once per resource type
+        """
+        self._defaults = {}
+        self._mode = mode
+        self._warned = set()
+        self._lock = threading.Lock()
+        for resource_type, select in (defaults or {}).items():
+            self.register(resource_type, select)
+
+    @property
+    def mode(self):
+        """Gets and sets the mode of the policy, INJECT or WARN
+
+        Returns:
+            str: The mode
+        """
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self._mode = value
+
+    def register(self, resource_type, select):
+        """Sets the default $select of a resource type
+
+        Args:
+            resource_type (str): The resource type (ex. "users")
+            select (list of str or str): The properties to select
+        """
+        if isinstance(select, str):
+            select = [field.strip() for field in select.split(",")]
+        self._defaults[resource_type.lower()] = ",".join(select)
+
+    def apply(self, request):
+        """Applies the policy to a GET request without $select
+
+        Args:
+            request (:class:`RequestBase<msgraph.request_base.RequestBase>`):
+                The request
+        """
+        if request.method != "GET" or request.get_query_option("$select") is not None:
+            return
+        resource_type = resource_type_for(request.request_url)
+        if resource_type is None:
+            return
+
+        if self._mode == self.WARN:
+            with self._lock:
+                if resource_type in self._warned:
+                    return
+                self._warned.add(resource_type)
+            logger.warning("GET %s without $select returns every property of %s, select the properties used",
+                           urlparse(request.request_url).path, resource_type)
+        else:
+            select = self._defaults.get(resource_type)
+            if select:
+                request.append_option(QueryOption("$select", select))
+
+
+_KEY_SEGMENT = re.compile(r"^[A-Za-z][A-Za-z0-9]*$")
+
+
+def resource_type_for(url):
+    """Gets the resource type of a request URL, the last segment of its
+    path which is neither a key, a cast nor a $value
+
+    Args:
+        url (str): The request URL
+
+    Returns:
+        str: The resource type in lower case (ex. "users"), or None for
+            the $value of a resource
+    """
+    segments = [segment for segment in urlparse(compile_url(url).base).path.split("/") if segment]
+    if segments and segments[-1] == "$value":
+        return None
+    for segment in reversed(segments):
+        if _KEY_SEGMENT.match(segment) and len(segment) <= 40:
+            return segment.lower()
+    return None
@@ -0,0 +1,71 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+import base64
+
+
+class QuickXorHash(object):
+    """The QuickXorHash used by OneDrive for Business and SharePoint to
+    identify file content, with a hashlib-like interface. Every input
+    byte is XORed into a 160-bit register, rotated 11 bits further than
+    the byte before it, and the input length is XORed into the result."""
+
+    WIDTH_IN_BITS = 160
+    SHIFT = 11
+    _MASK = (1 << WIDTH_IN_BITS) - 1
+
+    def __init__(self, data=None):
+        self._state = 0
+        self._shift_so_far = 0
+        self._length_so_far = 0
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        """Adds data to the hash
+
+        Args:
+            data (bytes): The data to add
+        """
+        data = memoryview(data).cast("B")
+        size = len(data)
+        width = self.WIDTH_IN_BITS
+
+        # Bytes whose offsets are equal modulo 160 are rotated by the same
+        # amount, so XOR them together first, 160 bytes at a time
+        folded = 0
+        for offset in range(0, size, width):
+            folded ^= int.from_bytes(data[offset:offset + width], "little")
+        folded = folded.to_bytes(width, "little")
+
+        state = self._state
+        for i in range(min(size, width)):
+            if folded[i]:
+                rotation = (self._shift_so_far + self.SHIFT * i) % width
+                value = folded[i] << rotation
+                state ^= (value | (value >> width)) & self._MASK
+
+        self._state = state
+        self._shift_so_far = (self._shift_so_far + self.SHIFT * (size % width)) % width
+        self._length_so_far += size
+
+    def digest(self):
+        """Gets the hash of the data added so far
+
+        Returns:
+            bytes: The 20 bytes of the hash
+        """
+        result = bytearray(self._state.to_bytes(self.WIDTH_IN_BITS // 8, "little"))
+        length = self._length_so_far.to_bytes(8, "little")
+        for i in range(8):
+            result[len(result) - 8 + i] ^= length[i]
+        return bytes(result)
+
+    def b64digest(self):
+        """Gets the hash in the base64 form used by Graph (file.hashes.quickXorHash)
+
+        Returns:
+            str: The base64 encoded hash
+        """
+        return base64.b64encode(self.digest()).decode("ascii")
@@ -0,0 +1,280 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from .file_utils import atomic_write
+from .quick_xor_hash import QuickXorHash
+
+
+class RangedDownloader(object):
+
+    def __init__(self, http_provider, headers, url, path, max_workers=4, chunk_size=8 * 1024 * 1024,
+                 min_chunk_size=1024 * 1024, max_chunk_size=64 * 1024 * 1024, target_chunk_seconds=2.0,
+                 state_path=None, hashes=None):
+        """Initialize a download that fetches a file with parallel HTTP
+        Range requests, writing every range in place in a preallocated
+        file. Completed ranges are recorded in a sidecar state file, so
+        that an interrupted download only fetches what is missing.
+
+        Args:
+            http_provider (:class:`HttpProvider<msgraph.http_provider.HttpProvider>`):
+                The provider whose pooled session and retry policy are used
+            headers (dict of (str, str)): The headers of the request
+            url (str): The URL from which to download the file
+            path (str): The local path to save the downloaded file
+            max_workers (int): Defaults to 4, the number of ranges
+                downloaded at the same time
+            chunk_size (int): Defaults to 8 MiB, the size of the first ranges
+            min_chunk_size (int): Defaults to 1 MiB, the smallest range size
+            max_chunk_size (int): Defaults to 64 MiB, the largest range size
+            target_chunk_seconds (float): Defaults to 2, the time a range
+                should take to download. The range size is adapted to the
+                measured throughput to meet it
+            state_path (str): Defaults to the file path with a ".download"
+                suffix, the sidecar file recording completed ranges
+            hashes (dict of (str, str)): Defaults to None, the hashes of
+                the drive item (file.hashes), of which sha1Hash and
+                quickXorHash are checked once the download completes
+        """
+        self._http_provider = http_provider
+        # Ranges address the encoded representation of a compressed
+        # response, so the file is requested without content coding
+        self._headers = dict(headers)
+        self._headers["Accept-Encoding"] = "identity"
+        self._url = url
+        self._path = path
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._min_chunk_size = min_chunk_size
+        self._max_chunk_size = max_chunk_size
+        self._target_chunk_seconds = target_chunk_seconds
+        self._state_path = path + ".download" if state_path is None else state_path
+        self._hashes = hashes or {}
+        self._lock = threading.Lock()
+        self._pending = []
+        self._done = []
+        self._size = None
+        self._etag = None
+
+    def download(self):
+        """Downloads the file
+
+        Returns:
+            tuple of (int, dict, str): The status and headers of the first
+                response, and its body if the request failed. The status
+                is 200 once the whole file is downloaded
+        """
+        status, headers, text, final_url = self._probe()
+        if status != 206:
+            # The server returned an error, or did not support ranges
+            # and the whole file was written from the first response
+            return status, headers, text
+
+        download_url, range_headers = self._url, self._headers
+        if final_url != self._url:
+            # Redirected to a pre-authenticated URL which must not
+            # receive the bearer token
+            download_url = final_url
+            range_headers = {key: value for key, value in self._headers.items()
+                             if key.lower() != "authorization"}
+
+        resume = os.path.exists(self._path) and os.path.getsize(self._path) == self._size
+        self._load_state(resume)
+        with open(self._path, "r+b" if resume else "wb") as f:
+            if not resume:
+                f.truncate(self._size)
+                if hasattr(os, "posix_fallocate") and self._size:
+                    os.posix_fallocate(f.fileno(), 0, self._size)
+
+            writer = _RangeWriter(f)
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                futures = [executor.submit(self._worker, writer, download_url, range_headers)
+                           for _ in range(self._max_workers)]
+                for future in futures:
+                    future.result()
+
+        self._verify()
+        try:
+            os.remove(self._state_path)
+        except OSError:
+            pass
+        # The whole file was received
+        return 200, headers, None
+
+    def _get(self, url, headers):
+        return self._http_provider._send_with_retry(
+            "GET", url, headers, lambda: self._http_provider.session.get(url, headers=headers, stream=True,
+                                                                         timeout=self._http_provider.timeout))
+
+    def _probe(self):
+        """Requests the first byte, to learn the size of the file and
+        the URL the download is redirected to
+
+        Returns:
+            tuple of (int, dict, str, str): The status, headers and body
+                of the response, and the URL it was finally served from
+        """
+        headers = dict(self._headers)
+        headers["Range"] = "bytes=0-0"
+        response = self._get(self._url, headers)
+        if response.status_code == 416:
+            # Empty files have no first byte
+            response.close()
+            response = self._get(self._url, self._headers)
+
+        with response:
+            status = response.status_code
+            if status == 206:
+                match = re.match(r"bytes \d+-\d+/(\d+)", response.headers.get("Content-Range", ""))
+                if match is None:
+                    raise IOError("Invalid Content-Range in the response: {}"
+                                  .format(response.headers.get("Content-Range")))
+                self._size = int(match.group(1))
+                self._etag = response.headers.get("ETag")
+                return status, response.headers, None, response.url
+            if status == 200:
+                self._write_single_stream(response)
+                return status, response.headers, None, response.url
+            return status, response.headers, response.text, response.url
+
+    def _write_single_stream(self, response):
+        with open(self._path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+        self._verify()
+
+    def _load_state(self, resume):
+        self._done = []
+        if resume:
+            try:
+                with open(self._state_path, "r") as f:
+                    state = json.load(f)
+                if state.get("size") == self._size and state.get("etag") == self._etag:
+                    self._done = [tuple(done) for done in state.get("done", [])]
+            except (IOError, ValueError):
+                pass
+
+        self._pending = []
+        position = 0
+        for start, end in sorted(self._done):
+            if start > position:
+                self._pending.append([position, start - 1])
+            position = max(position, end + 1)
+        if position < self._size:
+            self._pending.append([position, self._size - 1])
+
+    def _save_state(self):
+        atomic_write(self._state_path, json.dumps({
+            "url": self._url,
+            "size": self._size,
+            "etag": self._etag,
+            "done": self._done
+        }))
+
+    def _next_range(self):
+        with self._lock:
+            if not self._pending:
+                return None
+            start, end = self._pending[0]
+            range_end = min(end, start + self._chunk_size - 1)
+            if range_end == end:
+                self._pending.pop(0)
+            else:
+                self._pending[0][0] = range_end + 1
+            return start, range_end
+
+    def _worker(self, writer, url, headers):
+        while True:
+            next_range = self._next_range()
+            if next_range is None:
+                return
+            start, end = next_range
+
+            range_headers = dict(headers)
+            range_headers["Range"] = "bytes={}-{}".format(start, end)
+            began = time.monotonic()
+            with self._get(url, range_headers) as response:
+                if response.status_code != 206:
+                    raise IOError("Range request for bytes {}-{} failed with status {}"
+                                  .format(start, end, response.status_code))
+                offset = start
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    writer.write(chunk, offset)
+                    offset += len(chunk)
+            if offset != end + 1:
+                raise IOError("Range request for bytes {}-{} ended after {} bytes".format(start, end, offset - start))
+
+            self._record(start, end, time.monotonic() - began)
+
+    def _record(self, start, end, elapsed):
+        with self._lock:
+            self._done.append((start, end))
+            self._save_state()
+
+            # Size the next ranges so that each takes about target_chunk_seconds
+            throughput = (end - start + 1) / max(elapsed, 0.001)
+            chunk_size = int(throughput * self._target_chunk_seconds) // 65536 * 65536
+            self._chunk_size = max(self._min_chunk_size, min(self._max_chunk_size, chunk_size))
+
+    def _verify(self):
+        """Checks the downloaded file against the hashes of the drive item"""
+        verify_hashes(self._path, self._hashes)
+
+
+def verify_hashes(path, hashes):
+    """Checks a downloaded file against the hashes of its drive item
+
+    Args:
+        path (str): The path of the file
+        hashes (dict of (str, str)): The file.hashes of the drive item,
+            of which sha1Hash and quickXorHash are checked when present
+
+    Raises:
+        ValueError: If a hash does not match
+    """
+    expected_sha1 = (hashes or {}).get("sha1Hash")
+    expected_quick_xor = (hashes or {}).get("quickXorHash")
+    if not expected_sha1 and not expected_quick_xor:
+        return
+
+    sha1 = hashlib.sha1() if expected_sha1 else None
+    quick_xor = QuickXorHash() if expected_quick_xor else None
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(4 * 1024 * 1024), b""):
+            if sha1 is not None:
+                sha1.update(block)
+            if quick_xor is not None:
+                quick_xor.update(block)
+
+    if sha1 is not None and sha1.hexdigest().lower() != expected_sha1.lower():
+        raise ValueError("The sha1Hash of {} does not match the drive item.".format(path))
+    if quick_xor is not None and quick_xor.b64digest() != expected_quick_xor:
+        raise ValueError("The quickXorHash of {} does not match the drive item.".format(path))
+
+
+class _RangeWriter(object):
+    """Writes blocks at absolute offsets of a file from many threads"""
+
+    def __init__(self, f):
+        self._f = f
+        self._fd = f.fileno()
+        self._lock = threading.Lock()
+
+    def write(self, data, offset):
+        if hasattr(os, "pwrite"):
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(self._fd, view, offset)
+                view = view[written:]
+                offset += written
+        else:
+            with self._lock:
+                self._f.seek(offset)
+                self._f.write(data)
@@ -0,0 +1,243 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import threading
+import time
+from .retry import retry_after
+from .session import token_claims
+
+
+class AdaptiveRateLimiter(object):
+
+    #: Statuses through which Graph signals that a client is sending too fast
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, initial_rate=10.0, min_rate=0.5, max_rate=200.0, burst=None,
+                 increase=1.0, decrease_factor=0.5, low_remaining_ratio=0.1):
+        """Initialize a client-side rate limiter. Requests are paced by
+        a token bucket per (tenant, resource family) whose rate follows
+        additive-increase/multiplicative-decrease: it grows slowly while
+        requests succeed and is cut on every throttled response.
+
+        Args:
+            initial_rate (float): Defaults to 10, the starting number of
+                requests per second of every bucket
+            min_rate (float): Defaults to 0.5, the lowest rate a bucket
+                can be cut to
+            max_rate (float): Defaults to 200, the highest rate a bucket
+                can grow to
+            burst (float): Defaults to None, the number of requests that
+                can be sent at once after a quiet period. If None, one
+                second worth of requests at the current rate
+            increase (float): Defaults to 1, the number of requests per
+                second added to the rate for every second worth of
+                successful requests
+            decrease_factor (float): Defaults to 0.5, the factor applied
+                to the rate on every throttled response
+            low_remaining_ratio (float): Defaults to 0.1. When Graph reports
+                a RateLimit-Remaining below this share of RateLimit-Limit,
+                the rate stops increasing and is capped to what remains
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.low_remaining_ratio = low_remaining_ratio
+        self._buckets = {}
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key_for(self, url, headers):
+        """Gets the bucket key of a request
+
+        Args:
+            url (str): The URL of the request
+            headers (dict of (str, str)): The headers of the request,
+                including Authorization
+
+        Returns:
+            tuple of (str, str): The tenant id and the resource family
+        """
+        return self._tenant(headers), resource_family(url)
+
+    def rate(self, key):
+        """Gets the current rate of a bucket
+
+        Args:
+            key (tuple of (str, str)): The bucket key
+
+        Returns:
+            float: The number of requests per second
+        """
+        with self._lock:
+            return self._bucket(key).rate
+
+    def reserve(self, key):
+        """Takes a token from a bucket without waiting
+
+        Args:
+            key (tuple of (str, str)): The bucket key
+
+        Returns:
+            float: The number of seconds to wait before sending the request
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(key)
+            bucket.refill(now)
+            bucket.tokens -= 1
+            wait = max(0.0, bucket.blocked_until - now)
+            if bucket.tokens < 0:
+                wait = max(wait, -bucket.tokens / bucket.rate)
+            return wait
+
+    def acquire(self, key):
+        """Waits until a request can be sent for the specified bucket
+
+        Args:
+            key (tuple of (str, str)): The bucket key
+        """
+        wait = self.reserve(key)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, key, status, headers=None):
+        """Adjusts the rate of a bucket from the outcome of a request
+
+        Args:
+            key (tuple of (str, str)): The bucket key
+            status (int): The HTTP status of the response
+            headers (dict of (str, str)): Defaults to None, the headers
+                of the response
+        """
+        headers = headers or {}
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(key)
+            if status in self.THROTTLE_STATUSES:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+                delay = retry_after(headers)
+                if delay:
+                    bucket.blocked_until = max(bucket.blocked_until, now + delay)
+                bucket.tokens = min(bucket.tokens, 0)
+                return
+
+            if not self._near_limit(bucket, headers) and 200 <= status < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+
+    def on_retry(self, method, url, request_headers, status, response_headers, delay):
+        """Listener for :func:`RetryPolicy.add_listener<msgraph.retry.RetryPolicy.add_listener>`,
+        so that throttled attempts retried by the HTTP provider also
+        slow the limiter down"""
+        if status is not None:
+            self.record(self.key_for(url, request_headers), status, response_headers)
+
+    def _near_limit(self, bucket, headers):
+        """Caps the rate of a bucket to the budget Graph reports as
+        remaining, if any
+
+        Returns:
+            bool: True if the budget is almost spent
+        """
+        values = {key.lower(): value for key, value in headers.items()}
+        try:
+            remaining = float(values["ratelimit-remaining"])
+            limit = float(values["ratelimit-limit"])
+        except (KeyError, ValueError):
+            return False
+
+        if limit <= 0 or remaining / limit >= self.low_remaining_ratio:
+            return False
+
+        try:
+            reset = float(values.get("ratelimit-reset", 0))
+        except ValueError:
+            reset = 0
+        if reset > 0:
+            bucket.rate = max(self.min_rate, min(bucket.rate, remaining / reset))
+        return True
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _TokenBucket(self.initial_rate, self.burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _tenant(self, headers):
+        authorization = None
+        for key, value in (headers or {}).items():
+            if key.lower() == "authorization":
+                authorization = value
+                break
+        if not authorization:
+            return None
+
+        with self._lock:
+            tenant = self._tenants.get(authorization)
+            if tenant is not None:
+                self._tenants.move_to_end(authorization)
+                return tenant
+
+        tenant = token_claims(authorization.split(" ")[-1]).get("tid", "")
+        with self._lock:
+            self._tenants[authorization] = tenant
+            if len(self._tenants) > 1024:
+                self._tenants.popitem(last=False)
+        return tenant
+
+
+class _TokenBucket(object):
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    @property
+    def capacity(self):
+        return self.burst if self.burst is not None else max(1.0, self.rate)
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+#: Path segments identifying the mail family of resources
+MAIL_SEGMENTS = ("messages", "mailfolders", "sendmail", "events", "calendar", "calendars", "contacts")
+#: Path segments identifying the files family of resources
+DRIVE_SEGMENTS = ("drive", "drives", "items", "sites")
+
+
+def resource_family(url):
+    """Gets the family of resources a URL belongs to, used to pace
+    requests separately for services that Graph throttles separately
+
+    Args:
+        url (str): The URL of the request
+
+    Returns:
+        str: "mail", "drives", or the first segment of the path (ex. "users")
+    """
+    segments = [segment.lower() for segment in urlsplit(url).path.split("/") if segment]
+    if segments and (segments[0] in ("v1.0", "beta")):
+        segments = segments[1:]
+    if not segments:
+        return ""
+
+    for segment in segments:
+        name = segment.split("(")[0]
+        if name in MAIL_SEGMENTS:
+            return "mail"
+        if name in DRIVE_SEGMENTS:
+            return "drives"
+
+    first = segments[0].split("(")[0]
+    return "users" if first == "me" else first
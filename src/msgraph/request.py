@@ -2,9 +2,14 @@
 
 from __future__ import unicode_literals
 from .request_base import RequestBase
+from .error import GraphError
+from .http_response import StreamingHttpResponse
+from .options import HeaderOption
+from .json_stream import JsonCollectionStream
+from .columnar import infer_columns, select_columns, to_columns, to_arrow_table
 from collections import UserList
-import json
-from .model.extension import get_object_class
+from .type_registry import default_registry
+from .url_builder import compile_url
 
 
 class GraphRequest(RequestBase):
@@ -26,7 +31,19 @@ class GraphRequest(RequestBase):
             url_segment (str): The segment you would like to append
                 to the existing request URL.
         """
-        return self._request_url + "/" + url_segment
+        return compile_url(self._request_url).append(url_segment).build()
+
+    def _next_page_request(self, next_page_link):
+        """Creates the request for the next page of a collection,
+        carrying over the headers of this request
+
+        Args:
+            next_page_link (str): The @odata.nextLink of the current page
+        """
+        request = type(self)(next_page_link, self._client)
+        for key, value in self._headers.items():
+            request.append_option(HeaderOption(key, value))
+        return request
 
     def get_value(self):
         """Gets single just the value from a property. No JSON data is returned.
@@ -35,12 +52,44 @@ class GraphRequest(RequestBase):
         self.method = "GET"
         return self.send().content
 
-    def get(self):
+    def get(self, stream=False):
         """Sends GET request and returns data.
-        :returns GraphPage with data returned by request.
+        :param stream: parse the objects of the page as they arrive instead of
+            reading the whole response first.
+        :returns GraphPage with data returned by request, or a StreamingGraphPage if stream is set.
         """
         self.method = "GET"
-        return GraphResponse(json.loads(self.send().content)).get_page()
+        if stream:
+            return StreamingGraphPage(self._send_stream(), self._next_page_request)
+
+        page = GraphResponse(self._client.codec.loads(self.send().raw_content)).get_page()
+        page._select = select_columns(self.request_url)
+        if page.next_page_link:
+            page._next_page_request = self._next_page_request(page.next_page_link)
+        return page
+
+    def _send_stream(self):
+        """Sends the request for a streamed page
+
+        Returns:
+            :class:`StreamingHttpResponse<msgraph.http_response.StreamingHttpResponse>`:
+                The successful response
+
+        Raises:
+            GraphError: If the response is not successful. Errors whose
+                body is empty or has no "error" are not raised by the
+                HTTP provider
+        """
+        response = self.send(stream=True)
+        if not 200 <= response.status < 300:
+            raise GraphError({"message": "The request failed with status {}: {}".format(
+                response.status, response.content or "no content")}, response.status, response.headers)
+        if not isinstance(response, StreamingHttpResponse):
+            # A response returned whole, ex. by a middleware
+            content = response.raw_content or b""
+            response = StreamingHttpResponse(response.status, response.headers,
+                                             [content.encode("utf-8") if not isinstance(content, bytes) else content])
+        return response
 
     def post(self, data_dict):
         """Sends POST request and gets the page content.
@@ -48,7 +97,7 @@ class GraphRequest(RequestBase):
         :returns GraphPage with data returned by request.
         """
         self.method = "POST"
-        return GraphResponse(json.loads(self.send(data_dict).content)).get_page()
+        return GraphResponse(self._client.codec.loads(self.send(data_dict).raw_content)).get_page()
 
     def patch(self, data_dict):
         """Sends PATCH request.
@@ -70,32 +119,87 @@ class GraphResponse(object):
             self._data = data_dict.get("value", [data_dict])
             self._count = data_dict.get("@odata.count")
             self._next_page_link = data_dict.get("@odata.nextLink")
+            self._delta_link = data_dict.get("@odata.deltaLink")
             self._context = data_dict.get("@odata.context")
         else:
             self._data = None
             self._count = None
             self._next_page_link = None
+            self._delta_link = None
             self._context = None
 
     def get_page(self):
         if self._data:
-            return GraphPage(self._data, count=self._count, context=self._context, next_page_link=self._next_page_link)
+            return GraphPage(self._data, count=self._count, context=self._context, next_page_link=self._next_page_link,
+                             delta_link=self._delta_link)
         else:
-            return GraphPage(None)
+            # An empty page may still link to further results
+            return GraphPage(None, next_page_link=self._next_page_link, delta_link=self._delta_link)
 
 
 class GraphPage(UserList):
-    def __init__(self, graph_objects=[], count=None, context=None, next_page_link=None):
+    def __init__(self, graph_objects=[], count=None, context=None, next_page_link=None, delta_link=None):
         super().__init__(graph_objects)
         self._count = count
         self._context = context
         self._next_page_request = None
         self._next_page_link = next_page_link
+        self._delta_link = delta_link
+        self._wrappers = {}
+        self._select = None
 
     def __getitem__(self, item):
-        object_dict = super().__getitem__(item)
-        c = get_object_class(self.context, object_dict.get('@odata.type'))
-        return c(object_dict)
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        object_dict = self.data[item]
+        index = item % len(self.data)
+        # The wrapper of an index is reused as long as the index holds the
+        # same dict, so that mutations of the page never return a stale one
+        cached = self._wrappers.get(index)
+        if cached is not None and cached[0] is object_dict:
+            return cached[1]
+
+        c = default_registry.resolve(self.context, object_dict.get('@odata.type'))
+        wrapper = c(object_dict)
+        self._wrappers[index] = (object_dict, wrapper)
+        return wrapper
+
+    def objects(self):
+        """Generator over the objects in the page, converted to
+        their model classes"""
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_records(self, select=None):
+        """Gets the objects of the page as columns, built from the decoded
+        JSON without creating model objects (ex. pandas.DataFrame(page.to_records()))
+
+        Args:
+            select (str or list of str): Defaults to None, the columns. If
+                None, the $select of the request, else every property of
+                the objects
+
+        Returns:
+            dict of (str, list): The values of each column
+        """
+        return to_columns(self.data, infer_columns(self.data, select or self._select))
+
+    def to_arrow(self, select=None, schema=None):
+        """Gets the objects of the page as an Arrow table, built from the
+        decoded JSON without creating model objects. Requires pyarrow
+
+        Args:
+            select (str or list of str): Defaults to None, the columns. If
+                None, the $select of the request, else every property of
+                the objects
+            schema (pyarrow.Schema): Defaults to None, the schema of the
+                table. If None, types are inferred
+
+        Returns:
+            pyarrow.Table: The table
+        """
+        return to_arrow_table(self.data, select or self._select, schema)
 
     @property
     def api_count(self):
@@ -113,6 +217,7 @@ class GraphPage(UserList):
     @context.setter
     def context(self, val):
         self._context = val
+        self._wrappers.clear()
 
     @property
     def next_page_request(self):
@@ -130,3 +235,86 @@ class GraphPage(UserList):
     @next_page_link.setter
     def next_page_link(self, value):
         self._next_page_link = value
+
+    @property
+    def delta_link(self):
+        """The @odata.deltaLink of the last page of a delta query, from
+        which the changes made after it can be requested"""
+        return self._delta_link
+
+    @delta_link.setter
+    def delta_link(self, value):
+        self._delta_link = value
+
+
+class StreamingGraphPage(object):
+    def __init__(self, response, next_page_request_factory=None):
+        """Page of a collection whose objects are parsed one at a time
+        while the response is read. It can only be iterated once, and
+        should be closed if it is not read to the end.
+
+        :param response: StreamingHttpResponse of the collection request.
+        :param next_page_request_factory: callable creating the request for a next page link.
+        """
+        self._response = response
+        self._stream = JsonCollectionStream(response.iter_content())
+        self._next_page_request_factory = next_page_request_factory
+
+    def __iter__(self):
+        return self.objects()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def objects(self):
+        """Generator over the objects in the page, converted to
+        their model classes as they are parsed"""
+        try:
+            for object_dict in self._stream:
+                c = default_registry.resolve(self.context, object_dict.get('@odata.type'))
+                yield c(object_dict)
+        finally:
+            self.close()
+
+    def close(self):
+        """Releases the connection of the response"""
+        self._response.close()
+
+    @property
+    def api_count(self):
+        """Count returned by API when it's requested."""
+        return self._stream.properties.get("@odata.count")
+
+    @property
+    def context(self):
+        """
+        Get page data context for all objects on it
+        :return: GraphClass
+        """
+        return self._stream.properties.get("@odata.context")
+
+    @property
+    def next_page_link(self):
+        """Link to the next page. Graph sends it before the objects, but a
+        link sent after them is only known once the page has been read."""
+        return self._stream.properties.get("@odata.nextLink")
+
+    @property
+    def delta_link(self):
+        """The @odata.deltaLink of the last page of a delta query. Graph
+        sends it after the objects, so it is known once the page has been read."""
+        return self._stream.properties.get("@odata.deltaLink")
+
+    @property
+    def next_page_request(self):
+        """Gets a request for the next page of a collection, if one exists
+
+        Returns:
+            The request object to send
+        """
+        if self.next_page_link and self._next_page_request_factory is not None:
+            return self._next_page_request_factory(self.next_page_link)
+        return None
@@ -3,10 +3,13 @@ Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the M
 """
 from __future__ import generators
 from __future__ import unicode_literals
+import uuid
 from .version import __version__
 from .options import *
+from .graph_object_base import GraphObjectBase
 from .model.odata_object_base import OdataObjectBase
-from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from .url_builder import compile_url
+from .middleware import PipelineRequest
 
 
 class RequestBase(object):
@@ -28,6 +31,7 @@ class RequestBase(object):
         self._query_options = {}
         self._content_type = None
         self._method = None
+        self._url = None
 
         if options:
             header_list = [
@@ -40,16 +44,15 @@ class RequestBase(object):
 
     @property
     def request_url(self):
-        """Gets the request URL with query string appended
+        """Gets the request URL with query string appended. It is built
+        once, and again only after a query option is appended
 
         Returns:
             str: The request URL
         """
-        url_parts = list(urlparse(self._request_url))
-        query_dict = dict(parse_qsl(url_parts[4]))
-        self._query_options.update(query_dict)
-        url_parts[4] = urlencode(self._query_options)
-        return urlunparse(url_parts)
+        if self._url is None:
+            self._url = compile_url(self._request_url).build(self._query_options)
+        return self._url
 
     @property
     def response(self):
@@ -94,68 +97,111 @@ class RequestBase(object):
             self._headers[option.key] = option.value
         elif isinstance(option, QueryOption):
             self._query_options[option.key] = option.value
+            self._url = None
 
-    def send(self, content=None, path=None):
+    def get_query_option(self, key):
+        """Gets the value of a query option, appended to the request or
+        present in the query string of its URL (ex. of a nextLink)
+
+        Args:
+            key (str): The name of the option (ex. "$select")
+
+        Returns:
+            str: The value, or None
+        """
+        for name, value in compile_url(self._request_url).query:
+            if name == key:
+                return value
+        return self._query_options.get(key)
+
+    def send(self, content=None, path=None, stream=False):
         """Send the request using the client specified at request initialization.
         :param content:str: Defaults to None, the body of the request that will be sent
         :param path:str: Defaults to None, the local path of the file which will be sent
+        :param stream:bool: Defaults to False, return the response before its body is read
         :return HttpResponse: The response to the request
+
+        The request goes through the middleware of the client, which
+        authenticates it, adds the default headers and applies the
+        projection policy, cache, rate limiter and hooks.
         """
-        self._client.auth_provider.authenticate_request(self)
+        body = None if path else self._encode_content(content)
+        self._response = self._client.pipeline.send(PipelineRequest(self, body, path, stream))
+        return self._response
 
+    def _append_send_headers(self):
+        """Appends the headers sent with every request, once the
+        request has been authenticated"""
         self.append_option(HeaderOption("Content-Type", "application/json"))
         self.append_option(HeaderOption("X-RequestStats", "SDK-Version=python-v"+__version__))
+        # Correlates the request with the request-id of the Graph logs
+        self.append_option(HeaderOption("client-request-id", str(uuid.uuid4())))
 
         if self._content_type:
             self.append_option(HeaderOption("Content-Type", self._content_type))
 
-        if path:
-            self._response = self._client.http_provider.send(self._method,
-                                                             self._headers,
-                                                             self._request_url,
-                                                             path=path)
+    @staticmethod
+    def _serialize_content(content):
+        """Converts a request body to a JSON serializable dict
+
+        Args:
+            content (:class:`OdataObjectBase`, :class:`GraphObjectBase` or dict):
+                The body of the request
+
+        Returns:
+            dict: The body to send, or None if there is no body
+        """
+        if not content:
+            return None
+
+        if isinstance(content, OdataObjectBase):
+            return content.serialized()
+        elif isinstance(content, GraphObjectBase):
+            return content.to_dict()
+        elif isinstance(content, dict):
+            return content
         else:
-            content_dict = None
-
-            if content:
-                if isinstance(content, OdataObjectBase):
-                    content_dict = content.serialized()
-                elif isinstance(content, dict):
-                    content_dict = content
-                else:
-                    raise ValueError("Request body must be JSON serializable.")
-
-            self._response = self._client.http_provider.send(self._method,
-                                                             self._headers,
-                                                             self.request_url,
-                                                             content=content_dict)
-        return self._response
+            raise ValueError("Request body must be JSON serializable.")
+
+    def _encode_content(self, content):
+        """Encodes a request body to JSON with the codec of the client
+
+        Args:
+            content (:class:`OdataObjectBase`, :class:`GraphObjectBase` or dict):
+                The body of the request
 
-    def download_item(self, path):
+        Returns:
+            bytes: The body to send, or None if there is no body
+        """
+        serialized = self._serialize_content(content)
+        return None if serialized is None else self._client.codec.dumps(serialized)
+
+    def download_item(self, path, **download_options):
         """Download a file to a local path
 
         Args:
             path (str): The local path to download the file
+            download_options: Further arguments of the HTTP provider
+                download, such as max_workers or hashes
 
         Returns:
             :class:`HttpResponse<microsoft.http_response.HttpResponse>`:
                 The response to the request 
         """
-        self._client.auth_provider.authenticate_request(self)
+        self.method = "GET"
+        return self._client.pipeline.send(PipelineRequest(self, download_path=path,
+                                                          download_options=download_options))
 
+    def _append_download_headers(self):
+        """Appends the headers sent with every download, once the
+        request has been authenticated"""
         self.append_option(HeaderOption("X-RequestStats",
                                         "SDK-Version=python-v"+__version__))
+        self.append_option(HeaderOption("client-request-id", str(uuid.uuid4())))
 
         if self._content_type:
             self.append_option(HeaderOption("Content-Type", self._content_type))
 
-        response = self._client.http_provider.download(
-            self._headers,
-            self.request_url,
-            path)
-
-        return response
-
     def set_query_options(self, expand=None, select=None, filter=None, top=None, order_by=None, count=False):
         """Adds query options from a set of known parameters
 
@@ -0,0 +1,221 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+
+
+class RetryPolicy(object):
+
+    #: Statuses returned by Graph when a request is throttled or the service is busy
+    RETRY_STATUSES = (429, 503, 504)
+    #: Methods that can be sent again without side effects
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def __init__(self, max_attempts=5, max_elapsed=120, backoff_factor=0.5, max_backoff=60,
+                 jitter=True, retry_statuses=None, idempotent_methods=None):
+        """Initialize the policy deciding whether, and when, a throttled
+        request is sent again.
+
+        Args:
+            max_attempts (int): Defaults to 5, the maximum number of times
+                a request is sent, including the first attempt
+            max_elapsed (float): Defaults to 120, the maximum number of
+                seconds spent on a request, including time spent waiting
+            backoff_factor (float): Defaults to 0.5, the delay in seconds
+                before the first retry when Graph does not specify one.
+                The delay doubles for every further retry
+            max_backoff (float): Defaults to 60, the maximum computed delay
+                in seconds between two attempts. A longer delay requested
+                by Graph is honored, and the request is not retried if it
+                exceeds max_elapsed
+            jitter (bool): Defaults to True. If True, computed delays are
+                randomized so that clients do not retry in lockstep
+            retry_statuses (tuple of int): Defaults to :attr:`RETRY_STATUSES`,
+                the statuses that are retried
+            idempotent_methods (tuple of str): Defaults to :attr:`IDEMPOTENT_METHODS`,
+                the methods retried on any retry status. Other methods are
+                only retried on 429, which Graph returns before processing
+                the request
+        """
+        self.max_attempts = max_attempts
+        self.max_elapsed = max_elapsed
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = self.RETRY_STATUSES if retry_statuses is None else tuple(retry_statuses)
+        self.idempotent_methods = self.IDEMPOTENT_METHODS if idempotent_methods is None else tuple(idempotent_methods)
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._sleep_time = 0.0
+        self._listeners = []
+
+    @property
+    def retries(self):
+        """Gets the number of retries made with this policy
+
+        Returns:
+            int: The number of retries
+        """
+        return self._retries
+
+    @property
+    def sleep_time(self):
+        """Gets the number of seconds spent waiting between attempts
+
+        Returns:
+            float: The time spent sleeping
+        """
+        return self._sleep_time
+
+    def reset_counters(self):
+        """Resets :attr:`retries` and :attr:`sleep_time` to zero"""
+        with self._lock:
+            self._retries = 0
+            self._sleep_time = 0.0
+
+    def is_retryable(self, method, status):
+        """Whether a response with the specified status can be retried
+
+        Args:
+            method (str): The HTTP method of the request
+            status (int): The HTTP status of the response, or None if
+                the request failed to connect
+
+        Returns:
+            bool: True if the request can be sent again
+        """
+        idempotent = method.upper() in self.idempotent_methods
+        if status is None:
+            return idempotent
+        if status not in self.retry_statuses:
+            return False
+        return idempotent or status == 429
+
+    def get_delay(self, attempt, headers=None):
+        """Gets the number of seconds to wait before the next attempt.
+        The delay requested by Graph, through x-ms-retry-after-ms or
+        Retry-After, takes precedence over exponential backoff and is
+        not capped: retrying sooner would be throttled again.
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 1
+            headers (dict of (str, str)): Defaults to None, the headers
+                of the failed response
+
+        Returns:
+            float: The delay in seconds
+        """
+        delay = retry_after(headers) if headers else None
+        if delay is not None:
+            return delay
+
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            backoff = backoff / 2 + random.uniform(0, backoff / 2)
+        return backoff
+
+    def should_retry(self, attempt, elapsed, delay):
+        """Whether another attempt fits within the attempt and time caps
+
+        Args:
+            attempt (int): The number of the attempt that failed, starting at 1
+            elapsed (float): The number of seconds since the first attempt
+            delay (float): The number of seconds to wait before the next attempt
+
+        Returns:
+            bool: True if another attempt can be made
+        """
+        return attempt < self.max_attempts and elapsed + delay <= self.max_elapsed
+
+    def add_listener(self, listener):
+        """Registers a callable notified before every retry. It is called
+        with the keyword arguments method, url, request_headers, status,
+        response_headers and delay. status and response_headers are None
+        when the request failed to connect.
+
+        Args:
+            listener (callable): The callable to notify
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Unregisters a callable added with :func:`add_listener`. A
+        callable added several times stays registered until it is removed
+        as many times
+
+        Args:
+            listener (callable): The callable to remove
+        """
+        self._listeners.remove(listener)
+
+    def notify(self, method, url, request_headers, status, response_headers, delay):
+        """Notifies the listeners that a request is about to be retried
+
+        Args:
+            method (str): The HTTP method of the request
+            url (str): The URL of the request
+            request_headers (dict of (str, str)): The headers of the request
+            status (int): The status of the failed attempt, or None
+            response_headers (dict of (str, str)): The headers of the
+                failed attempt, or None
+            delay (float): The number of seconds waited before the retry
+        """
+        # A listener registered by several clients (ex. a shared rate
+        # limiter) is notified once
+        for listener in list(dict.fromkeys(self._listeners)):
+            listener(method=method, url=url, request_headers=request_headers,
+                     status=status, response_headers=response_headers, delay=delay)
+
+    def record(self, delay):
+        """Counts a retry that waits for the specified delay
+
+        Args:
+            delay (float): The number of seconds waited before the retry
+        """
+        with self._lock:
+            self._retries += 1
+            self._sleep_time += delay
+
+    def sleep(self, delay):
+        """Counts a retry and waits for the specified delay
+
+        Args:
+            delay (float): The number of seconds to wait
+        """
+        self.record(delay)
+        time.sleep(delay)
+
+
+def retry_after(headers):
+    """Reads the delay requested by Graph from response headers
+
+    Args:
+        headers (dict of (str, str)): The headers of the response
+
+    Returns:
+        float: The delay in seconds, or None if no delay was requested
+    """
+    values = {key.lower(): value for key, value in headers.items()}
+
+    if "x-ms-retry-after-ms" in values:
+        try:
+            return max(0.0, float(values["x-ms-retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+
+    if "retry-after" in values:
+        value = values["retry-after"]
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    return None
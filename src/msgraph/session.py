@@ -3,7 +3,14 @@ Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the M
 """
 from __future__ import unicode_literals
 from .session_base import SessionBase
+from .file_utils import atomic_write, file_lock
 from time import time
+import base64
+import json
+import os
+
+#: Version of the format written by :func:`Session.save_session`
+SESSION_FORMAT_VERSION = 1
 
 
 class Session(SessionBase):
@@ -27,6 +34,7 @@ class Session(SessionBase):
         self.redirect_uri = redirect_uri
         self.refresh_token = refresh_token
         self.client_secret = client_secret
+        self._saved = None
 
     def is_expired(self):
         """Whether or not the session has expired
@@ -35,13 +43,65 @@ class Session(SessionBase):
             bool: True if the session has expired, otherwise false
         """
         # Add a 10 second buffer in case the token is just about to expire
-        return self._expires_at < time() - 10
+        return time() > self._expires_at - 10
+
+    @property
+    def expires_at(self):
+        """Gets the time (time.time()) at which the access token expires
+
+        Returns:
+            float: The expiration time
+        """
+        return self._expires_at
 
     def refresh_session(self, expires_in, scope_string, access_token, refresh_token):
-        self._expires_at = time() + int(expires_in)
-        self.scope = scope_string.split(" ")
+        # The token is replaced before the expiration time, so that a
+        # concurrent reader never pairs the old token with the new time
         self.access_token = access_token
         self.refresh_token = refresh_token
+        self.scope = scope_string.split(" ")
+        self._expires_at = time() + int(expires_in)
+
+    def to_dict(self):
+        """Gets the fields of the session, with its absolute expiration
+        time, to store it
+
+        Returns:
+            dict: The fields of the session
+        """
+        return {
+            "token_type": self.token_type,
+            "expires_at": self._expires_at,
+            "scope": " ".join(self.scope),
+            "access_token": self.access_token,
+            "client_id": self.client_id,
+            "auth_server_url": self.auth_server_url,
+            "redirect_uri": self.redirect_uri,
+            "refresh_token": self.refresh_token,
+            "client_secret": self.client_secret
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        """Creates a session from the fields returned by :func:`to_dict`
+
+        Args:
+            values (dict): The fields of the session
+
+        Returns:
+            :class:`Session`: The session
+        """
+        session = cls(values["token_type"],
+                      0,
+                      values["scope"],
+                      values["access_token"],
+                      values["client_id"],
+                      values["auth_server_url"],
+                      values["redirect_uri"],
+                      values.get("refresh_token"),
+                      values.get("client_secret"))
+        session._expires_at = values["expires_at"]
+        return session
 
     def save_session(self, **save_session_kwargs):
         """Save the current session.
@@ -51,24 +111,29 @@ class Session(SessionBase):
         the client system's correct mechanism (keychain, database, etc.).
         Remember, the access_token should be treated the same as a password.
 
+        The session is written as versioned JSON, atomically and under a
+        lock shared with other processes. The file is only rewritten when
+        the session changed since it was last saved to or loaded from it.
+
         Args:
             save_session_kwargs (dicr): To be used by implementation
             of save_session, however save_session wants to use them. The
             default implementation (this one) takes a relative or absolute
-            file path for pickle save location, under the name "path"
+            file path for the save location, under the name "path"
         """
-        path = "session.pickle"
-        if "path" in save_session_kwargs:
-            path = save_session_kwargs["path"]
+        path = save_session_kwargs.get("path", "session.json")
+        state = self.to_dict()
+        if self._saved == (path, state) and os.path.exists(path):
+            return
 
-        with open(path, "wb") as session_file:
-            import pickle
-            # pickle.HIGHEST_PROTOCOL is binary format. Good perf.
-            pickle.dump(self, session_file, pickle.HIGHEST_PROTOCOL)
+        data = json.dumps({"version": SESSION_FORMAT_VERSION, "session": state}, separators=(",", ":"))
+        with file_lock(path):
+            atomic_write(path, data)
+        self._saved = (path, state)
 
-    @staticmethod
-    def load_session(**load_session_kwargs):
-        """Save the current session.
+    @classmethod
+    def load_session(cls, **load_session_kwargs):
+        """Load a session saved by :func:`save_session`.
         IMPORTANT: This implementation should only be used for debugging.
         For real applications, the Session object should be subclassed and
         both save_session() and load_session() should be overwritten using
@@ -79,15 +144,43 @@ class Session(SessionBase):
             load_session_kwargs (dict): To be used by implementation
             of load_session, however load_session wants to use them. The
             default implementation (this one) takes a relative or absolute
-            file path for pickle save location, under the name "path"
+            file path for the save location, under the name "path"
 
         Returns:
             :class:`Session`: The loaded session
-        """
-        path = "session.pickle"
-        if "path" in load_session_kwargs:
-            path = load_session_kwargs["path"]
 
+        Raises:
+            ValueError: If the file is not a session saved by a supported
+                version
+        """
+        path = load_session_kwargs.get("path", "session.json")
         with open(path, "rb") as session_file:
-            import pickle
-            return pickle.load(session_file)
+            saved = json.loads(session_file.read().decode("utf-8"))
+
+        if not isinstance(saved, dict) or saved.get("version") != SESSION_FORMAT_VERSION:
+            raise ValueError("Unsupported session format in {}".format(path))
+
+        session = cls.from_dict(saved["session"])
+        session._saved = (path, session.to_dict())
+        return session
+
+
+def token_claims(access_token):
+    """Decodes the claims of a JWT access token without validating
+    it. Used to read identifiers such as the tenant id (tid) or the
+    object id (oid) of the principal.
+
+    Args:
+        access_token (str): The access token
+
+    Returns:
+        dict: The claims of the token, or an empty dict if the token
+            is not a JWT
+    """
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode("ascii")).decode("utf-8"))
+    except (AttributeError, IndexError, ValueError, UnicodeError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
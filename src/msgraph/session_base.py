@@ -42,7 +42,7 @@ class SessionBase(object):
             save_session_kwargs (dicr): To be used by implementation
             of save_session, however save_session wants to use them. The
             default implementation (this one) takes a relative or absolute
-            file path for pickle save location, under the name "path"
+            file path for the save location, under the name "path"
         """
         pass
     
@@ -59,7 +59,7 @@ class SessionBase(object):
             load_session_kwargs (dict): To be used by implementation
             of load_session, however load_session wants to use them. The
             default implementation (this one) takes a relative or absolute
-            file path for pickle save location, under the name "path"
+            file path for the save location, under the name "path"
 
         Returns:
             :class:`Session`: The loaded session
@@ -0,0 +1,177 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from collections import OrderedDict
+import json
+import threading
+import time
+from .key_value_store import JsonFileStore, SqliteStore
+from .session import Session
+
+
+class TokenCache(object):
+
+    def __init__(self, max_entries=1024, early_expiry=300, backend=None, session_type=None):
+        """Initialize a cache of app-only sessions, keyed by tenant,
+        client id and scopes, so that a process serving many tenants
+        acquires each token once. A cache can be shared by the
+        :class:`AuthProvider<msgraph.auth_provider.AuthProvider>` of
+        many clients.
+
+        Args:
+            max_entries (int): Defaults to 1024, the number of sessions
+                kept in memory. The least recently used are evicted first
+            early_expiry (float): Defaults to 300, the number of seconds
+                before its expiration at which a session is no longer
+                returned, so that a token is never handed out just before
+                it expires
+            backend (:class:`FileTokenCacheBackend` or :class:`SqliteTokenCacheBackend`):
+                Defaults to None, a persistent store used on memory misses,
+                so that restarted workers reuse the tokens already acquired.
+                WARNING: THE BACKENDS STORE TOKENS AND CLIENT SECRETS IN
+                PLAIN TEXT, PROTECT THEM LIKE PASSWORDS.
+            session_type (class): Defaults to :class:`Session<msgraph.session.Session>`,
+                the class whose from_dict creates the sessions read from
+                the backend
+        """
+        self._max_entries = max_entries
+        self._early_expiry = early_expiry
+        self._backend = backend
+        self._session_type = Session if session_type is None else session_type
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key_for(tenant, client_id, scopes=None):
+        """Gets the cache key of a session
+
+        Args:
+            tenant (str): The tenant the token is issued by
+            client_id (str): The client id of the application
+            scopes (list of str): Defaults to None, the scopes or
+                resources of the token, in any order
+
+        Returns:
+            tuple: The key
+        """
+        return (tenant or "").lower(), client_id, tuple(sorted(set(scopes or ())))
+
+    @property
+    def stats(self):
+        """Gets the counters of the cache
+
+        Returns:
+            dict: The number of hits, misses and sessions in memory
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "entries": len(self._sessions)}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def get(self, key):
+        """Gets a session which is valid for at least early_expiry seconds.
+        The backend is consulted when the session in memory is missing or
+        about to expire
+
+        Args:
+            key (tuple): The key returned by :func:`key_for`
+
+        Returns:
+            :class:`Session<msgraph.session.Session>`: The session, or None
+        """
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+        if self._backend is not None and (session is None or not self._usable(session)):
+            # Another process may have renewed the session in the shared backend
+            values = self._backend.load(_backend_key(key))
+            if values is not None:
+                stored = self._session_type.from_dict(values)
+                if session is None or self._usable(stored):
+                    session = stored
+                    self._store(key, session, persist=False)
+
+        usable = session is not None and self._usable(session)
+        with self._lock:
+            if usable:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return session if usable else None
+
+    def put(self, key, session):
+        """Adds or replaces a session
+
+        Args:
+            key (tuple): The key returned by :func:`key_for`
+            session (:class:`Session<msgraph.session.Session>`): The session
+        """
+        self._store(key, session)
+
+    def remove(self, key):
+        """Removes a session
+
+        Args:
+            key (tuple): The key returned by :func:`key_for`
+        """
+        with self._lock:
+            self._sessions.pop(key, None)
+        if self._backend is not None:
+            self._backend.delete(_backend_key(key))
+
+    def clear(self):
+        """Removes every session"""
+        with self._lock:
+            self._sessions.clear()
+        if self._backend is not None:
+            self._backend.clear()
+
+    def _usable(self, session):
+        expires_at = getattr(session, "expires_at", None)
+        if not isinstance(expires_at, (int, float)):
+            return not session.is_expired()
+        return time.time() < expires_at - self._early_expiry
+
+    def _store(self, key, session, persist=True):
+        with self._lock:
+            self._sessions.pop(key, None)
+            self._sessions[key] = session
+            while len(self._sessions) > self._max_entries:
+                self._sessions.popitem(last=False)
+        if persist and self._backend is not None:
+            self._backend.save(_backend_key(key), session.to_dict())
+
+
+class FileTokenCacheBackend(JsonFileStore):
+    """Keeps sessions in a JSON file, which can be shared by worker
+    processes. See :class:`JsonFileStore<msgraph.key_value_store.JsonFileStore>`"""
+
+
+class SqliteTokenCacheBackend(SqliteStore):
+
+    def __init__(self, path, table="tokens"):
+        """Initialize a backend keeping sessions in a SQLite database,
+        which can be shared by worker processes
+
+        Args:
+            path (str): The path of the database
+            table (str): Defaults to "tokens", the name of the table
+        """
+        super(SqliteTokenCacheBackend, self).__init__(path, table, "session")
+
+    def _encode(self, value):
+        return json.dumps(value)
+
+    def _decode(self, text):
+        return json.loads(text)
+
+
+def _backend_key(key):
+    tenant, client_id, scopes = key
+    return json.dumps([tenant, client_id, list(scopes)])
@@ -0,0 +1,94 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from functools import lru_cache
+import re
+from .model.extension import get_object_class
+
+
+class TypeRegistry(object):
+
+    def __init__(self, resolver=None, maxsize=4096):
+        """Initialize a registry resolving the model class of the objects
+        returned by Graph from their @odata.context and @odata.type.
+
+        Classes registered for an @odata.type are looked up first, then
+        classes registered for a context URL pattern, then the resolver.
+        Each (context, @odata.type) pair is only resolved once: results
+        are kept in an LRU, so that reading a large page does not parse
+        the same context URL for every object.
+
+        Args:
+            resolver (callable): Defaults to None, the function called as
+                resolver(context, odata_type) for the types that are not
+                registered. If None, :func:`get_object_class` of the
+                generated models is used
+            maxsize (int): Defaults to 4096, the number of resolved
+                (context, @odata.type) pairs kept
+        """
+        self._resolver = get_object_class if resolver is None else resolver
+        self._types = {}
+        self._contexts = []
+        self._resolve = lru_cache(maxsize=maxsize)(self._lookup)
+
+    def register(self, odata_type, model_class):
+        """Registers the model class of an @odata.type
+
+        Args:
+            odata_type (str): The type, with or without its leading "#"
+                (ex. "#microsoft.graph.user")
+            model_class (class): The model class
+        """
+        self._types[odata_type.lstrip("#")] = model_class
+        self._resolve.cache_clear()
+
+    def register_context(self, pattern, model_class):
+        """Registers the model class of the objects whose @odata.context
+        matches a pattern, for the objects without an @odata.type
+
+        Args:
+            pattern (str): A regular expression searched in the context
+                (ex. r"#users(\\(|$)")
+            model_class (class): The model class
+        """
+        self._contexts.append((re.compile(pattern), model_class))
+        self._resolve.cache_clear()
+
+    def resolve(self, context, odata_type):
+        """Gets the model class of an object
+
+        Args:
+            context (str): The @odata.context of the page of the object
+            odata_type (str): The @odata.type of the object, or None
+
+        Returns:
+            class: The model class
+        """
+        if not isinstance(context, (str, type(None))) or not isinstance(odata_type, (str, type(None))):
+            # Other values may not be hashable, they are not cached
+            return self._lookup(context, odata_type)
+        return self._resolve(context, odata_type)
+
+    def cache_info(self):
+        """Gets the statistics of the LRU of resolved types
+
+        Returns:
+            CacheInfo: The hits, misses, maxsize and currsize of the LRU
+        """
+        return self._resolve.cache_info()
+
+    def _lookup(self, context, odata_type):
+        if odata_type:
+            model_class = self._types.get(odata_type.lstrip("#"))
+            if model_class is not None:
+                return model_class
+        if isinstance(context, str):
+            for pattern, model_class in self._contexts:
+                if pattern.search(context):
+                    return model_class
+        return self._resolver(context, odata_type)
+
+
+#: Registry used to create the objects of :class:`GraphPage<msgraph.request.GraphPage>`
+default_registry = TypeRegistry()
@@ -0,0 +1,251 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import mmap
+import os
+import threading
+from .error import GraphError
+from .file_utils import atomic_write
+from .request import GraphResponse
+
+
+class UploadSession(object):
+
+    #: Graph requires every chunk but the last to be a multiple of this size
+    CHUNK_MULTIPLE = 320 * 1024
+    #: The largest chunk Graph accepts in a single request
+    MAX_CHUNK_SIZE = 60 * 1024 * 1024
+
+    def __init__(self, client, api_resource, path, chunk_size=10 * CHUNK_MULTIPLE, progress_callback=None,
+                 conflict_behavior=None, state_path=None, max_workers=1):
+        """Initialize a resumable upload of a large file through a
+        Graph upload session (createUploadSession).
+
+        Args:
+            client (:class:`GraphClient<msgraph.client.GraphClient>`):
+                The client used to create the upload session
+            api_resource (str): The drive item to upload to, addressed by
+                path (ex. "me/drive/root:/folder/file.txt:") or by id
+            path (str): The local path of the file to upload
+            chunk_size (int): Defaults to 3.125 MiB, the size of every
+                uploaded chunk. Must be a multiple of 320 KiB, at most 60 MiB
+            progress_callback (callable): Defaults to None, called with
+                the number of bytes uploaded and the size of the file
+                after every chunk
+            conflict_behavior (str): Defaults to None, one of "rename",
+                "replace" or "fail"
+            state_path (str): Defaults to the file path with a
+                ".uploadsession" suffix, the file in which the upload URL
+                is kept so that an interrupted upload can be resumed
+            max_workers (int): Defaults to 1, the number of chunks uploaded
+                at the same time. Only use more than 1 for drives that
+                accept out of order chunks
+        """
+        if chunk_size <= 0 or chunk_size % self.CHUNK_MULTIPLE or chunk_size > self.MAX_CHUNK_SIZE:
+            raise ValueError("chunk_size must be a multiple of 320 KiB and at most 60 MiB.")
+
+        self._client = client
+        self._api_resource = api_resource.rstrip("/")
+        self._path = path
+        self._chunk_size = chunk_size
+        self._progress_callback = progress_callback
+        self._conflict_behavior = conflict_behavior
+        self._state_path = path + ".uploadsession" if state_path is None else state_path
+        self._max_workers = max_workers
+        self._size = os.path.getsize(path)
+        if not self._size:
+            raise ValueError("Empty files can not be uploaded through an upload session.")
+        self._upload_url = None
+        self._uploaded = 0
+        self._lock = threading.Lock()
+
+    @property
+    def upload_url(self):
+        """Gets the pre-authenticated URL of the upload session
+
+        Returns:
+            str: The upload URL, or None before the session is created
+        """
+        return self._upload_url
+
+    def upload(self):
+        """Uploads the file, resuming a previous upload session if
+        the state file of one exists
+
+        Returns:
+            :class:`OdataObjectBase`: The uploaded drive item
+        """
+        ranges = self._resume() if os.path.exists(self._state_path) else None
+        if ranges is None:
+            self._create()
+            ranges = [(0, self._size - 1)]
+
+        chunks = []
+        for start, end in ranges:
+            for offset in range(start, end + 1, self._chunk_size):
+                chunks.append((offset, min(offset + self._chunk_size, end + 1) - 1))
+        self._uploaded = self._size - sum(end - start + 1 for start, end in chunks)
+
+        with open(self._path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                result = self._upload_chunks(mapped, chunks)
+            finally:
+                mapped.close()
+
+        self._remove_state()
+        return next(GraphResponse(result).get_page().objects())
+
+    def cancel(self):
+        """Cancels the upload session and forgets its state"""
+        if self._upload_url is not None:
+            self._client.http_provider.send("DELETE", {}, self._upload_url)
+        self._remove_state()
+
+    def _create(self):
+        item = {}
+        if self._conflict_behavior:
+            item["@microsoft.graph.conflictBehavior"] = self._conflict_behavior
+
+        request = self._client.request(self._api_resource + "/createUploadSession")
+        request.method = "POST"
+        response = self._client.codec.loads(request.send({"item": item}).raw_content)
+
+        self._upload_url = response["uploadUrl"]
+        atomic_write(self._state_path, json.dumps({
+            "uploadUrl": self._upload_url,
+            "size": self._size,
+            "mtime": os.path.getmtime(self._path)
+        }))
+
+    def _resume(self):
+        """Gets the ranges still expected by a saved upload session
+
+        Returns:
+            list of (int, int): The ranges to upload, or None if the
+                session can not be resumed
+        """
+        try:
+            with open(self._state_path, "r") as f:
+                state = json.load(f)
+        except ValueError:
+            return None
+
+        if state.get("size") != self._size or state.get("mtime") != os.path.getmtime(self._path):
+            # The file changed since the session was created
+            return None
+
+        try:
+            response = self._client.http_provider.send("GET", {}, state["uploadUrl"])
+        except GraphError:
+            # The session expired or was cancelled
+            return None
+
+        self._upload_url = state["uploadUrl"]
+        return parse_ranges(self._client.codec.loads(response.raw_content).get("nextExpectedRanges", []), self._size)
+
+    def _upload_chunks(self, mapped, chunks):
+        if not chunks:
+            # Every byte was received before the crash, the item was created
+            request = self._client.request(self._api_resource)
+            request.method = "GET"
+            return self._client.codec.loads(request.send().raw_content)
+
+        # The session completes when the final byte arrives, so the last
+        # chunk is always sent once every other chunk has been accepted
+        last = chunks[-1]
+        if self._max_workers > 1 and len(chunks) > 2:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(lambda chunk: self._upload_chunk(mapped, chunk), chunks[:-1]))
+        else:
+            for chunk in chunks[:-1]:
+                self._upload_chunk(mapped, chunk)
+
+        return self._upload_chunk(mapped, last)
+
+    def _upload_chunk(self, mapped, chunk):
+        start, end = chunk
+        headers = {
+            "Content-Length": str(end - start + 1),
+            "Content-Range": "bytes {}-{}/{}".format(start, end, self._size)
+        }
+        # The upload URL is pre-authenticated, no Authorization header is sent
+        with MappedChunk(mapped, start, end + 1) as data:
+            response = self._client.http_provider.send("PUT", headers, self._upload_url, data=data)
+
+        with self._lock:
+            self._uploaded += end - start + 1
+            uploaded = self._uploaded
+        if self._progress_callback is not None:
+            self._progress_callback(uploaded, self._size)
+
+        return self._client.codec.loads(response.raw_content) if response.raw_content else None
+
+    def _remove_state(self):
+        try:
+            os.remove(self._state_path)
+        except OSError:
+            pass
+
+
+class MappedChunk(io.RawIOBase):
+    """Read-only file object over a slice of a memory-mapped file.
+    Reads return memoryviews into the mapping, so chunk bytes are not
+    copied into an intermediate buffer before being sent."""
+
+    def __init__(self, mapped, start, end):
+        super(MappedChunk, self).__init__()
+        self._view = memoryview(mapped)[start:end]
+        self._position = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, min(offset, len(self._view)))
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._view) - self._position
+        data = self._view[self._position:self._position + size]
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self._view.release()
+        super(MappedChunk, self).close()
+
+
+def parse_ranges(expected_ranges, size):
+    """Parses the nextExpectedRanges of an upload session
+
+    Args:
+        expected_ranges (list of str): Ranges such as "0-1023" or "1024-"
+        size (int): The size of the file
+
+    Returns:
+        list of (int, int): Inclusive start and end offsets
+    """
+    ranges = []
+    for expected_range in expected_ranges:
+        start, _, end = expected_range.partition("-")
+        ranges.append((int(start), int(end) if end else size - 1))
+    return ranges
@@ -0,0 +1,71 @@
+"""
+Copyright (c) Microsoft Corporation.  All Rights Reserved.  Licensed under the MIT License.  See License in the project root for license information.
+"""
+from __future__ import unicode_literals
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+
+class CompiledUrl(object):
+    """A URL split once into its base (without query string) and its
+    query parameters, from which request URLs are built without parsing
+    it again"""
+    __slots__ = ("base", "query", "fragment")
+
+    def __init__(self, base, query=(), fragment=""):
+        """Initialize a compiled URL
+
+        Args:
+            base (str): The URL without its query string and fragment
+            query (tuple of (str, str)): The parameters of the query string
+            fragment (str): The fragment of the URL
+        """
+        self.base = base
+        self.query = query
+        self.fragment = fragment
+
+    def append(self, segment):
+        """Gets the URL with a path segment appended, keeping its query
+
+        Args:
+            segment (str): The segment to append
+
+        Returns:
+            :class:`CompiledUrl`: The new URL
+        """
+        return CompiledUrl(self.base + "/" + segment, self.query, self.fragment)
+
+    def build(self, options=None):
+        """Builds the URL with query options. The parameters of the URL
+        take precedence over the options of the same name
+
+        Args:
+            options (dict of (str, str)): Defaults to None, the query options
+
+        Returns:
+            str: The URL
+        """
+        if options:
+            query = dict(options)
+            query.update(self.query)
+            url = self.base + "?" + urlencode(query)
+        elif self.query:
+            url = self.base + "?" + urlencode(self.query)
+        else:
+            url = self.base
+        return url + "#" + self.fragment if self.fragment else url
+
+
+@lru_cache(maxsize=4096)
+def compile_url(url):
+    """Parses a URL, once per distinct URL
+
+    Args:
+        url (str): The URL
+
+    Returns:
+        :class:`CompiledUrl`: The compiled URL
+    """
+    url_parts = urlparse(url)
+    base = urlunparse(url_parts._replace(query="", fragment=""))
+    return CompiledUrl(base, tuple(parse_qsl(url_parts.query)), url_parts.fragment)
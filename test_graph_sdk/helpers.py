@@ -0,0 +1,81 @@
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import json
+import msgraph
+from msgraph.async_client import AsyncGraphClient
+from msgraph.http_response import HttpResponse
+
+BASE_URL = "https://graph/v1.0/"
+
+
+def mock_client(send=None, auth_provider=None, retry_policy=None, **client_options):
+    """Creates a GraphClient whose HTTP provider is a Mock
+
+    Args:
+        send: The responses of http_provider.send. A response is returned
+            by every call, an exception raised by every call, and a list
+            or a function (method, headers, url, **kwargs) is the side
+            effect of the mock
+        auth_provider: Defaults to a Mock
+        retry_policy (RetryPolicy): Defaults to None, the retry policy of
+            the HTTP provider
+        client_options: Further arguments of the client
+    """
+    http_provider = _http_provider(send, retry_policy)
+    auth_provider = Mock() if auth_provider is None else auth_provider
+    return msgraph.GraphClient(BASE_URL, auth_provider, http_provider, **client_options)
+
+
+def mock_async_client(send=None, download=None, auth_provider=None, retry_policy=None, **client_options):
+    """Creates an AsyncGraphClient whose providers are Mocks with
+    coroutine functions, see :func:`mock_client`
+
+    Args:
+        send (coroutine function): Defaults to None, the side effect of
+            http_provider.send
+        download (coroutine function): Defaults to None, the side effect
+            of http_provider.download
+        auth_provider: Defaults to a Mock authenticating nothing
+    """
+    async def authenticate(request):
+        pass
+
+    async def close():
+        pass
+
+    if auth_provider is None:
+        auth_provider = Mock()
+        auth_provider.hooks = None
+        auth_provider.authenticate_request_async.side_effect = authenticate
+    http_provider = _http_provider(send, retry_policy)
+    http_provider.download.side_effect = download
+    http_provider.close.side_effect = close
+    return AsyncGraphClient(BASE_URL, auth_provider, http_provider, **client_options)
+
+
+def serve_pages(pages):
+    """Creates a send function answering each URL with its JSON body
+
+    Args:
+        pages (dict): The body of each URL, or the exception to raise
+    """
+    def send(method, headers, url, **kwargs):
+        page = pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return HttpResponse(200, {}, json.dumps(page))
+    return send
+
+
+def _http_provider(send, retry_policy):
+    http_provider = Mock()
+    if retry_policy is not None:
+        http_provider.retry_policy = retry_policy
+    if isinstance(send, (list, Exception)) or callable(send):
+        http_provider.send.side_effect = send
+    else:
+        http_provider.send.return_value = send
+    return http_provider
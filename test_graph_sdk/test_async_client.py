@@ -0,0 +1,130 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from msgraph.async_http_provider import AsyncHttpProvider, aiohttp
+from msgraph.auth_provider import AuthProvider
+from msgraph.http_response import HttpResponse
+from msgraph.retry import RetryPolicy
+from msgraph.session import Session
+from test_graph_sdk.helpers import mock_async_client
+
+
+class TestAsyncGraphClient(unittest.TestCase):
+
+    def test_iter_all(self):
+        """
+        Test that iter_all follows next links and stops at max_items
+        """
+        async def send(method, headers, url, **kwargs):
+            page = int(url.split("page=")[1]) if "page=" in url else 0
+            body = {"value": [{"id": str(page * 2 + i)} for i in range(2)]}
+            if page < 2:
+                body["@odata.nextLink"] = "https://graph/v1.0/users?page={}".format(page + 1)
+            return HttpResponse(200, None, json.dumps(body))
+
+        async def run(**options):
+            client = mock_async_client(send)
+            return [user.serialized()["id"] async for user in client.iter_all("users", **options)]
+
+        assert asyncio.run(run()) == ["0", "1", "2", "3", "4", "5"]
+        assert asyncio.run(run(max_items=3)) == ["0", "1", "2"]
+        assert asyncio.run(run(max_pages=2)) == ["0", "1", "2", "3"]
+
+    def test_download_item(self):
+        """
+        Test that a download is checked against the hashes of the item
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "file.bin")
+        sha1 = [hashlib.sha1(b"content").hexdigest()]
+
+        async def send(method, headers, url, **kwargs):
+            return HttpResponse(200, None, json.dumps({"id": "item", "file": {"hashes": {"sha1Hash": sha1[0]}}}))
+
+        async def download(headers, url, path):
+            assert url == "https://graph/v1.0/me/drive/items/item/content"
+            with open(path, "wb") as f:
+                f.write(b"content")
+            return HttpResponse(200, None, None)
+
+        client = mock_async_client(send, download)
+        response = asyncio.run(client.download_item("me/drive/items/item", path))
+        assert response.status == 200
+
+        sha1[0] = hashlib.sha1(b"other").hexdigest()
+        self.assertRaises(ValueError, asyncio.run, client.download_item("me/drive/items/item", path))
+        asyncio.run(client.download_item("me/drive/items/item", path, verify=False))
+
+    def test_sync_only_helpers(self):
+        """
+        Test that helpers which only work with a sync provider fail clearly
+        """
+        client = mock_async_client()
+        self.assertRaises(TypeError, client.batch)
+        self.assertRaises(TypeError, client.iter_batches, "users")
+        self.assertRaises(TypeError, client.delta, "users/delta")
+        self.assertRaises(TypeError, client.upload_large_file, "me/drive/root:/file.bin:", "file.bin")
+
+    def test_close_unregisters(self):
+        """
+        Test that closing the client removes its retry listeners
+        """
+        policy = RetryPolicy()
+        client = mock_async_client(retry_policy=policy)
+        assert policy._listeners
+        asyncio.run(client.close())
+        assert not policy._listeners
+
+    def test_expired_token(self):
+        """
+        Test that an expired token is renewed with the sync provider of the
+        auth provider, and that async providers are refused for auth
+        """
+        token_provider = Mock()
+        token_provider.send.return_value = HttpResponse(200, {}, json.dumps(
+            {"token_type": "bearer", "expires_in": 3600, "scope": "wl.offline_access", "access_token": "new",
+             "refresh_token": "refresh"}))
+        auth_provider = AuthProvider(token_provider, "client_id", ["wl.offline_access"], refresh_ahead=None)
+        auth_provider._session = Session("bearer", 0, "wl.offline_access", "old", "client_id",
+                                         "https://login/token", "https://redirect", "refresh", "secret")
+
+        async def send(method, headers, url, **kwargs):
+            return HttpResponse(200, None, json.dumps({"id": "1"}))
+
+        client = mock_async_client(send, auth_provider=auth_provider)
+        asyncio.run(client.get_object("me"))
+        assert client.http_provider.send.call_args[0][1]["Authorization"] == "bearer new"
+        assert token_provider.send.call_args[1]["data"]["grant_type"] == "refresh_token"
+
+        async_provider = Mock()
+        async_provider.send = send
+        self.assertRaises(TypeError, AuthProvider, async_provider, "client_id")
+
+    @unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+    def test_no_retry_policy(self):
+        """
+        Test that a provider without a retry policy sends requests once
+        """
+        response = Mock(status=429)
+
+        async def send_once(trace):
+            return response, ""
+
+        provider = AsyncHttpProvider(retry_policy=RetryPolicy())
+        provider.retry_policy = None
+        result = asyncio.run(provider._send_with_retry("GET", "https://graph/v1.0/me", {}, send_once))
+        assert result == (response, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import json
+import threading
+import time
+from msgraph.auth_provider import AuthProvider
+from msgraph.http_response import HttpResponse
+from msgraph.session import Session
+
+
+class TestAuthProvider(unittest.TestCase):
+
+    def _token_response(self, access_token, expires_in=3600):
+        return HttpResponse(200, {}, json.dumps({"token_type": "bearer", "expires_in": expires_in,
+                                                 "scope": "wl.offline_access", "access_token": access_token,
+                                                 "refresh_token": "refresh"}))
+
+    def _session(self, expires_in):
+        return Session("bearer", expires_in, "wl.offline_access", "old", "client_id",
+                       "https://login/token", "https://redirect", "refresh", "secret")
+
+    def test_is_expired(self):
+        """
+        Test that a session expires a little before its token does
+        """
+        assert not self._session(3600).is_expired()
+        assert self._session(5).is_expired()
+        assert self._session(0).is_expired()
+
+    def test_single_flight_refresh(self):
+        """
+        Test that concurrent requests with an expired token send a single refresh
+        """
+        def send(**kwargs):
+            time.sleep(0.1)
+            return self._token_response("new")
+
+        http_provider = Mock()
+        http_provider.send = Mock(side_effect=send)
+        auth_provider = AuthProvider(http_provider, "client_id", ["wl.offline_access"], refresh_ahead=None)
+        auth_provider._session = self._session(0)
+
+        requests = [Mock() for _ in range(8)]
+        threads = [threading.Thread(target=auth_provider.authenticate_request, args=(request,))
+                   for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert http_provider.send.call_count == 1
+        for request in requests:
+            assert request.append_option.call_args[0][0].value == "bearer new"
+
+    def test_refresh_without_wl_scope(self):
+        """
+        Test that any expired session with a refresh token is refreshed on
+        the request path, as the background refresh does
+        """
+        http_provider = Mock()
+        http_provider.send = Mock(return_value=self._token_response("new"))
+        auth_provider = AuthProvider(http_provider, "client_id", ["offline_access", "User.Read"], refresh_ahead=None)
+        auth_provider._session = self._session(0)
+
+        request = Mock()
+        auth_provider.authenticate_request(request)
+        assert request.append_option.call_args[0][0].value == "bearer new"
+        assert http_provider.send.call_args[1]["data"]["grant_type"] == "refresh_token"
+
+    def test_background_refresh(self):
+        """
+        Test that the token is refreshed before it expires
+        """
+        http_provider = Mock()
+        http_provider.send = Mock(side_effect=[self._token_response("first", expires_in=1),
+                                               self._token_response("second")])
+        auth_provider = AuthProvider(http_provider, "client_id", ["wl.offline_access"], refresh_ahead=300)
+        auth_provider.authenticate_user("code", "https://redirect", "secret")
+        try:
+            assert auth_provider.access_token == "first"
+
+            deadline = time.time() + 5
+            while auth_provider.access_token == "first" and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert auth_provider.access_token == "second"
+            assert http_provider.send.call_args[1]["data"]["grant_type"] == "refresh_token"
+            assert not auth_provider._session.is_expired()
+        finally:
+            auth_provider.close()
+
+    def test_daemon_refresh_ahead(self):
+        """
+        Test that app-only sessions, without a refresh token, are renewed
+        with the client secret before they expire
+        """
+        def daemon_token(access_token, expires_in):
+            return HttpResponse(200, {}, json.dumps({"token_type": "bearer", "expires_in": expires_in,
+                                                     "access_token": access_token}))
+
+        http_provider = Mock()
+        http_provider.send = Mock(side_effect=[daemon_token("first", 1), daemon_token("second", 3600)])
+        auth_provider = AuthProvider(http_provider, "client_id", refresh_ahead=300)
+        auth_provider.authenticate_daemon("secret")
+        try:
+            deadline = time.time() + 5
+            while auth_provider.access_token == "first" and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert auth_provider.access_token == "second"
+            data = http_provider.send.call_args[1]["data"]
+            assert (data["grant_type"], data["client_secret"]) == ("client_credentials", "secret")
+            assert auth_provider._refresh_timer is not None
+        finally:
+            auth_provider.close()
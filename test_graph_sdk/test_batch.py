@@ -0,0 +1,98 @@
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from msgraph import GraphError
+from msgraph.http_response import HttpResponse
+import json
+from test_graph_sdk.helpers import mock_client
+
+
+class TestBatch(unittest.TestCase):
+
+    def _client(self, *responses):
+        return mock_client([HttpResponse(200, None, json.dumps(r)) for r in responses])
+
+    def test_envelope_and_responses(self):
+        """
+        Test that sub-requests are serialized in a single envelope and that every
+        caller gets its own response back
+        """
+        client = self._client({"responses": [
+            {"id": "1", "status": 200, "body": {"id": "a", "displayName": "A"}},
+            {"id": "2", "status": 404, "body": {"error": {"code": "itemNotFound", "message": "missing"}}}
+        ]})
+
+        batch = client.batch()
+        first = batch.add(client.request("users/a"))
+        second = batch.add(client.request("users/b"), depends_on=[first])
+        responses = batch.send()
+
+        envelope = json.loads(client.http_provider.send.call_args[1]["data"])
+        assert client.http_provider.send.call_args[0][2] == "https://graph/v1.0/$batch"
+        assert [r["url"] for r in envelope["requests"]] == ["/users/a", "/users/b"]
+        assert envelope["requests"][1]["dependsOn"] == ["1"]
+
+        assert responses.get_page(first)[0].serialized()["displayName"] == "A"
+        assert responses.error(second).code == "itemNotFound"
+        self.assertRaises(GraphError, lambda: responses[second])
+
+    def test_error_body_not_json(self):
+        """
+        Test that a sub-response error body which is not JSON only fails its request
+        """
+        client = self._client({"responses": [
+            {"id": "1", "status": 200, "body": {"id": "a"}},
+            {"id": "2", "status": 502, "body": "Bad Gateway"}
+        ]})
+
+        batch = client.batch()
+        first = batch.add(client.request("users/a"))
+        second = batch.add(client.request("users/b"))
+        responses = batch.send()
+
+        assert responses[first].status == 200
+        error = responses.error(second)
+        assert (error.status_code, error.code, error.message) == (502, "malformed", "Bad Gateway")
+
+    def test_chunking(self):
+        """
+        Test that more than 20 requests are split in several batches
+        """
+        client = self._client({"responses": [{"id": str(i), "status": 204} for i in range(1, 21)]},
+                              {"responses": [{"id": str(i), "status": 204} for i in range(21, 26)]})
+
+        batch = client.batch()
+        for i in range(25):
+            batch.add(client.request("users/{}".format(i)))
+        responses = batch.send()
+
+        assert client.http_provider.send.call_count == 2
+        assert all(responses[request_id].status == 204 for request_id in responses)
+
+    @patch('msgraph.batch.time.sleep')
+    def test_throttled_items_are_retried(self, mock_sleep):
+        """
+        Test that only the throttled sub-requests are sent again after Retry-After
+        """
+        client = self._client({"responses": [
+            {"id": "1", "status": 200, "body": {"id": "a"}},
+            {"id": "2", "status": 429, "headers": {"Retry-After": "3"},
+             "body": {"error": {"code": "TooManyRequests", "message": "slow down"}}}
+        ]}, {"responses": [{"id": "2", "status": 200, "body": {"id": "b"}}]})
+
+        batch = client.batch()
+        batch.add(client.request("users/a"))
+        batch.add(client.request("users/b"))
+        responses = batch.send()
+
+        mock_sleep.assert_called_once_with(3.0)
+        retry_envelope = json.loads(client.http_provider.send.call_args[1]["data"])
+        assert [r["id"] for r in retry_envelope["requests"]] == ["2"]
+        assert responses.get_page("2")[0].serialized()["id"] == "b"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import msgraph
+from msgraph import FileCacheBackend, ResponseCache
+from msgraph.http_response import HttpResponse
+import base64
+import json
+import shutil
+import tempfile
+from test_graph_sdk.helpers import mock_client
+
+
+class TestCache(unittest.TestCase):
+
+    def _token(self, oid):
+        claims = base64.urlsafe_b64encode(json.dumps({"tid": "contoso", "oid": oid}).encode()).decode().rstrip("=")
+        return "bearer header.{}.signature".format(claims)
+
+    def _client(self, cache, user="alice"):
+        auth_provider = Mock()
+        auth_provider.authenticate_request.side_effect = \
+            lambda request: request.append_option(msgraph.HeaderOption("Authorization", self._token(user)))
+        return mock_client(HttpResponse(200, {"ETag": "\"1\""}, b'{"id": "1", "displayName": "A"}'),
+                           auth_provider=auth_provider, cache=cache)
+
+    def test_fresh_hit(self):
+        """
+        Test that fresh responses are served without a request, per principal
+        """
+        cache = ResponseCache(ttl=60)
+        client = self._client(cache)
+
+        assert client.get_object("users/1").serialized()["displayName"] == "A"
+        assert client.get_object("users/1").serialized()["displayName"] == "A"
+        assert client.http_provider.send.call_count == 1
+
+        other = self._client(cache, user="bob")
+        other.get_object("users/1")
+        assert other.http_provider.send.call_count == 1
+
+    def test_revalidation(self):
+        """
+        Test that stale responses are revalidated with If-None-Match
+        """
+        client = self._client(ResponseCache(ttl=0))
+        client.get_object("users/1")
+
+        sent_headers = []
+
+        def send(method, headers, url, **kwargs):
+            sent_headers.append(dict(headers))
+            return HttpResponse(304, {}, b"")
+
+        client.http_provider.send.side_effect = send
+        assert client.get_object("users/1").serialized()["displayName"] == "A"
+        assert sent_headers[0]["If-None-Match"] == "\"1\""
+        assert client.cache.stats["hits"] == 1
+
+    def test_invalidation(self):
+        """
+        Test that writes drop the cached responses of the resource
+        """
+        client = self._client(ResponseCache(ttl=60))
+        client.get_object("users/1")
+        client.get_object("users/1", select="id")
+        client.get_object("users/2")
+
+        client.http_provider.send.return_value = HttpResponse(204, {}, b"")
+        client.update_object("users/1", {"displayName": "B"})
+        assert client.cache.stats["entries"] == 1
+
+        client.http_provider.send.return_value = HttpResponse(200, {}, b'{"id": "1", "displayName": "B"}')
+        assert client.get_object("users/1").serialized()["displayName"] == "B"
+
+    def test_lru_bounds(self):
+        """
+        Test that the least recently used responses are evicted
+        """
+        cache = ResponseCache(max_entries=2)
+        response = HttpResponse(200, {"ETag": "\"1\""}, b"{}")
+        for url in ("https://graph/a", "https://graph/b"):
+            cache.update(cache.key_for(url, {}), "GET", url, response)
+        cache.get(cache.key_for("https://graph/a", {}))
+        cache.update(cache.key_for("https://graph/c", {}), "GET", "https://graph/c", response)
+
+        assert cache.get(cache.key_for("https://graph/a", {})) is not None
+        assert cache.get(cache.key_for("https://graph/b", {})) is None
+
+    def test_file_backend(self):
+        """
+        Test that responses are shared through the disk backend
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            self._client(ResponseCache(backend=FileCacheBackend(directory))).get_object("users/1")
+
+            client = self._client(ResponseCache(backend=FileCacheBackend(directory)))
+            assert client.get_object("users/1").serialized()["displayName"] == "A"
+            assert client.http_provider.send.call_count == 0
+
+            client.http_provider.send.return_value = HttpResponse(204, {}, b"")
+            client.delete_object("users/1")
+            assert ResponseCache(backend=FileCacheBackend(directory)).get(
+                client.cache.key_for("https://graph/v1.0/users/1", {"Authorization": self._token("alice")})) is None
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from msgraph.codec import StdlibJsonCodec, OrjsonCodec, default_codec, orjson
+from msgraph.http_response import HttpResponse
+import json
+from test_graph_sdk.helpers import mock_client
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        """
+        Test that codecs encode to bytes and decode bytes
+        """
+        codecs = [StdlibJsonCodec()]
+        if orjson is not None:
+            codecs.append(OrjsonCodec())
+
+        document = {"displayName": "Jürgen", "id": "1", "size": 2 ** 70, "tags": [1.5, None, True]}
+        for codec in codecs:
+            encoded = codec.dumps(document)
+            assert isinstance(encoded, bytes)
+            assert codec.loads(encoded) == document
+            assert json.loads(encoded.decode("utf-8")) == document
+
+    def test_default_codec(self):
+        """
+        Test that orjson is preferred when installed
+        """
+        if orjson is not None:
+            assert isinstance(default_codec(), OrjsonCodec)
+        else:
+            self.assertRaises(ImportError, OrjsonCodec)
+
+    def test_response_bytes(self):
+        """
+        Test that responses keep the raw bytes and decode str lazily
+        """
+        response = HttpResponse(200, {}, "{\"name\": \"Jürgen\"}".encode("utf-8"))
+        assert response.raw_content == "{\"name\": \"Jürgen\"}".encode("utf-8")
+        assert response.content == "{\"name\": \"Jürgen\"}"
+
+    def test_client_codec(self):
+        """
+        Test that request bodies and responses go through the client codec
+        """
+        codec = Mock(wraps=StdlibJsonCodec())
+        client = mock_client(HttpResponse(201, {}, b'{"id": "1", "displayName": "A"}'), codec=codec)
+
+        page = client.request("groups").post({"displayName": "A"})
+        assert client.http_provider.send.call_args[1]["data"] == b'{"displayName":"A"}'
+        assert codec.loads.call_args[0][0] == b'{"id": "1", "displayName": "A"}'
+        assert page[0].serialized()["id"] == "1"
+
+
+if __name__ == '__main__':
+    unittest.main()
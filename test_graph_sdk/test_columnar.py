@@ -0,0 +1,54 @@
+import unittest
+
+from msgraph.columnar import infer_columns, pyarrow
+from msgraph.request import GraphPage
+from test_graph_sdk.helpers import mock_client, serve_pages
+
+
+class TestColumnar(unittest.TestCase):
+
+    def _client(self):
+        pages = {
+            "https://graph/v1.0/users?%24select=id%2CdisplayName": {
+                "value": [{"@odata.etag": "1", "id": "1", "displayName": "Ada"}, {"id": "2"}],
+                "@odata.nextLink": "https://graph/v1.0/users?$select=id,displayName&page=2"},
+            "https://graph/v1.0/users?%24select=id%2CdisplayName&page=2": {
+                "value": [{"id": "3", "displayName": "Grace"}]}
+        }
+        return mock_client(serve_pages(pages))
+
+    def test_infer_columns(self):
+        """
+        Test that columns come from $select, else from the objects without annotations
+        """
+        rows = [{"@odata.type": "#microsoft.graph.user", "id": "1"}, {"id": "2", "mail": "a@b"}]
+
+        assert infer_columns(rows) == ["id", "mail"]
+        assert infer_columns(rows, "displayName, id") == ["displayName", "id"]
+
+    def test_to_records(self):
+        """
+        Test that a page is transposed to columns, using the $select of its request
+        """
+        request = self._client().request("users")
+        request.set_query_options(select="id,displayName")
+        page = request.get()
+
+        assert page.to_records() == {"id": ["1", "2"], "displayName": ["Ada", None]}
+        assert GraphPage([{"a": 1}, {"b": 2}]).to_records() == {"a": [1, None], "b": [None, 2]}
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """
+        Test that pages and collections are exported to Arrow
+        """
+        request = self._client().request("users")
+        request.set_query_options(select="id,displayName")
+        table = request.get().to_arrow()
+        assert table.column_names == ["id", "displayName"]
+        assert table.num_rows == 2
+
+        schema = pyarrow.schema([("id", pyarrow.string()), ("displayName", pyarrow.string())])
+        batches = list(self._client().iter_batches("users", select="id,displayName", schema=schema))
+        assert [batch.num_rows for batch in batches] == [2, 1]
+        assert pyarrow.Table.from_batches(batches).column("displayName").to_pylist() == ["Ada", None, "Grace"]
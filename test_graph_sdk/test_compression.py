@@ -0,0 +1,73 @@
+import unittest
+
+import gzip
+import json
+from msgraph import CompressionHandler
+from msgraph.compression import brotli, decompress_response
+from msgraph.http_response import HttpResponse, StreamingHttpResponse
+from test_graph_sdk.helpers import mock_client
+
+
+class TestCompression(unittest.TestCase):
+
+    def _client(self, **kwargs):
+        return mock_client(HttpResponse(201, None, '{"id": "1"}'), **kwargs)
+
+    def test_request_compression(self):
+        """
+        Test that bodies are gzipped from the threshold, and Accept-Encoding is sent
+        """
+        client = self._client(compression_threshold=1024)
+        request = client.request("users")
+        request.method = "POST"
+
+        request.send({"displayName": "Ada"})
+        headers, kwargs = client.http_provider.send.call_args[0][1], client.http_provider.send.call_args[1]
+        assert headers["Accept-Encoding"].startswith("gzip")
+        assert "Content-Encoding" not in headers
+        assert json.loads(kwargs["data"]) == {"displayName": "Ada"}
+
+        body = {"members": ["user-{}".format(i) for i in range(200)]}
+        request.send(body)
+        headers, kwargs = client.http_provider.send.call_args[0][1], client.http_provider.send.call_args[1]
+        assert headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(kwargs["data"])) == body
+        assert "Content-Encoding" not in request._headers
+
+    def test_decompress_response(self):
+        """
+        Test that encoded responses are decoded, incrementally when streamed
+        """
+        body = json.dumps({"value": [{"id": str(i)} for i in range(1000)]}).encode()
+        encoded = gzip.compress(body)
+        headers = {"Content-Encoding": "gzip", "Content-Length": str(len(encoded))}
+
+        response = decompress_response(HttpResponse(200, headers, encoded))
+        assert response.raw_content == body
+        assert response.headers == {}
+
+        chunks = [encoded[i:i + 100] for i in range(0, len(encoded), 100)]
+        response = decompress_response(StreamingHttpResponse(200, headers, iter(chunks)))
+        assert isinstance(response, StreamingHttpResponse)
+        assert b"".join(response.iter_content()) == body
+
+        response = HttpResponse(200, {"Content-Type": "application/json"}, body)
+        assert decompress_response(response) is response
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli(self):
+        """
+        Test that brotli responses are decoded by a handler decoding responses
+        """
+        body = b'{"id": "1"}'
+        client = self._client(middleware=[CompressionHandler(decode_responses=True)])
+        client.http_provider.send.return_value = HttpResponse(200, {"Content-Encoding": "br"},
+                                                              brotli.compress(body))
+        request = client.request("me")
+        request.method = "GET"
+        assert request.send().raw_content == body
+        assert "br" in client.http_provider.send.call_args[0][1]["Accept-Encoding"]
+
+
+if __name__ == '__main__':
+    unittest.main()
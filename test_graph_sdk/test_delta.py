@@ -0,0 +1,78 @@
+import unittest
+
+from msgraph import FileDeltaLinkStore, GraphError, SqliteDeltaLinkStore
+from msgraph.delta import removed_reason
+import os
+import shutil
+import tempfile
+from test_graph_sdk.helpers import mock_client, serve_pages
+
+
+class TestDelta(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _client(self, pages):
+        return mock_client(serve_pages(pages))
+
+    def test_sync(self):
+        """
+        Test that the deltaLink is saved and later syncs only return changes
+        """
+        pages = {
+            "https://graph/v1.0/users/delta": {"value": [{"id": "1"}, {"id": "2"}],
+                                               "@odata.nextLink": "https://graph/v1.0/users/delta?$skiptoken=a"},
+            "https://graph/v1.0/users/delta?%24skiptoken=a": {"value": [{"id": "3"}],
+                                                              "@odata.deltaLink": "https://graph/v1.0/users/delta?$deltatoken=b"},
+            "https://graph/v1.0/users/delta?%24deltatoken=b": {"value": [{"id": "2", "@removed": {"reason": "deleted"}}],
+                                                               "@odata.deltaLink": "https://graph/v1.0/users/delta?$deltatoken=c"}
+        }
+        store = FileDeltaLinkStore(os.path.join(self.directory, "delta.json"))
+        tracker = self._client(pages).delta("users/delta", store)
+
+        assert [o.serialized()["id"] for o in tracker.changes()] == ["1", "2", "3"]
+        assert tracker.delta_link == "https://graph/v1.0/users/delta?$deltatoken=b"
+
+        tracker = self._client(pages).delta("users/delta", FileDeltaLinkStore(os.path.join(self.directory, "delta.json")))
+        changes = list(tracker.changes())
+        assert [removed_reason(o) for o in changes] == ["deleted"]
+        assert tracker.delta_link == "https://graph/v1.0/users/delta?$deltatoken=c"
+
+    def test_interrupted_sync(self):
+        """
+        Test that the deltaLink is not saved before the last page is consumed
+        """
+        pages = {
+            "https://graph/v1.0/users/delta": {"value": [{"id": "1"}],
+                                               "@odata.deltaLink": "https://graph/v1.0/users/delta?$deltatoken=b"}
+        }
+        tracker = self._client(pages).delta("users/delta")
+        changes = tracker.changes()
+        next(changes)
+        changes.close()
+        assert tracker.delta_link is None
+
+    def test_expired_link(self):
+        """
+        Test that an expired deltaLink starts a full resync
+        """
+        pages = {
+            "https://graph/v1.0/users/delta?%24deltatoken=old": GraphError({"code": "resyncRequired", "message": ""}, 410),
+            "https://graph/v1.0/users/delta": {"value": [{"id": "1"}],
+                                               "@odata.deltaLink": "https://graph/v1.0/users/delta?$deltatoken=b"}
+        }
+        store = SqliteDeltaLinkStore(os.path.join(self.directory, "delta.db"))
+        store.save("users/delta", "https://graph/v1.0/users/delta?$deltatoken=old")
+        tracker = self._client(pages).delta("users/delta", store)
+
+        assert [o.serialized()["id"] for o in tracker.changes()] == ["1"]
+        assert tracker.resynced
+        assert store.load("users/delta") == "https://graph/v1.0/users/delta?$deltatoken=b"
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from msgraph.quick_xor_hash import QuickXorHash
+from msgraph.ranged_download import RangedDownloader
+import json
+import os
+import tempfile
+
+
+class TestDownload(unittest.TestCase):
+
+    def test_quick_xor_hash(self):
+        """
+        Test that QuickXorHash matches known values, whatever the update sizes
+        """
+        assert QuickXorHash().b64digest() == "AAAAAAAAAAAAAAAAAAAAAAAAAAA="
+        assert QuickXorHash(b"hello world").b64digest() == "aCgDG9jwBhDc4Q1yawMZAAAAAAA="
+
+        data = bytes(bytearray(range(256))) * 3
+        assert QuickXorHash(data).b64digest() == "rxAOGe1RimTF/e+k/m0O5nnSZT8="
+
+        quick_xor = QuickXorHash()
+        for offset in range(0, len(data), 7):
+            quick_xor.update(data[offset:offset + 7])
+        assert quick_xor.b64digest() == "rxAOGe1RimTF/e+k/m0O5nnSZT8="
+
+    def test_resume_state(self):
+        """
+        Test that a resumed download only fetches the missing ranges
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "file.bin")
+        with open(path + ".download", "w") as f:
+            json.dump({"size": 100, "etag": "\"1\"", "done": [[0, 9], [50, 59]]}, f)
+
+        downloader = RangedDownloader(Mock(), {}, "https://graph/content", path, chunk_size=30)
+        downloader._size = 100
+        downloader._etag = "\"1\""
+        downloader._load_state(True)
+
+        ranges = []
+        next_range = downloader._next_range()
+        while next_range is not None:
+            ranges.append(next_range)
+            next_range = downloader._next_range()
+        assert ranges == [(10, 39), (40, 49), (60, 89), (90, 99)]
+
+        downloader._etag = "\"2\""
+        downloader._load_state(True)
+        assert downloader._pending == [[0, 99]]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+import asyncio
+import json
+import threading
+import time
+from msgraph import GraphError
+from msgraph.http_response import HttpResponse
+from test_graph_sdk.helpers import mock_async_client, mock_client
+
+
+class TestFanOut(unittest.TestCase):
+
+    def _client(self):
+        def send(method, headers, url, **kwargs):
+            if url.endswith("$batch"):
+                requests = json.loads(kwargs["data"])["requests"]
+                return HttpResponse(200, None, json.dumps({"responses": [
+                    {"id": r["id"], "status": 200, "body": {"value": []} if "empty" in r["url"] else
+                     {"id": r["url"].split("?")[0].split("/")[2]}} for r in requests]}))
+            user_id = url.split("/")[-2]
+            if user_id == "empty":
+                return HttpResponse(200, None, json.dumps({"value": []}))
+            if user_id == "missing":
+                return HttpResponse(404, None, json.dumps({"error": {"code": "itemNotFound", "message": "missing"}}))
+            return HttpResponse(200, None, json.dumps({"id": "manager-of-" + user_id}))
+
+        return mock_client(send)
+
+    def test_template(self):
+        """
+        Test that results keep the order of the items and errors stay per item
+        """
+        client = self._client()
+        results = list(client.map("users/{}/manager", ["a", "missing", "b"], concurrency=4))
+
+        assert [r.index for r in results] == [0, 1, 2]
+        assert results[0].get().serialized()["id"] == "manager-of-a"
+        assert not results[1].ok
+        assert isinstance(results[1].error, GraphError)
+        self.assertRaises(GraphError, results[1].get)
+        assert results[2].value.serialized()["id"] == "manager-of-b"
+
+    def test_unordered_and_backpressure(self):
+        """
+        Test that results are returned as they complete and that items are
+        only read as work completes
+        """
+        pulled = []
+        running = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def items():
+            for i in range(50):
+                pulled.append(i)
+                yield i
+
+        def work(client, item):
+            with lock:
+                running.append(item)
+                peak[0] = max(peak[0], len(running))
+            time.sleep(0.05 if item == 0 else 0.001)
+            with lock:
+                running.remove(item)
+            return item * 2
+
+        results = self._client().map(work, items(), concurrency=4, ordered=False)
+        first = next(results)
+        assert first.index != 0
+        assert len(pulled) <= 8 + 4
+        rest = list(results)
+
+        assert sorted(r.value for r in [first] + rest) == [i * 2 for i in range(50)]
+        assert peak[0] <= 4
+
+    def test_batch(self):
+        """
+        Test that templates are sent in $batch requests of 20 items
+        """
+        client = self._client()
+        results = list(client.map("users/{}", [str(i) for i in range(45)], batch=True, select="id"))
+
+        assert client.http_provider.send.call_count == 3
+        assert [r.value.serialized()["id"] for r in results] == [str(i) for i in range(45)]
+        first_urls = sorted(json.loads(call[1]["data"])["requests"][0]["url"]
+                            for call in client.http_provider.send.call_args_list)
+        assert first_urls == ["/users/0?%24select=id", "/users/20?%24select=id", "/users/40?%24select=id"]
+        self.assertRaises(ValueError, lambda: list(client.map(len, ["a"], batch=True)))
+
+    def test_empty_result(self):
+        """
+        Test that an empty response is a None value in template and batch modes
+        """
+        client = self._client()
+        for batch in (False, True):
+            result, = client.map("users/{}/manager", ["empty"], batch=batch)
+            assert result.ok and result.value is None
+
+    def test_async(self):
+        """
+        Test that the asyncio client bounds the number of items in flight
+        """
+        in_flight = [0, 0]
+
+        async def work(client, item):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+            await asyncio.sleep(0.001 * (10 - item))
+            in_flight[0] -= 1
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        async def run():
+            client = mock_async_client()
+            return [r async for r in client.map(work, range(10), concurrency=3)]
+
+        results = asyncio.run(run())
+        assert [r.index for r in results] == list(range(10))
+        assert isinstance(results[3].error, ValueError)
+        assert in_flight[1] == 3
@@ -0,0 +1,126 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import copy
+import json
+from msgraph.graph_object_base import GraphObjectBase
+from msgraph.request import GraphPage
+from msgraph.type_registry import TypeRegistry, default_registry
+
+
+class Identity(GraphObjectBase):
+    __slots__ = ()
+
+    @property
+    def display_name(self):
+        return self._prop_dict.get("displayName")
+
+
+class Item(GraphObjectBase):
+    __slots__ = ()
+
+    @property
+    def created_by(self):
+        return self._get_model("createdBy", Identity)
+
+    @property
+    def shared_with(self):
+        return self._get_model_list("sharedWith", Identity)
+
+
+class GeneratedItem(Item):
+    """Model initialized like the generated models, without calling super"""
+    __slots__ = ()
+
+    def __init__(self, prop_dict={}):
+        self._prop_dict = prop_dict
+
+
+class TestGraphObject(unittest.TestCase):
+
+    def test_slots(self):
+        """
+        Test that slotted models have no per-instance __dict__
+        """
+        item = Item({"id": "1"})
+        assert not hasattr(item, "__dict__")
+
+    def test_lazy_properties(self):
+        """
+        Test that model properties are decoded once, on first access
+        """
+        item = Item({"createdBy": {"displayName": "Ada"}, "sharedWith": [{"displayName": "Grace"}]})
+        assert isinstance(item._prop_dict["createdBy"], dict)
+
+        assert item.created_by.display_name == "Ada"
+        assert item.created_by is item.created_by
+        assert item.shared_with[0].display_name == "Grace"
+        assert item.shared_with is item.shared_with
+        assert item.to_dict() == {"createdBy": {"displayName": "Ada"}, "sharedWith": [{"displayName": "Grace"}]}
+
+        item._prop_dict["createdBy"] = {"displayName": "Grace"}
+        assert item.created_by.display_name == "Grace"
+
+        generated = GeneratedItem({"createdBy": {"displayName": "Ada"}, "sharedWith": [{"displayName": "Grace"}]})
+        assert generated.created_by is generated.created_by
+        assert generated.shared_with[0].display_name == "Grace"
+
+    def test_page_data_stays_json(self):
+        """
+        Test that reading nested properties leaves the raw JSON of the page unchanged
+        """
+        default_registry.register_context(r"#testItems$", Item)
+        data = [{"id": "1", "createdBy": {"displayName": "Ada"}, "sharedWith": [{"displayName": "Grace"}]}]
+        page = GraphPage(copy.deepcopy(data), context="https://graph/v1.0/$metadata#testItems")
+
+        assert page[0].created_by.display_name == "Ada"
+        assert page[0].shared_with[0].display_name == "Grace"
+        assert page.data == data
+        assert json.loads(json.dumps(page.data)) == data
+        assert page.to_records(["id", "createdBy"]) == {"id": ["1"], "createdBy": [{"displayName": "Ada"}]}
+
+    def test_page_wrappers(self):
+        """
+        Test that page objects are built once per index, and rebuilt after
+        the page is changed
+        """
+        page = GraphPage([{"id": "1"}, {"id": "2"}])
+
+        first = page[0]
+        assert page[0] is first
+        assert page[-2] is first
+        assert [o.serialized()["id"] for o in page[0:2]] == ["1", "2"]
+
+        page.insert(0, {"id": "0"})
+        assert page[0].serialized()["id"] == "0"
+        assert page[1].serialized()["id"] == "1"
+
+    def test_type_registry(self):
+        """
+        Test that types are resolved once per context and @odata.type, and
+        that registered types take precedence over the resolver
+        """
+        resolver = Mock(return_value=Item)
+        registry = TypeRegistry(resolver)
+        context = "https://graph/v1.0/$metadata#users"
+
+        for _ in range(1000):
+            assert registry.resolve(context, None) is Item
+        assert resolver.call_count == 1
+
+        registry.register("#microsoft.graph.identity", Identity)
+        registry.register_context(r"#drives\(", GraphObjectBase)
+        assert registry.resolve(context, "#microsoft.graph.identity") is Identity
+        assert registry.resolve("https://graph/v1.0/$metadata#drives('1')/items", None) is GraphObjectBase
+        assert registry.resolve(context, None) is Item
+        assert resolver.call_count == 2
+
+        # Unhashable values are resolved without the cache, resolver errors propagate
+        assert registry.resolve(["not", "hashable"], None) is Item
+        assert resolver.call_count == 3
+        resolver.side_effect = TypeError("resolver bug")
+        self.assertRaises(TypeError, registry.resolve, "https://graph/v1.0/$metadata#groups", None)
+        assert resolver.call_count == 4
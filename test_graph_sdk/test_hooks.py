@@ -0,0 +1,147 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import msgraph
+from msgraph import GraphError, HistogramCollector, OpenTelemetrySpanEmitter, RetryPolicy
+from msgraph.hooks import AFTER_RECEIVE, BEFORE_SEND, ERROR, RETRY, Histogram
+from msgraph.http_response import HttpResponse
+import json
+from test_graph_sdk.helpers import mock_client
+
+
+class TestHooks(unittest.TestCase):
+
+    def _client(self):
+        return mock_client(HttpResponse(200, {"request-id": "server-id"}, b'{"value": [{"id": "1"}]}'),
+                           retry_policy=RetryPolicy())
+
+    def test_events(self):
+        """
+        Test that listeners receive the events of a request
+        """
+        client = self._client()
+        events = []
+        client.hooks.add_listener(events.append)
+
+        client.request("groups").post({"displayName": "A"})
+
+        assert [e.event for e in events] == [BEFORE_SEND, AFTER_RECEIVE]
+        sent_id = client.http_provider.send.call_args[0][1]["client-request-id"]
+        assert events[0].client_request_id == events[1].client_request_id == sent_id
+        assert events[1].request_id == "server-id"
+        assert events[1].status == 200
+        assert events[1].bytes_out == len(b'{"displayName":"A"}')
+        assert events[1].bytes_in == len(b'{"value": [{"id": "1"}]}')
+        assert events[1].latency >= 0
+
+    def test_errors_and_retries(self):
+        """
+        Test that failures and retries are reported with throttle info
+        """
+        client = self._client()
+        events = []
+        client.hooks.add_listener(events.append)
+        client.http_provider.send.side_effect = GraphError({"code": "TooManyRequests", "message": "slow"}, 429,
+                                                           {"Retry-After": "3"})
+
+        self.assertRaises(GraphError, client.get_page, "users")
+        assert events[-1].event == ERROR
+        assert events[-1].throttled
+        assert events[-1].retry_after == 3
+
+        policy = client.http_provider.retry_policy
+
+        def send(method, headers, url, **kwargs):
+            policy.notify(method, url, headers, 503, {"Retry-After": "1"}, 1)
+            return HttpResponse(200, None, b'{"value": []}')
+
+        client.http_provider.send.side_effect = send
+        client.get_page("users")
+        retry = [e for e in events if e.event == RETRY][-1]
+        assert retry.client_request_id == events[-1].client_request_id
+        assert retry.delay == 1
+
+        # Retries of another client sharing the provider are not reported
+        count = len(events)
+        policy.notify("GET", "https://graph/v1.0/users", {"client-request-id": "abc"}, 503, None, 1)
+        assert len(events) == count
+
+    def test_close_unregisters(self):
+        """
+        Test that a closed client stops listening to a shared retry policy and auth provider
+        """
+        http_provider = Mock()
+        http_provider.retry_policy = RetryPolicy()
+        auth_provider = msgraph.AuthProvider(http_provider, client_id="app")
+        limiter = msgraph.AdaptiveRateLimiter()
+        first = msgraph.GraphClient("https://graph/v1.0/", auth_provider, http_provider, rate_limiter=limiter)
+        second = msgraph.GraphClient("https://graph/v1.0/", auth_provider, http_provider, rate_limiter=limiter)
+        assert auth_provider.hooks is first.hooks
+        assert len(http_provider.retry_policy._listeners) == 4
+
+        first.close()
+        assert auth_provider.hooks is None
+        assert sorted(map(repr, http_provider.retry_policy._listeners)) == \
+            sorted(map(repr, [second.hooks.on_retry, limiter.on_retry]))
+        second.close()
+        assert http_provider.retry_policy._listeners == []
+
+    def test_histogram_collector(self):
+        """
+        Test that the collector aggregates latencies and counters
+        """
+        client = self._client()
+        collector = HistogramCollector()
+        client.hooks.add_listener(collector)
+
+        for _ in range(3):
+            client.get_page("users")
+        metrics = collector.snapshot()[("graph", "GET", "users")]
+        assert metrics["requests"] == 3
+        assert metrics["errors"] == 0
+        assert metrics["latency"]["count"] == 3
+        assert metrics["bytes_in"] == 3 * len(b'{"value": [{"id": "1"}]}')
+
+        histogram = Histogram(bounds=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+        assert histogram.percentile(50) == 0.1
+        assert histogram.percentile(75) == 1.0
+        assert histogram.percentile(100) == 5.0
+
+    def test_span_emitter(self):
+        """
+        Test that every request is recorded as a span
+        """
+        client = self._client()
+        tracer = Mock()
+        client.hooks.add_listener(OpenTelemetrySpanEmitter(tracer))
+
+        client.get_page("users")
+        span = tracer.start_span.return_value
+        span.set_attribute.assert_any_call("http.request.method", "GET")
+        span.set_attribute.assert_any_call("http.response.status_code", 200)
+        span.set_attribute.assert_any_call("msgraph.request_id", "server-id")
+        assert span.end.called
+
+    def test_auth_provider(self):
+        """
+        Test that token requests are reported to the client hooks
+        """
+        http_provider = Mock()
+        http_provider.send.return_value = HttpResponse(200, {}, json.dumps(
+            {"token_type": "bearer", "expires_in": 3600, "access_token": "token"}))
+        auth_provider = msgraph.AuthProvider(http_provider, client_id="app", session_type=Mock())
+        client = msgraph.GraphClient("https://graph/v1.0/", auth_provider, http_provider)
+        events = []
+        client.hooks.add_listener(events.append)
+
+        auth_provider.authenticate_daemon("secret")
+        assert [(e.event, e.source) for e in events] == [(BEFORE_SEND, "auth"), (AFTER_RECEIVE, "auth")]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+import time
+import msgraph
+from msgraph import HttpProvider
+
+
+class TestHttpProvider(unittest.TestCase):
+
+    def _sessions(self, mock_session):
+        sessions = []
+
+        def create():
+            session = Mock()
+            session.headers = {}
+            session.request.return_value = Mock(status_code=200, headers={}, content=b'{"id": "1"}')
+            sessions.append(session)
+            return session
+
+        mock_session.side_effect = create
+        return sessions
+
+    @patch("msgraph.http_provider.requests.Session")
+    def test_session_reuse(self, mock_session):
+        """
+        Test that every request goes through one pooled session, with the timeouts
+        """
+        sessions = self._sessions(mock_session)
+        provider = HttpProvider(pool_maxsize=4, timeout=(5, 30))
+        provider.send("GET", {}, "https://graph/v1.0/me")
+        provider.send("POST", {}, "https://graph/v1.0/users", data=b"{}")
+
+        assert len(sessions) == 1
+        assert sessions[0].mount.call_args[0][1]._pool_maxsize == 4
+        assert [call[1]["timeout"] for call in sessions[0].request.call_args_list] == [(5, 30), (5, 30)]
+
+    @patch("msgraph.http_provider.requests.Session")
+    def test_idle_eviction(self, mock_session):
+        """
+        Test that a pool unused for longer than idle_timeout is rebuilt
+        """
+        sessions = self._sessions(mock_session)
+        provider = HttpProvider(idle_timeout=0.05)
+        provider.send("GET", {}, "https://graph/v1.0/me")
+        provider.send("GET", {}, "https://graph/v1.0/me")
+        assert len(sessions) == 1
+
+        time.sleep(0.1)
+        provider.send("GET", {}, "https://graph/v1.0/me")
+        assert len(sessions) == 2
+        assert sessions[0].close.called and not sessions[1].close.called
+
+    @patch("msgraph.http_provider.requests.Session")
+    def test_close(self, mock_session):
+        """
+        Test that closing the provider, or leaving the client context, releases the pool
+        """
+        sessions = self._sessions(mock_session)
+        provider = HttpProvider()
+        provider.send("GET", {}, "https://graph/v1.0/me")
+        provider.close()
+        assert sessions[0].close.called
+
+        with msgraph.GraphClient("https://graph/v1.0/", Mock(), provider) as client:
+            client.get_object("me")
+            assert len(sessions) == 2
+        assert sessions[1].close.called
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from msgraph import GraphError
+from msgraph.http_response import HttpResponse, StreamingHttpResponse
+from msgraph.json_stream import JsonCollectionStream
+import json
+from test_graph_sdk.helpers import mock_client
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def _chunks(self, text, size):
+        data = text.encode("utf-8")
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_chunk_boundaries(self):
+        """
+        Test that values split anywhere across chunks are parsed
+        """
+        body = json.dumps({
+            "@odata.context": "https://graph/v1.0/$metadata#users",
+            "value": [{"id": "1", "displayName": "Jürgen 東京", "age": 12345},
+                      {"id": "2", "scores": [1.5, -20, True, None]},
+                      123456789],
+            "@odata.nextLink": "https://graph/v1.0/users?page=2"
+        }, ensure_ascii=False)
+
+        for size in (1, 2, 3, 7, 64, 100000):
+            stream = JsonCollectionStream(self._chunks(body, size))
+            items = list(stream)
+            assert items == json.loads(body)["value"], size
+            assert stream.properties["@odata.nextLink"] == "https://graph/v1.0/users?page=2"
+            assert "value" not in stream.properties
+
+    def test_incremental(self):
+        """
+        Test that objects are yielded before the response is fully read
+        """
+        read = []
+
+        def chunks():
+            for chunk in [b'{"value": [{"id": "1"}', b', {"id": "2"}', b']}']:
+                read.append(chunk)
+                yield chunk
+
+        stream = iter(JsonCollectionStream(chunks()))
+        assert next(stream) == {"id": "1"}
+        assert len(read) == 2
+        assert next(stream) == {"id": "2"}
+
+    def test_single_item(self):
+        """
+        Test that a response without a value array is a single item
+        """
+        stream = JsonCollectionStream([b'{"id": "1", "name": "a"}'])
+        assert list(stream) == [{"id": "1", "name": "a"}]
+        assert list(JsonCollectionStream([])) == []
+
+    def test_truncated(self):
+        """
+        Test that a truncated response raises an error
+        """
+        stream = JsonCollectionStream([b'{"value": [{"id": "1"}, {"id": '])
+        self.assertRaises(ValueError, list, stream)
+
+    def test_streaming_page(self):
+        """
+        Test that get_page(stream=True) yields objects and links the next page
+        """
+        body = json.dumps({"@odata.nextLink": "https://graph/v1.0/users?page=2",
+                           "value": [{"id": "1"}, {"id": "2"}]})
+        close = Mock()
+        client = mock_client(StreamingHttpResponse(200, {}, self._chunks(body, 5), close))
+
+        page = client.get_page("users", top=999, stream=True)
+        assert [o.serialized()["id"] for o in page] == ["1", "2"]
+        assert close.called
+        assert client.http_provider.send.call_args[1]["stream"]
+        assert page.next_page_request.request_url == "https://graph/v1.0/users?page=2"
+
+    def test_streaming_page_error(self):
+        """
+        Test that error responses which the provider does not raise fail the
+        streamed page with a GraphError
+        """
+        for response in (HttpResponse(404, {}, b""), HttpResponse(429, {"Retry-After": "1"}, b'{"detail": "slow"}')):
+            client = mock_client(response)
+            with self.assertRaises(GraphError) as context:
+                client.get_page("users", stream=True)
+            assert context.exception.status_code == response.status
+
+        client = mock_client(HttpResponse(200, {}, b'{"value": [{"id": "1"}]}'))
+        assert [o.serialized()["id"] for o in client.get_page("users", stream=True)] == ["1"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+from msgraph import HttpProvider
+from msgraph.http_logging import describe_body, redact_headers, redact_url
+from datetime import timedelta
+import io
+
+
+class TestLogging(unittest.TestCase):
+
+    def _provider(self, **kwargs):
+        provider = HttpProvider(**kwargs)
+        provider._session = Mock()
+        provider._session.request.return_value = Mock(status_code=200, headers={}, content=b"{}",
+                                                      elapsed=timedelta(milliseconds=30))
+        return provider
+
+    def test_redaction(self):
+        """
+        Test that credentials are removed from logged headers and URLs
+        """
+        headers = redact_headers({"Authorization": "bearer secret", "Content-Type": "application/json"})
+        assert headers == {"Authorization": "<redacted>", "Content-Type": "application/json"}
+
+        url = redact_url("https://contoso.sharepoint.com/download.aspx?UniqueId=1&tempauth=secret")
+        assert "secret" not in url
+        assert "UniqueId=1" in url
+        assert redact_url("https://graph/v1.0/me") == "https://graph/v1.0/me"
+
+    def test_describe_body(self):
+        """
+        Test that bodies are described by kind and size only
+        """
+        assert describe_body(data=b"{}") == "2 bytes"
+        assert describe_body(data=u"\u00e9") == "2 bytes"
+        assert describe_body(data={"client_id": "app", "client_secret": "secret"}) == "form (2 fields)"
+        assert describe_body(data=io.BytesIO(b"{}")) == "BytesIO"
+        assert describe_body(path="/tmp/file.bin") == "file /tmp/file.bin"
+        assert describe_body() == "none"
+
+    def test_debug_log(self):
+        """
+        Test that requests are logged with redacted headers and not printed
+        """
+        provider = self._provider()
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            with self.assertLogs("msgraph.http_provider", level="DEBUG") as logs:
+                provider.send("POST", {"Authorization": "bearer secret"}, "https://graph/v1.0/users", data=b"{}")
+
+        assert stdout.getvalue() == ""
+        output = "\n".join(logs.output)
+        assert "secret" not in output
+        assert "POST https://graph/v1.0/users" in output
+        assert "-> 200" in output
+
+    def test_timing_callback(self):
+        """
+        Test that every attempt is timed
+        """
+        timings = []
+        provider = self._provider(timing_callback=timings.append)
+        provider.send("GET", {}, "https://graph/v1.0/me")
+
+        assert len(timings) == 1
+        assert timings[0].status == 200
+        assert timings[0].attempt == 1
+        assert timings[0].ttfb == 0.03
+        assert timings[0].total >= 0
+        assert timings[0].dns is None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import asyncio
+import os
+import tempfile
+import time
+import msgraph
+from msgraph import Middleware, RedirectHandler, RetryHandler, RetryPolicy, GraphError
+from msgraph.http_response import HttpResponse
+from test_graph_sdk.helpers import mock_async_client, mock_client
+
+
+class Recorder(Middleware):
+
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def send(self, request, next):
+        self.calls.append(self.name)
+        response = next(request)
+        self.calls.append("/" + self.name)
+        return response
+
+    async def send_async(self, request, next):
+        self.calls.append(self.name)
+        response = await next(request)
+        self.calls.append("/" + self.name)
+        return response
+
+
+class TestMiddleware(unittest.TestCase):
+
+    def test_order(self):
+        """
+        Test that handlers see the request in order and the response in reverse order
+        """
+        calls = []
+        client = mock_client([HttpResponse(200, None, '{"id": "1"}')])
+        client.middleware = [Recorder("a", calls), Recorder("b", calls)] + client.middleware
+        client.request("me").get()
+
+        assert calls == ["a", "b", "/b", "/a"]
+        headers = client.http_provider.send.call_args[0][1]
+        assert "client-request-id" in headers
+        client.auth_provider.authenticate_request.assert_called_once()
+
+    def test_short_circuit(self):
+        """
+        Test that a handler can return a response without sending the request
+        """
+        class Stub(Middleware):
+            def send(self, request, next):
+                return HttpResponse(204, None, "")
+
+        client = mock_client([], middleware=[Stub()])
+        request = client.request("users/ada")
+        request.method = "DELETE"
+        assert request.send().status == 204
+        client.http_provider.send.assert_not_called()
+
+    def test_redirect(self):
+        """
+        Test that redirects are followed without sending credentials to other hosts
+        """
+        client = mock_client([HttpResponse(303, {"location": "https://other/result"}, ""),
+                               HttpResponse(200, None, '{"id": "1"}')],
+                              middleware=[RedirectHandler()])
+        request = client.request("me")
+        request.method = "POST"
+        request.append_option(msgraph.HeaderOption("Authorization", "Bearer t"))
+        request.send({"a": 1})
+
+        (method, headers, url), kwargs = client.http_provider.send.call_args
+        assert (method, url, kwargs["data"]) == ("GET", "https://other/result", None)
+        assert "Authorization" not in headers
+        assert request._headers["Authorization"] == "Bearer t"
+
+    def test_provider_redirect(self):
+        """
+        Test that the HTTP provider returns redirects, with any body, to the redirect handler
+        """
+        def response(status, headers, content):
+            return Mock(status_code=status, headers=headers, content=content)
+
+        http_provider = msgraph.HttpProvider()
+        http_provider._session = Mock()
+        http_provider._last_used = time.monotonic()
+        http_provider._session.request.side_effect = [
+            response(302, {"Location": "https://graph/v1.0/users/1"}, b"<html>Found</html>"),
+            response(200, {}, b'{"id": "1"}')]
+        client = msgraph.GraphClient("https://graph/v1.0/", Mock(), http_provider)
+
+        assert client.get_object("me").serialized()["id"] == "1"
+        calls = http_provider._session.request.call_args_list
+        assert [call[0][1] for call in calls] == ["https://graph/v1.0/me", "https://graph/v1.0/users/1"]
+        assert all(call[1]["allow_redirects"] is False for call in calls)
+
+    def test_retry(self):
+        """
+        Test that the retry handler sends throttled requests again
+        """
+        policy = RetryPolicy(jitter=False)
+        policy.sleep = Mock()
+        client = mock_client([GraphError({"code": "tooMany"}, 429, {"Retry-After": "2"}),
+                               HttpResponse(200, None, '{"id": "1"}')],
+                              middleware=[RetryHandler(policy)])
+        request = client.request("me")
+        request.method = "GET"
+        assert request.send().status == 200
+        policy.sleep.assert_called_once_with(2)
+
+        policy.max_attempts = 1
+        client.http_provider.send.side_effect = [GraphError({"code": "tooMany"}, 429, {"Retry-After": "2"})]
+        self.assertRaises(GraphError, request.send)
+
+    def test_download(self):
+        """
+        Test that downloads go through the handlers and report the size of the file
+        """
+        path = os.path.join(tempfile.mkdtemp(), "file.bin")
+
+        def download(headers, url, download_path, **options):
+            with open(download_path, "wb") as f:
+                f.write(b"12345")
+            return HttpResponse(200, None, None)
+
+        calls = []
+        events = []
+        client = mock_client([])
+        client.http_provider.download.side_effect = download
+        client.hooks.add_listener(events.append)
+        client.middleware = [Recorder("a", calls)] + client.middleware
+        response = client.request("me/drive/items/1/content").download_item(path, max_workers=2)
+
+        assert response.status == 200
+        assert calls == ["a", "/a"]
+        (headers, url, download_path), options = client.http_provider.download.call_args
+        assert (url, download_path, options) == ("https://graph/v1.0/me/drive/items/1/content", path,
+                                                 {"max_workers": 2})
+        assert "client-request-id" in headers and "Accept-Encoding" not in headers
+        client.auth_provider.authenticate_request.assert_called_once()
+        assert events[-1].bytes_in == 5
+
+    def test_async(self):
+        """
+        Test that async clients send requests through send_async and refuse
+        handlers only implementing send
+        """
+        class SyncOnly(Middleware):
+            def send(self, request, next):
+                return next(request)
+
+        async def send(method, headers, url, **kwargs):
+            return HttpResponse(200, None, '{"id": "1"}')
+
+        calls = []
+        client = mock_async_client(send)
+        client.middleware = [Recorder("a", calls)] + client.middleware
+
+        page = asyncio.run(client.request("me").get())
+        assert page[0].serialized()["id"] == "1"
+        assert calls == ["a", "/a"]
+        assert "client-request-id" in client.http_provider.send.call_args[0][1]
+        client.auth_provider.authenticate_request.assert_not_called()
+
+        def set_sync_only():
+            client.middleware = [SyncOnly()]
+        self.assertRaises(TypeError, set_sync_only)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from test_graph_sdk.helpers import mock_client, serve_pages
+
+
+class TestPaging(unittest.TestCase):
+
+    def _client(self):
+        pages = {
+            "https://graph/v1.0/users": {"value": [{"id": "1"}, {"id": "2"}],
+                                         "@odata.nextLink": "https://graph/v1.0/users?page=2"},
+            "https://graph/v1.0/users?page=2": {"value": [{"id": "3"}, {"id": "4"}],
+                                                "@odata.nextLink": "https://graph/v1.0/users?page=3"},
+            "https://graph/v1.0/users?page=3": {"value": [{"id": "5"}]}
+        }
+        return mock_client(serve_pages(pages))
+
+    def test_iter_all(self):
+        """
+        Test that every nextLink is followed
+        """
+        client = self._client()
+        iterator = client.iter_all("users")
+
+        assert [o.serialized()["id"] for o in iterator] == ["1", "2", "3", "4", "5"]
+        assert iterator.pages_fetched == 3
+        assert iterator.next_link is None
+
+    def test_limits(self):
+        """
+        Test that max_items and max_pages stop fetching pages
+        """
+        client = self._client()
+
+        assert len(list(client.iter_all("users", max_items=3, prefetch=False))) == 3
+        assert client.http_provider.send.call_count == 2
+
+        assert len(list(client.iter_all("users", max_pages=1))) == 2
+
+    def test_resume(self):
+        """
+        Test that iteration resumes from a saved link without skipping objects
+        """
+        client = self._client()
+        iterator = client.iter_all("users", max_items=3)
+        list(iterator)
+        assert iterator.next_link == "https://graph/v1.0/users?page=2"
+
+        resumed = client.iter_all("users", next_link=iterator.next_link)
+        assert [o.serialized()["id"] for o in resumed] == ["3", "4", "5"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from datetime import datetime
+import msgraph
+from msgraph import Field, ProjectionPolicy, Query
+from msgraph.http_response import HttpResponse
+from msgraph.query import resource_type_for
+from test_graph_sdk.helpers import mock_client
+
+
+class TestQuery(unittest.TestCase):
+
+    def _client(self, **kwargs):
+        return mock_client(HttpResponse(200, None, '{"value": []}'), **kwargs)
+
+    def test_filters(self):
+        """
+        Test that filter expressions are formatted as OData
+        """
+        assert str(Field("displayName") == "O'Neil") == "displayName eq 'O''Neil'"
+        assert str(Field("accountEnabled") == True) == "accountEnabled eq true"
+        assert str(Field("createdDateTime") >= datetime(2024, 1, 2)) == "createdDateTime ge 2024-01-02T00:00:00Z"
+        assert str(Field("mail").startswith("ada") | Field("id").in_(["1", "2"])) == \
+            "(startswith(mail, 'ada')) or (id in ('1', '2'))"
+        assert str(Field("assignedLicenses").any(lambda x: x.field("skuId") == "s")) == \
+            "assignedLicenses/any(x: x/skuId eq 's')"
+        assert str(Field("businessPhones").any(lambda x: x == "1")) == "businessPhones/any(x: x eq '1')"
+        assert (~(Field("mail") == None)).advanced
+        assert str((Field("id") == "1") & "mail ne null") == "(id eq '1') and (mail ne null)"
+        assert str("mail ne null" | (Field("id") == "1")) == "(mail ne null) or (id eq '1')"
+
+    def test_query_options(self):
+        """
+        Test that queries build their options and consistency level
+        """
+        query = Query().select("id", "displayName").expand("manager", Query().select("id")) \
+            .filter(Field("accountEnabled") == True).order_by("displayName", descending=True).top(50)
+        assert query.query_options() == {"$select": "id,displayName", "$expand": "manager($select=id)",
+                                         "$filter": "accountEnabled eq true", "$orderby": "displayName desc",
+                                         "$top": "50"}
+        assert not [o for o in query.options() if isinstance(o, msgraph.HeaderOption)]
+
+        query = Query().search("ada", field="displayName").count()
+        headers = {o.key: o.value for o in query.options() if isinstance(o, msgraph.HeaderOption)}
+        assert headers == {"ConsistencyLevel": "eventual"}
+        assert query.query_options()["$search"] == '"displayName:ada"'
+
+    def test_get_page(self):
+        """
+        Test that queries compose with the other options of get_page
+        """
+        client = self._client()
+        client.get_page("users", query=Query().select("id").filter(Field("mail").endswith("@contoso.com")), top=5)
+
+        method, headers, url = client.http_provider.send.call_args[0][:3]
+        assert url == ("https://graph/v1.0/users?%24select=id&%24filter=endswith%28mail%2C+%27%40contoso.com%27%29"
+                       "&%24top=5")
+        assert headers["ConsistencyLevel"] == "eventual"
+
+    def test_projection_policy(self):
+        """
+        Test that the default $select of a resource type is injected in
+        requests without $select only
+        """
+        assert resource_type_for("https://graph/v1.0/users/ada@contoso.com") == "users"
+        assert resource_type_for("https://graph/beta/me/mailFolders/inbox/messages?$top=5") == "messages"
+        assert resource_type_for("https://graph/v1.0/me/photo/$value") is None
+
+        client = self._client(projection_policy=ProjectionPolicy({"users": ["id", "displayName"]}))
+        client.get_page("users")
+        assert client.http_provider.send.call_args[0][2] == "https://graph/v1.0/users?%24select=id%2CdisplayName"
+
+        client.get_page("users", select="mail")
+        assert client.http_provider.send.call_args[0][2] == "https://graph/v1.0/users?%24select=mail"
+
+        client.projection_policy.mode = ProjectionPolicy.WARN
+        with self.assertLogs("msgraph.query", "WARNING"):
+            client.get_page("groups")
+        assert client.http_provider.send.call_args[0][2] == "https://graph/v1.0/groups"
@@ -0,0 +1,81 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import msgraph
+from msgraph import AdaptiveRateLimiter, GraphError, RetryPolicy
+from msgraph.http_response import HttpResponse
+from msgraph.rate_limiter import resource_family
+import base64
+import json
+from test_graph_sdk.helpers import mock_client
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def _token(self, tenant):
+        claims = base64.urlsafe_b64encode(json.dumps({"tid": tenant}).encode()).decode().rstrip("=")
+        return "bearer header.{}.signature".format(claims)
+
+    def test_keys(self):
+        """
+        Test that requests are keyed by tenant and resource family
+        """
+        limiter = AdaptiveRateLimiter()
+        headers = {"Authorization": self._token("contoso")}
+
+        assert limiter.key_for("https://graph/v1.0/users/1", headers) == ("contoso", "users")
+        assert resource_family("https://graph/v1.0/me/mailFolders/inbox/messages") == "mail"
+        assert resource_family("https://graph/v1.0/users/1/drive/root/children") == "drives"
+        assert resource_family("https://graph/beta/groups?$top=5") == "groups"
+
+    def test_aimd(self):
+        """
+        Test that the rate grows on success and is cut on throttling
+        """
+        limiter = AdaptiveRateLimiter(initial_rate=10, increase=1, decrease_factor=0.5)
+        key = ("contoso", "users")
+
+        for _ in range(10):
+            limiter.record(key, 200)
+        assert abs(limiter.rate(key) - 11) < 0.1
+
+        limiter.record(key, 429, {"Retry-After": "5"})
+        assert abs(limiter.rate(key) - 5.5) < 0.1
+        assert limiter.reserve(key) > 4
+
+    def test_token_bucket(self):
+        """
+        Test that requests beyond the burst have to wait
+        """
+        limiter = AdaptiveRateLimiter(initial_rate=2, burst=2)
+        key = ("contoso", "users")
+
+        assert limiter.reserve(key) == 0
+        assert limiter.reserve(key) == 0
+        assert 0.4 < limiter.reserve(key) <= 0.5
+
+    def test_client_feedback(self):
+        """
+        Test that the client paces requests and reports throttled responses
+        """
+        auth_provider = Mock()
+        auth_provider.authenticate_request.side_effect = \
+            lambda request: request.append_option(msgraph.HeaderOption("Authorization", self._token("contoso")))
+
+        limiter = AdaptiveRateLimiter(initial_rate=10)
+        client = mock_client(GraphError({"code": "TooManyRequests", "message": "slow"}, 429, {"Retry-After": "1"}),
+                             auth_provider=auth_provider, retry_policy=RetryPolicy(), rate_limiter=limiter)
+
+        self.assertRaises(GraphError, client.get_page, "users")
+        assert limiter.rate(("contoso", "users")) == 5
+
+        client.http_provider.retry_policy.notify("GET", "https://graph/v1.0/users",
+                                                 {"Authorization": self._token("contoso")}, 503, {}, 1)
+        assert limiter.rate(("contoso", "users")) == 2.5
+
+
+if __name__ == '__main__':
+    unittest.main()
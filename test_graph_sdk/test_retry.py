@@ -0,0 +1,76 @@
+import unittest
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+from msgraph import HttpProvider
+from msgraph.retry import RetryPolicy, retry_after
+
+
+class TestRetry(unittest.TestCase):
+
+    def _response(self, status, headers=None):
+        response = Mock()
+        response.status_code = status
+        response.headers = headers or {}
+        response.text = None
+        return response
+
+    def test_retry_after_headers(self):
+        """
+        Test that x-ms-retry-after-ms takes precedence over Retry-After
+        """
+        assert retry_after({"Retry-After": "7"}) == 7
+        assert retry_after({"Retry-After": "7", "x-ms-retry-after-ms": "1500"}) == 1.5
+        assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+        assert retry_after({}) is None
+
+    def test_method_policy(self):
+        """
+        Test that non-idempotent methods are only retried when throttled
+        """
+        policy = RetryPolicy()
+        assert policy.is_retryable("GET", 503)
+        assert policy.is_retryable("POST", 429)
+        assert not policy.is_retryable("POST", 503)
+        assert not policy.is_retryable("GET", 404)
+        assert not policy.is_retryable("PATCH", None)
+
+    def test_backoff_caps(self):
+        """
+        Test that delays grow exponentially and respect the attempt and time caps
+        """
+        policy = RetryPolicy(max_attempts=3, max_elapsed=10, backoff_factor=1, max_backoff=4, jitter=False)
+        assert [policy.get_delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 4]
+        assert policy.should_retry(2, 0, 1)
+        assert not policy.should_retry(3, 0, 1)
+        assert not policy.should_retry(1, 9.5, 1)
+
+        assert policy.get_delay(1, {"Retry-After": "8"}) == 8
+        assert not policy.should_retry(1, 0, policy.get_delay(1, {"Retry-After": "30"}))
+
+    @patch('msgraph.retry.time.sleep')
+    def test_provider_retries_throttled_requests(self, mock_sleep):
+        """
+        Test that HttpProvider waits for Retry-After and counts retries
+        """
+        policy = RetryPolicy()
+        http_provider = HttpProvider(retry_policy=policy)
+        http_provider._session = Mock()
+        http_provider._last_used = 0
+        http_provider._session.request.side_effect = [self._response(429, {"Retry-After": "2"}),
+                                                      self._response(503),
+                                                      self._response(200)]
+
+        response = http_provider.send("GET", {}, "https://graph/v1.0/me", path=None)
+
+        assert response.status == 200
+        assert http_provider._session.request.call_count == 3
+        assert mock_sleep.call_args_list[0][0][0] == 2
+        assert policy.retries == 2
+        assert policy.sleep_time >= 2
+
+
+if __name__ == '__main__':
+    unittest.main()
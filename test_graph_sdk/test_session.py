@@ -0,0 +1,72 @@
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+import json
+import os
+import shutil
+import tempfile
+from msgraph.file_utils import atomic_write
+from msgraph.session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "session.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _session(self):
+        return Session("bearer", 3600, "User.Read offline_access", "token", "client_id",
+                       "https://login/token", "https://redirect", "refresh", "secret")
+
+    def test_round_trip(self):
+        """
+        Test that a saved session is loaded with its fields and expiration
+        """
+        session = self._session()
+        session.save_session(path=self.path)
+
+        with open(self.path) as f:
+            saved = json.load(f)
+        assert saved["version"] == 1
+
+        loaded = Session.load_session(path=self.path)
+        assert loaded.to_dict() == session.to_dict()
+        assert loaded.scope == ["User.Read", "offline_access"]
+        assert not loaded.is_expired()
+
+    def test_saves_only_changes(self):
+        """
+        Test that the file is only rewritten when the session changed
+        """
+        session = self._session()
+        with patch("msgraph.session.atomic_write", wraps=atomic_write) as write:
+            session.save_session(path=self.path)
+            session.save_session(path=self.path)
+            assert write.call_count == 1
+
+            loaded = Session.load_session(path=self.path)
+            loaded.save_session(path=self.path)
+            assert write.call_count == 1
+
+            loaded.refresh_session(3600, "User.Read", "new token", "new refresh")
+            loaded.save_session(path=self.path)
+            assert write.call_count == 2
+
+        assert Session.load_session(path=self.path).access_token == "new token"
+
+    def test_unsupported_version(self):
+        """
+        Test that files of another format are rejected
+        """
+        with open(self.path, "w") as f:
+            json.dump({"version": 99, "session": {}}, f)
+
+        with self.assertRaises(ValueError):
+            Session.load_session(path=self.path)
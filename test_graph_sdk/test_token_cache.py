@@ -0,0 +1,143 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from msgraph import AuthProvider, TokenCache, FileTokenCacheBackend, SqliteTokenCacheBackend
+from msgraph.http_response import HttpResponse
+from msgraph.session import Session
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _session(self, access_token, expires_in=3600):
+        return Session("bearer", expires_in, "", access_token, "app", "https://login/token", "")
+
+    def _token_response(self, access_token, expires_in=3600):
+        return HttpResponse(200, {}, json.dumps({"token_type": "bearer", "expires_in": expires_in,
+                                                 "access_token": access_token}))
+
+    def test_keys(self):
+        """
+        Test that keys ignore the case of the tenant and the order of the scopes
+        """
+        assert TokenCache.key_for("Contoso", "app", ["b", "a"]) == TokenCache.key_for("contoso", "app", ["a", "b"])
+        assert TokenCache.key_for("contoso", "app") != TokenCache.key_for("fabrikam", "app")
+
+    def test_lru_and_early_expiry(self):
+        """
+        Test that the least recently used sessions are evicted and that
+        sessions about to expire are not returned
+        """
+        cache = TokenCache(max_entries=2, early_expiry=300)
+        cache.put(("a", "app", ()), self._session("a"))
+        cache.put(("b", "app", ()), self._session("b"))
+        cache.get(("a", "app", ()))
+        cache.put(("c", "app", ()), self._session("c"))
+
+        assert cache.get(("a", "app", ())).access_token == "a"
+        assert cache.get(("b", "app", ())) is None
+        assert len(cache) == 2
+
+        cache.put(("d", "app", ()), self._session("d", expires_in=120))
+        assert cache.get(("d", "app", ())) is None
+
+    def test_backends(self):
+        """
+        Test that sessions survive a restart through the persistent backends
+        """
+        for backend_type, name in ((FileTokenCacheBackend, "tokens.json"), (SqliteTokenCacheBackend, "tokens.db")):
+            path = os.path.join(self.directory, name)
+            key = TokenCache.key_for("contoso", "app", ["https://graph.microsoft.com/.default"])
+            TokenCache(backend=backend_type(path)).put(key, self._session("persisted"))
+
+            restarted = TokenCache(backend=backend_type(path))
+            session = restarted.get(key)
+            assert session.access_token == "persisted"
+            assert not session.is_expired()
+
+            restarted.remove(key)
+            assert TokenCache(backend=backend_type(path)).get(key) is None
+
+    def test_backend_renewed(self):
+        """
+        Test that an expiring session in memory is replaced by the one
+        another process renewed in the shared backend
+        """
+        path = os.path.join(self.directory, "tokens.json")
+        key = TokenCache.key_for("contoso", "app")
+        worker = TokenCache(backend=FileTokenCacheBackend(path), early_expiry=300)
+        other = TokenCache(backend=FileTokenCacheBackend(path), early_expiry=300)
+
+        worker.put(key, self._session("old", expires_in=120))
+        assert worker.get(key) is None
+        other.put(key, self._session("renewed"))
+
+        assert worker.get(key).access_token == "renewed"
+        assert worker.stats["hits"] == 1
+
+    def test_file_backend_shared(self):
+        """
+        Test that backends sharing a file, as in worker processes, keep each other's entries
+        """
+        path = os.path.join(self.directory, "tokens.json")
+
+        def worker(index):
+            backend = FileTokenCacheBackend(path)
+            for i in range(20):
+                backend.save("{}-{}".format(index, i), {"access_token": "t"})
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(path) as f:
+            content = f.read()
+        assert len(json.loads(content)) == 80
+        assert "\n" not in content
+
+    def test_shared_by_providers(self):
+        """
+        Test that providers of the same tenant share one token, and that
+        an expired app-only token is acquired again
+        """
+        http_provider = Mock()
+        http_provider.send = Mock(side_effect=[self._token_response("contoso"),
+                                               self._token_response("fabrikam", expires_in=0),
+                                               self._token_response("fabrikam-renewed")])
+        cache = TokenCache()
+
+        def provider(tenant):
+            return AuthProvider(http_provider, "app", auth_token_url="https://login/{}/oauth2/v2.0/token".format(tenant),
+                                token_cache=cache)
+
+        first = provider("contoso")
+        first.authenticate_daemon("secret")
+        second = provider("contoso")
+        second.authenticate_daemon("secret")
+        assert second.access_token == "contoso"
+        assert http_provider.send.call_count == 1
+
+        other = provider("fabrikam")
+        other.authenticate_daemon("secret")
+        assert other.tenant == "fabrikam"
+        assert http_provider.send.call_count == 2
+
+        request = Mock()
+        other.authenticate_request(request)
+        assert request.append_option.call_args[0][0].value == "bearer fabrikam-renewed"
+        assert http_provider.send.call_count == 3
@@ -0,0 +1,190 @@
+import unittest
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from msgraph.http_response import HttpResponse
+from msgraph.upload_session import UploadSession, parse_ranges
+from test_graph_sdk.helpers import mock_client
+
+CHUNK = UploadSession.CHUNK_MULTIPLE
+UPLOAD_URL = "https://upload/session"
+
+
+class FakeUploadServer(object):
+    """Answers the requests of an upload session the way Graph does"""
+
+    def __init__(self, size, received=None, expired=False):
+        self.size = size
+        self.received = bytearray(size) if received is None else received
+        self.done = []
+        self.created = []
+        self.ranges = []
+        self.expired = expired
+        self.lock = threading.Lock()
+
+    def send(self, method, headers, url, **kwargs):
+        if url.endswith("/createUploadSession"):
+            self.created.append(json.loads(kwargs["data"]))
+            self.expired = False
+            return HttpResponse(200, None, json.dumps({"uploadUrl": UPLOAD_URL}))
+        if method == "GET" and url == UPLOAD_URL:
+            if self.expired:
+                return HttpResponse(404, None, json.dumps({"error": {"code": "itemNotFound", "message": "gone"}}))
+            return HttpResponse(200, None, json.dumps({"nextExpectedRanges": self._missing()}))
+        if method == "GET":
+            return HttpResponse(200, None, json.dumps({"id": "item", "size": self.size}))
+
+        assert method == "PUT" and url == UPLOAD_URL
+        assert "Authorization" not in headers
+        content_range = headers["Content-Range"]
+        start, end = [int(offset) for offset in content_range[len("bytes "):].split("/")[0].split("-")]
+        data = kwargs["data"].read()
+        assert len(data) == int(headers["Content-Length"]) == end - start + 1
+        with self.lock:
+            self.ranges.append(content_range)
+            self.received[start:end + 1] = data
+            self.done.append((start, end))
+            complete = sum(e - s + 1 for s, e in self.done) == self.size
+        if complete:
+            return HttpResponse(201, None, json.dumps({"id": "item", "size": self.size}))
+        return HttpResponse(202, None, json.dumps({"nextExpectedRanges": self._missing()}))
+
+    def _missing(self):
+        offset = 0
+        for start, end in sorted(self.done):
+            if start > offset:
+                break
+            offset = end + 1
+        return ["{}-".format(offset)] if offset < self.size else []
+
+
+class TestUploadSession(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "file.bin")
+        self.data = os.urandom(2 * CHUNK + 1000)
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_chunk_size(self):
+        """
+        Test that chunk sizes which Graph rejects are refused up front
+        """
+        client = mock_client(FakeUploadServer(len(self.data)).send)
+        for chunk_size in (0, CHUNK + 1, UploadSession.MAX_CHUNK_SIZE + CHUNK):
+            self.assertRaises(ValueError, UploadSession, client, "me/drive/root:/file.bin:", self.path,
+                              chunk_size=chunk_size)
+
+        empty = os.path.join(self.directory, "empty.bin")
+        open(empty, "wb").close()
+        self.assertRaises(ValueError, UploadSession, client, "me/drive/root:/empty.bin:", empty)
+
+    def test_upload(self):
+        """
+        Test that every chunk is sent with its Content-Range and progress
+        is reported
+        """
+        server = FakeUploadServer(len(self.data))
+        progress = []
+        client = mock_client(server.send)
+        item = client.upload_large_file("me/drive/root:/file.bin:", self.path, chunk_size=CHUNK,
+                                        progress_callback=lambda done, size: progress.append(done),
+                                        conflict_behavior="rename")
+
+        size = len(self.data)
+        assert item.serialized()["id"] == "item"
+        assert server.ranges == ["bytes 0-{}/{}".format(CHUNK - 1, size),
+                                 "bytes {}-{}/{}".format(CHUNK, 2 * CHUNK - 1, size),
+                                 "bytes {}-{}/{}".format(2 * CHUNK, size - 1, size)]
+        assert bytes(server.received) == self.data
+        assert progress == [CHUNK, 2 * CHUNK, size]
+        assert server.created == [{"item": {"@microsoft.graph.conflictBehavior": "rename"}}]
+        assert not os.path.exists(self.path + ".uploadsession")
+
+    def test_resume(self):
+        """
+        Test that a saved session only uploads the ranges Graph still expects
+        """
+        server = FakeUploadServer(len(self.data))
+        client = mock_client(server.send)
+        session = UploadSession(client, "me/drive/root:/file.bin:", self.path, chunk_size=CHUNK)
+        session._create()
+        server.send("PUT", {"Content-Length": str(CHUNK), "Content-Range": "bytes 0-{}/{}".format(
+            CHUNK - 1, len(self.data))}, UPLOAD_URL, data=io.BytesIO(self.data[:CHUNK]))
+        server.ranges = []
+
+        state_path = os.path.join(self.directory, "state.json")
+        os.rename(self.path + ".uploadsession", state_path)
+        client.upload_large_file("me/drive/root:/file.bin:", self.path, chunk_size=CHUNK, state_path=state_path)
+
+        assert len(server.created) == 1
+        assert [r.split("-")[0] for r in server.ranges] == ["bytes {}".format(CHUNK), "bytes {}".format(2 * CHUNK)]
+        assert bytes(server.received) == self.data
+        assert not os.path.exists(state_path)
+
+    def test_resume_expired(self):
+        """
+        Test that a new session is created when the saved one expired or
+        the file changed
+        """
+        state_path = self.path + ".uploadsession"
+        with open(state_path, "w") as f:
+            json.dump({"uploadUrl": UPLOAD_URL, "size": len(self.data), "mtime": os.path.getmtime(self.path)}, f)
+
+        server = FakeUploadServer(len(self.data), expired=True)
+        mock_client(server.send).upload_large_file("me/drive/root:/file.bin:", self.path, chunk_size=CHUNK)
+        assert len(server.created) == 1
+        assert len(server.ranges) == 3
+
+        with open(state_path, "w") as f:
+            json.dump({"uploadUrl": UPLOAD_URL, "size": len(self.data) + 1, "mtime": 0}, f)
+        server = FakeUploadServer(len(self.data))
+        mock_client(server.send).upload_large_file("me/drive/root:/file.bin:", self.path, chunk_size=CHUNK)
+        assert len(server.created) == 1
+        assert bytes(server.received) == self.data
+
+    def test_parallel(self):
+        """
+        Test that chunks are uploaded by several workers and the last chunk
+        is sent once every other chunk was accepted
+        """
+        data = os.urandom(8 * CHUNK + 10)
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+        server = FakeUploadServer(len(data))
+        send = server.send
+        last = "bytes {}-{}/{}".format(8 * CHUNK, len(data) - 1, len(data))
+
+        def check_last(method, headers, url, **kwargs):
+            if headers.get("Content-Range") == last:
+                assert len(server.ranges) == 8
+            return send(method, headers, url, **kwargs)
+
+        server.send = check_last
+        mock_client(server.send).upload_large_file("me/drive/root:/file.bin:", self.path, chunk_size=CHUNK,
+                                                   max_workers=4)
+
+        assert sorted(server.ranges[:-1]) == sorted("bytes {}-{}/{}".format(i * CHUNK, (i + 1) * CHUNK - 1, len(data))
+                                                    for i in range(8))
+        assert server.ranges[-1] == last
+        assert bytes(server.received) == data
+
+    def test_parse_ranges(self):
+        """
+        Test that open ended ranges end at the last byte of the file
+        """
+        assert parse_ranges(["0-1023", "2048-"], 4096) == [(0, 1023), (2048, 4095)]
+        assert parse_ranges([], 4096) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from msgraph.options import QueryOption
+from msgraph.request import GraphRequest
+from msgraph.url_builder import compile_url
+
+
+class TestUrlBuilder(unittest.TestCase):
+
+    def test_compile_url(self):
+        """
+        Test that URLs are parsed once and built with their query options
+        """
+        url = compile_url("https://graph/v1.0/users?$top=5")
+        assert compile_url("https://graph/v1.0/users?$top=5") is url
+
+        assert url.build() == "https://graph/v1.0/users?%24top=5"
+        assert url.build({"$select": "id", "$top": "10"}) == "https://graph/v1.0/users?%24select=id&%24top=5"
+        assert url.append("delta").build() == "https://graph/v1.0/users/delta?%24top=5"
+        assert compile_url("https://graph/v1.0/me").build() == "https://graph/v1.0/me"
+
+    def test_request_url(self):
+        """
+        Test that the request URL is cached until a query option is appended
+        """
+        request = GraphRequest("https://graph/v1.0/users", Mock())
+        request.set_query_options(select="id")
+        url = request.request_url
+        assert url == "https://graph/v1.0/users?%24select=id"
+        assert request.request_url is url
+
+        request.append_option(QueryOption("$top", "5"))
+        assert request.request_url == "https://graph/v1.0/users?%24select=id&%24top=5"
+        assert request.append_to_request_url("delta") == "https://graph/v1.0/users/delta"